@@ -18,6 +18,7 @@ logger.setLevel(
 MODULE_PREFIX = "src"
 MODULE_NAMES: list[str] = [
     "preference",
+    "primitive_registry",
     "modern_primitive",
     "focus_modifier",
     "equalize_dcube_size",
@@ -29,11 +30,16 @@ MODULE_NAMES: list[str] = [
     "apply_scale",
     "hud.hud_draw",
     "restore_default",
+    "bulk_edit",
     "convert",
     "apply_mesh",
+    "reclaim_garbage",
+    "division_lod",
+    "freeze",
     "reset_origin",
     "store_gizmoinfo",
     "extract_primitive",
+    "boolean_proxy",
     "modal_edit",
     "apply_material",
     "material_prop",
@@ -1,36 +1,185 @@
+from collections.abc import Hashable, Sequence
 from typing import ClassVar
 
 import bpy
-from bpy.types import Context, Object, Operator
+from bpy.props import BoolProperty
+from bpy.types import Context, Depsgraph, Mesh, Object, Operator
 from bpy.utils import register_class, unregister_class
 
 from .constants import MODERN_PRIMITIVE_PREFIX
+from .division_lod import restore_authored
+from .primitive_registry import PRIMITIVE_REGISTRY
 from .util.aux_func import (
     disable_modifier,
     get_mpr_modifier,
     get_selected_primitive,
+    get_selection_summary,
     is_mpr_enabled,
+    remove_if_unused,
 )
+from .util.aux_node import enum_group_input, interface_key
+from .util.aux_other import estimate_mesh_size, format_size
+from .util.geometry_cache import (
+    CacheKey,
+    GeometryData,
+    get_geometry_cache,
+    make_cache_key,
+    node_tree_digest,
+)
+from .util.vertex_transform import coords_digest
+
+
+def primitive_mesh_key(obj: Object, identifiers: Sequence[str]) -> Hashable:
+    """Objects with the same key result in the same mesh
+    (same node group (type and version), parameter values, materials
+    and base mesh vertices, around which the shape is generated)"""
+    mod = get_mpr_modifier(obj.modifiers)
+    return (
+        mod.node_group.name,
+        interface_key(mod, identifiers),
+        tuple(m.as_pointer() if m is not None else 0 for m in obj.data.materials),
+        coords_digest(obj.data),
+    )
+
+
+class MeshBaker:
+    """Makes the meshes of the result of the MPR modifiers.
+    The geometry cache is consulted first,
+    and the depsgraph is evaluated (only once) when it's actually needed"""
+
+    def __init__(self, context: Context):
+        self._context = context
+        self._deps: Depsgraph | None = None
+        self._cache = get_geometry_cache(context)
+        # Socket identifiers and contents are looked up once per node group
+        self._identifiers: dict[str, list[str]] = {}
+        self._tree_digests: dict[str, str] = {}
+
+    def identifiers(self, obj: Object) -> list[str]:
+        ng = get_mpr_modifier(obj.modifiers).node_group
+        if ng.name not in self._identifiers:
+            self._identifiers[ng.name] = enum_group_input(ng)
+        return self._identifiers[ng.name]
+
+    def _cache_key(self, obj: Object) -> CacheKey | None:
+        mod = get_mpr_modifier(obj.modifiers)
+        ng = mod.node_group
+        if ng.name not in self._tree_digests:
+            self._tree_digests[ng.name] = node_tree_digest(ng)
+        materials = tuple(m.name if m is not None else "" for m in obj.data.materials)
+        return make_cache_key(
+            ng,
+            self._tree_digests[ng.name],
+            (interface_key(mod, self.identifiers(obj)), materials, coords_digest(obj.data)),
+        )
+
+    def _evaluate(self, obj: Object) -> Mesh:
+        if self._deps is None:
+            self._deps = self._context.evaluated_depsgraph_get()
+        return bpy.data.meshes.new_from_object(obj.evaluated_get(self._deps))
+
+    def bake(self, obj: Object) -> Mesh:
+        key = None if self._cache is None else self._cache_key(obj)
+        if key is None:
+            return self._evaluate(obj)
+
+        data = self._cache.get(key)
+        mesh = None if data is None else data.to_mesh(obj.name)
+        if mesh is None:
+            mesh = self._evaluate(obj)
+            data = GeometryData.from_mesh(mesh)
+            # Meshes which can't be reproduced are never served from the cache
+            if data is not None:
+                self._cache.put(key, data)
+        return mesh
+
+
+def bake_primitive_meshes(
+    context: Context, objs: Sequence[Object], share: bool = False
+) -> list[Mesh]:
+    """New meshes of the result of the MPR modifier of each object.
+    All the objects are evaluated by a single depsgraph evaluation.
+    With share, objects with identical parameters get the same mesh"""
+    # The MPR modifier is hidden in the viewport while the LOD shows its copy
+    #   (the LOD may not have restored them yet, e.g. just selected)
+    restore_authored(context, objs)
+    # Only the MPR modifier (always at index 0) is applied,
+    #   so disable the following modifiers while evaluating
+    hidden = [mod for obj in objs for mod in obj.modifiers[1:] if mod.show_viewport]
+    for mod in hidden:
+        mod.show_viewport = False
+    try:
+        baker = MeshBaker(context)
+        if not share:
+            return [baker.bake(obj) for obj in objs]
+
+        baked: dict[Hashable, Mesh] = {}
+        ret: list[Mesh] = []
+        for obj in objs:
+            key = primitive_mesh_key(obj, baker.identifiers(obj))
+            if key not in baked:
+                baked[key] = baker.bake(obj)
+            ret.append(baked[key])
+        return ret
+    finally:
+        for mod in hidden:
+            mod.show_viewport = True
+
+
+def swap_meshes(objs: Sequence[Object], meshes: Sequence[Mesh]) -> None:
+    """Replace the mesh of each object.
+    The old meshes no one else uses are freed immediately (all at once),
+    and the new meshes take over their names"""
+    old_meshes = [obj.data for obj in objs]
+    for obj, mesh in zip(objs, meshes, strict=True):
+        obj.data = mesh
+    names: dict[Mesh, str] = {}
+    for mesh, old in zip(meshes, old_meshes, strict=True):
+        if old.users == 0:
+            # A shared mesh takes the name of the first one
+            names.setdefault(mesh, old.name)
+    # Free them first, so that the names become available
+    remove_if_unused(old_meshes)
+    for mesh, name in names.items():
+        mesh.name = name
 
 
 class ApplyMesh_Base(Operator):
     bl_options: ClassVar[set[str]] = {"REGISTER", "UNDO"}
 
+    share_mesh: BoolProperty(
+        name="Share Identical Meshes",
+        description="Objects with the same primitive parameters share one mesh",
+        default=True,
+    )
+
     @classmethod
     def poll(cls, context: Context) -> bool:
         if context is None:
             return False
-        return len(get_selected_primitive(context)) > 0
+        return get_selection_summary(context).has_primitive
 
     def execute(self, context: Context) -> set[str]:
-        sel = get_selected_primitive(context)
-        apply_count = 0
+        # Check if the MPR modifier is enabled on the object
+        sel = [obj for obj in get_selected_primitive(context) if is_mpr_enabled(obj.modifiers)]
+        node_groups = {get_mpr_modifier(obj.modifiers).node_group for obj in sel}
+        meshes = bake_primitive_meshes(context, sel, self.share_mesh)
+        swap_meshes(sel, meshes)
         for obj in sel:
-            apply_count += 1 if self._apply_mesh(obj, context) else 0
+            self._apply_mesh(obj)
+        # Node groups no longer used by any modifier
+        remove_if_unused(node_groups)
+
+        apply_count = len(sel)
         apply_count_str = str(apply_count) if apply_count > 0 else "no"
-        self.report(
-            {"INFO"}, f"Apply MPR-Modifier to Mesh: {apply_count_str} object(s) applied."
-        )
+        msg = f"Apply MPR-Modifier to Mesh: {apply_count_str} object(s) applied."
+        if self.share_mesh and apply_count > 0:
+            unique = {m.as_pointer(): m for m in meshes}
+            saved = sum(estimate_mesh_size(m) for m in meshes) - sum(
+                estimate_mesh_size(m) for m in unique.values()
+            )
+            msg += f" ({len(unique)}/{apply_count} unique mesh(es), {format_size(saved)} saved)"
+        self.report({"INFO"}, msg)
 
         return {"FINISHED"}
 
@@ -43,32 +192,8 @@ class ApplyMesh_Operator(ApplyMesh_Base):
     bl_idname = f"object.{MODERN_PRIMITIVE_PREFIX}_apply_mesh"
     bl_label = "Apply MPR-Geometry node to Mesh"
 
-    def _apply_mesh(self, obj: Object, context: Context) -> bool:
-        # Check if the MPR modifier is enabled on the object
-        if not is_mpr_enabled(obj.modifiers):
-            return False
-
-        tmp_obj = obj.copy()
-
-        # Copy only modifier 0 (MPR)
-        for i in range(len(tmp_obj.modifiers) - 1, 0, -1):
-            tmp_obj.modifiers.remove(tmp_obj.modifiers[i])
-
-        context.collection.objects.link(tmp_obj)
-
-        deps = context.evaluated_depsgraph_get()
-        eval_obj = tmp_obj.evaluated_get(deps)
-        mesh = bpy.data.meshes.new_from_object(eval_obj)
-
-        mesh_name = obj.data.name
-        obj.data.name = f"__to_delete_{obj.name}"
-        mesh.name = mesh_name
-        obj.data = mesh
-
-        mpr_mod = get_mpr_modifier(obj.modifiers)
-        disable_modifier(mpr_mod)
-        bpy.data.objects.remove(tmp_obj)
-        return True
+    def _apply_mesh(self, obj: Object) -> None:
+        disable_modifier(get_mpr_modifier(obj.modifiers))
 
 
 class ApplyAndRemoveMesh_Operator(ApplyMesh_Base):
@@ -79,25 +204,9 @@ class ApplyAndRemoveMesh_Operator(ApplyMesh_Base):
     bl_idname = f"object.{MODERN_PRIMITIVE_PREFIX}_apply_and_remove_mesh"
     bl_label = "Apply and Remove MPR-Geometry node"
 
-    def _apply_mesh(self, obj: Object, context: Context) -> bool:
-        if not is_mpr_enabled(obj.modifiers):
-            return False
-
-        mpr_mod = get_mpr_modifier(obj.modifiers)
-        if not mpr_mod:
-            return False
-
-        original_active = context.view_layer.objects.active
-        context.view_layer.objects.active = obj
-
-        try:
-            bpy.ops.object.modifier_apply(modifier=mpr_mod.name)
-            return True
-        except Exception as e:
-            self.report({"INFO"}, f"Failed to apply modifier: {e}")
-            return False
-        finally:
-            context.view_layer.objects.active = original_active
+    def _apply_mesh(self, obj: Object) -> None:
+        obj.modifiers.remove(get_mpr_modifier(obj.modifiers))
+        PRIMITIVE_REGISTRY.invalidate(obj)
 
 
 def register() -> None:
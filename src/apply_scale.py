@@ -1,57 +1,115 @@
 import math
-from collections.abc import Callable
-from typing import Any, ClassVar, cast
+from collections import Counter
+from collections.abc import Callable, Sequence
+from typing import ClassVar
 
+import numpy as np
 from bpy.props import BoolProperty
-from bpy.types import Context, NodesModifier, Object, Operator
+from bpy.types import Context, NodeGroup, Object, Operator
 from bpy.utils import register_class, unregister_class
 from mathutils import Quaternion, Vector
 
 from . import primitive_prop as prop
-from .util.aux_func import get_mpr_modifier, get_selected_primitive
-from .util.aux_math import is_close, is_uniform
-from .util.aux_node import (
-    get_interface_value,
-    modify_interface_value,
-    set_interface_value,
-    swap_interface_value,
+from .util.aux_func import (
+    get_mpr_modifier,
+    get_selected_primitive,
+    get_selection_summary,
+    group_by_node_group,
 )
+from .util.param_batch import ParamBatch
+from .util.vertex_transform import transform_vertices
 from .constants import MODERN_PRIMITIVE_PREFIX, Type
-from .exception import DGInvalidInput
 from .version import TypeAndVersion, get_primitive_version
 
-WarnProc = Callable[[str], None]
-
-
-def _xyz_scale(obj: Object, mod: NodesModifier, max_index: int) -> None:
-    SIZE_ENT = (prop.SizeX.name, prop.SizeY.name, prop.SizeZ.name)
-
-    for i in range(max_index):
-        scale_val = abs(obj.scale[i])
-        modify_interface_value(mod, SIZE_ENT[i], lambda val, s=scale_val: val * s)
-
-
-def _abs_sum(*args) -> Any:
-    s = abs(args[0])
-    for a in args[1:]:
-        s += abs(a)
-    return s
-
-
-def _abs_average(*args) -> Any:
-    return _abs_sum(*args) / len(args)
-
-
-def _abs_average_xy(vec: Vector) -> float:
-    return _abs_average(vec.x, vec.y)
+# Same tolerance as aux_math.is_close
+REL_TOL = 1e-6
+
+
+def _is_close(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Elementwise math.isclose (symmetric, unlike np.isclose)
+    return np.abs(a - b) <= REL_TOL * np.maximum(np.abs(a), np.abs(b))
+
+
+class ScaleBatch(ParamBatch):
+    """Parameters of the primitives sharing one node group, as arrays.
+    The rules of PROC_MAP compute the new values of all the objects at once,
+    and the values are written back to the modifiers in write()"""
+
+    def __init__(self, objs: Sequence[Object], node_group: NodeGroup, strict: bool):
+        super().__init__([get_mpr_modifier(obj.modifiers) for obj in objs], node_group)
+        self.objs = objs
+        self._strict = strict
+        # (n, 3)
+        self.scale = np.array([obj.scale for obj in objs], dtype=np.float64)
+        self.abs_scale = np.abs(self.scale)
+
+        # Objects to be rotated 180 degrees around the X axis
+        self.flip = np.zeros(len(objs), dtype=bool)
+        # Objects that can't be processed (message, or None)
+        self.errors: list[str | None] = [None] * len(objs)
+        self.warnings: Counter[str] = Counter()
+
+    @property
+    def abs_average_xy(self) -> np.ndarray:
+        return self.abs_scale[:, :2].mean(axis=1)
+
+    @property
+    def abs_average(self) -> np.ndarray:
+        return self.abs_scale.mean(axis=1)
+
+    def mul(self, names: Sequence[str], factor: np.ndarray) -> None:
+        """Multiply each parameter by factor (per object, or per object and axis)"""
+        for name in names:
+            val = self.get(name)
+            if factor.ndim < val.ndim:
+                factor = factor.reshape(-1, *([1] * (val.ndim - 1)))
+            self.set(name, val * factor)
+
+    def swap_where(self, name0: str, name1: str, mask: np.ndarray) -> None:
+        val0 = self.get(name0)
+        val1 = self.get(name1)
+        self.set(name0, np.where(mask, val1, val0))
+        self.set(name1, np.where(mask, val0, val1))
+
+    def fail(self, mask: np.ndarray, msg: str) -> None:
+        for i in np.flatnonzero(mask):
+            if self.errors[i] is None:
+                self.errors[i] = msg
+
+    def warn(self, mask: np.ndarray, msg: str) -> None:
+        if self._strict:
+            self.fail(mask, msg)
+        else:
+            self.warnings[msg] += int(np.count_nonzero(mask & self.ok))
+
+    @property
+    def ok(self) -> np.ndarray:
+        return np.array([e is None for e in self.errors], dtype=bool)
+
+    def write(self, mask: np.ndarray | None = None) -> None:
+        # Objects with an error are left untouched
+        ok = self.ok
+        super().write(ok if mask is None else ok & mask)
+
+
+def _check_uniform(b: ScaleBatch) -> None:
+    sc = b.scale
+    b.warn(
+        ~(_is_close(sc[:, 0], sc[:, 1]) & _is_close(sc[:, 0], sc[:, 2])),
+        "Object is not uniformly scaled",
+    )
 
 
-def _abs_average_vec(vec: Vector) -> float:
-    return _abs_average(*vec)
+def _check_xy_same(b: ScaleBatch) -> None:
+    same = _is_close(b.scale[:, 0], b.scale[:, 1])
+    b.warn(~same, "Object XY scale is not equal")
+    b.warn(same & (b.scale[:, 0] < 0), "Negative XY scaling can change shape")
 
 
-def _is_xy_same(vec: Vector) -> bool:
-    return is_close(vec.x, vec.y)
+def _scale_z(b: ScaleBatch, names: Sequence[str], flip: bool) -> None:
+    b.mul(names, b.abs_scale[:, 2])
+    if flip:
+        b.flip |= b.scale[:, 2] < 0
 
 
 def _rotate_x180(obj: Object) -> None:
@@ -64,176 +122,120 @@ def _rotate_x180(obj: Object) -> None:
     obj.rotation_mode = rot_mode
 
 
-def _check_xy_same(vec: Vector, warn: WarnProc) -> None:
-    if not _is_xy_same(vec):
-        warn(f"Object XY scale is not equal: ({vec.x:.8f}, {vec.y:.8f})")
-    elif vec.x < 0:
-        warn("Negative XY scaling can change shape")
+def proc_cube(b: ScaleBatch) -> None:
+    b.mul([prop.Size.name], b.abs_scale)
 
 
-def proc_cube(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
-    sc = Vector(
-        (
-            abs(obj.scale[0]),
-            abs(obj.scale[1]),
-            abs(obj.scale[2]),
-        )
-    )
-    vec = get_interface_value(mod, prop.Size.name)
-    for i in range(3):
-        vec[i] *= sc[i]
-    set_interface_value(mod, (prop.Size.name, vec))
-
-
-def proc_cone(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
+def proc_cone(b: ScaleBatch) -> None:
     # -- xy scaling --
-    _check_xy_same(obj.scale, warn)
-
-    scale_val = _abs_average_xy(obj.scale)
-    modify_interface_value(mod, prop.TopRadius.name, lambda val: val * scale_val)
-    modify_interface_value(mod, prop.BottomRadius.name, lambda val: val * scale_val)
-
+    _check_xy_same(b)
+    b.mul([prop.TopRadius.name, prop.BottomRadius.name], b.abs_average_xy)
     # -- z scaling --
-    modify_interface_value(mod, prop.Height.name, lambda val: val * abs(obj.scale.z))
-    if obj.scale.z < 0:
-        _rotate_x180(obj)
-
+    _scale_z(b, [prop.Height.name], True)
 
-def proc_grid(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
-    _xyz_scale(obj, mod, 2)
 
+def proc_grid(b: ScaleBatch) -> None:
+    b.mul([prop.SizeX.name], b.abs_scale[:, 0])
+    b.mul([prop.SizeY.name], b.abs_scale[:, 1])
 
-def proc_torus(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
-    if not is_uniform(obj.scale):
-        warn("Object is not uniformly scaled")
 
-    scale_val = _abs_average_vec(obj.scale)
-    modify_interface_value(mod, prop.Radius.name, lambda val: val * scale_val)
-    modify_interface_value(mod, prop.RingRadius.name, lambda val: val * scale_val)
+def proc_torus(b: ScaleBatch) -> None:
+    _check_uniform(b)
+    b.mul([prop.Radius.name, prop.RingRadius.name], b.abs_average)
 
 
-def proc_cylinder(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
+def proc_cylinder(b: ScaleBatch) -> None:
     # -- xy scaling --
-    _check_xy_same(obj.scale, warn)
-
-    scale_val = _abs_average_xy(obj.scale)
-    modify_interface_value(mod, prop.Radius.name, lambda val: val * scale_val)
-
+    _check_xy_same(b)
+    b.mul([prop.Radius.name], b.abs_average_xy)
     # -- z scaling --
-    scale_val = abs(obj.scale.z)
-    modify_interface_value(mod, prop.Height.name, lambda val: val * scale_val)
-    if obj.scale.z < 0:
-        _rotate_x180(obj)
-
+    _scale_z(b, [prop.Height.name], True)
 
-def proc_uvsphere(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
-    proc_icosphere(obj, mod, warn)
 
-
-def proc_icosphere(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
+def proc_icosphere(b: ScaleBatch) -> None:
     # Generate an error if scaling is not uniform
-    if not is_uniform(obj.scale):
-        warn("Object is not uniformly scaled")
-
-    scale_val = _abs_average_vec(obj.scale)
-    modify_interface_value(mod, prop.Radius.name, lambda val: val * scale_val)
+    _check_uniform(b)
+    b.mul([prop.Radius.name], b.abs_average)
 
 
-def proc_tube(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
-    _check_xy_same(obj.scale, warn)
-
+def proc_tube(b: ScaleBatch) -> None:
+    _check_xy_same(b)
     # -- xy scaling --
-    scale_val = _abs_average_xy(obj.scale)
-    modify_interface_value(mod, prop.OuterRadius.name, lambda val: val * scale_val)
-    modify_interface_value(mod, prop.InnerRadius.name, lambda val: val * scale_val)
-
+    b.mul([prop.OuterRadius.name, prop.InnerRadius.name], b.abs_average_xy)
     # -- z scaling --
-    scale_val = abs(obj.scale.z)
-    modify_interface_value(mod, prop.Height.name, lambda val: val * scale_val)
-    if obj.scale.z < 0:
-        _rotate_x180(obj)
-
+    _scale_z(b, [prop.Height.name], True)
 
-def proc_gear(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
-    _check_xy_same(obj.scale, warn)
 
+def proc_gear(b: ScaleBatch) -> None:
+    _check_xy_same(b)
     # -- xy scaling --
-    scale_val = _abs_average_xy(obj.scale)
-    modify_interface_value(mod, prop.OuterRadius.name, lambda val: val * scale_val)
-    modify_interface_value(mod, prop.InnerRadius.name, lambda val: val * scale_val)
-    modify_interface_value(mod, prop.InnerCircleRadius.name, lambda val: val * scale_val)
-    modify_interface_value(mod, prop.FilletRadius.name, lambda val: val * scale_val)
-
+    b.mul(
+        [
+            prop.OuterRadius.name,
+            prop.InnerRadius.name,
+            prop.InnerCircleRadius.name,
+            prop.FilletRadius.name,
+        ],
+        b.abs_average_xy,
+    )
     # -- z scaling --
-    scale_val = abs(obj.scale.z)
-    modify_interface_value(mod, prop.Height.name, lambda val: val * scale_val)
-
+    _scale_z(b, [prop.Height.name], False)
 
-def proc_spring(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
-    if obj.scale.x < 0 or obj.scale.y < 0 or obj.scale.z < 0:
-        raise DGInvalidInput("Negative scaling is not supported")
-    if not is_uniform(obj.scale):
-        warn("Object is not uniformly scaled")
 
-    scale_val = _abs_average_vec(obj.scale)
-    modify_interface_value(mod, prop.BottomRadius.name, lambda val: val * scale_val)
-    modify_interface_value(mod, prop.TopRadius.name, lambda val: val * scale_val)
-    modify_interface_value(mod, prop.RingRadius.name, lambda val: val * scale_val)
-    modify_interface_value(mod, prop.Height.name, lambda val: val * scale_val)
-
-
-def proc_dcube(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
-    modify_interface_value(mod, prop.MinX.name, lambda val: val * abs(obj.scale.x))
-    modify_interface_value(mod, prop.MaxX.name, lambda val: val * abs(obj.scale.x))
-    if obj.scale.x < 0:
-        swap_interface_value(mod, prop.MinX.name, prop.MaxX.name)
-
-    modify_interface_value(mod, prop.MinY.name, lambda val: val * abs(obj.scale.y))
-    modify_interface_value(mod, prop.MaxY.name, lambda val: val * abs(obj.scale.y))
-    if obj.scale.y < 0:
-        swap_interface_value(mod, prop.MinY.name, prop.MaxY.name)
+def proc_spring(b: ScaleBatch) -> None:
+    b.fail((b.scale < 0).any(axis=1), "Negative scaling is not supported")
+    _check_uniform(b)
+    b.mul(
+        [prop.BottomRadius.name, prop.TopRadius.name, prop.RingRadius.name, prop.Height.name],
+        b.abs_average,
+    )
 
-    modify_interface_value(mod, prop.MinZ.name, lambda val: val * abs(obj.scale.z))
-    modify_interface_value(mod, prop.MaxZ.name, lambda val: val * abs(obj.scale.z))
-    if obj.scale.z < 0:
-        swap_interface_value(mod, prop.MinZ.name, prop.MaxZ.name)
 
+def proc_dcube(b: ScaleBatch) -> None:
+    for i, (min_name, max_name) in enumerate(
+        (
+            (prop.MinX.name, prop.MaxX.name),
+            (prop.MinY.name, prop.MaxY.name),
+            (prop.MinZ.name, prop.MaxZ.name),
+        )
+    ):
+        b.mul([min_name, max_name], b.abs_scale[:, i])
+        b.swap_where(min_name, max_name, b.scale[:, i] < 0)
 
-def proc_capsule(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
-    if not is_uniform(obj.scale):
-        warn("Object is not uniformly scaled")
 
+def proc_capsule(b: ScaleBatch) -> None:
+    _check_uniform(b)
     # -- xy scaling --
-    scale_val = _abs_average_xy(obj.scale)
-    modify_interface_value(mod, prop.Radius.name, lambda val: val * scale_val)
-
+    b.mul([prop.Radius.name], b.abs_average_xy)
     # -- z scaling --
-    scale_val = abs(obj.scale.z)
-    modify_interface_value(mod, prop.Height.name, lambda val: val * scale_val)
-
-
-def proc_quadsphere(obj: Object, mod: NodesModifier, warn: WarnProc) -> None:
-    proc_icosphere(obj, mod, warn)
+    _scale_z(b, [prop.Height.name], False)
 
 
-apply_proc = Callable[[Object, NodesModifier, WarnProc], None]
+apply_proc = Callable[[ScaleBatch], None]
 PROC_MAP: dict[Type, apply_proc] = {
     Type.Cube: proc_cube,
     Type.Cone: proc_cone,
     Type.Grid: proc_grid,
     Type.Torus: proc_torus,
     Type.Cylinder: proc_cylinder,
-    Type.UVSphere: proc_uvsphere,
+    Type.UVSphere: proc_icosphere,
     Type.ICOSphere: proc_icosphere,
     Type.Tube: proc_tube,
     Type.Gear: proc_gear,
     Type.Spring: proc_spring,
     Type.DeformableCube: proc_dcube,
     Type.Capsule: proc_capsule,
-    Type.QuadSphere: proc_quadsphere,
+    Type.QuadSphere: proc_icosphere,
 }
 
 
+def _names_of(objs: Sequence[Object], max_count: int = 3) -> str:
+    names = ", ".join(obj.name for obj in objs[:max_count])
+    if len(objs) > max_count:
+        names += ", ..."
+    return names
+
+
 class ApplyScale_Operator(Operator):
     """Apply scaling to ModernPrimitive Object"""
 
@@ -245,50 +247,59 @@ class ApplyScale_Operator(Operator):
 
     @classmethod
     def poll(cls, context: Context | None) -> bool:
-        return len(get_selected_primitive(context)) > 0
-
-    def warn(self, msg: str) -> None:
-        self.report({"WARNING"}, msg)
-
-    def warn_as_error(self, msg: str) -> None:
-        raise DGInvalidInput(msg)
+        return get_selection_summary(context).has_primitive
+
+    def _report_summary(
+        self, n_applied: int, warnings: Counter[str], errors: dict[str, list[Object]]
+    ) -> None:
+        for msg, objs in errors.items():
+            self.report({"ERROR"}, f"{msg}: {len(objs)} object(s) ({_names_of(objs)})")
+        for msg, count in warnings.items():
+            if count > 0:
+                self.report({"WARNING"}, f"{msg}: {count} object(s)")
+        self.report({"INFO"}, f"Scale applied to {n_applied} object(s)")
 
     def execute(self, context: Context | None) -> set[str]:
-        warn = self.warn if not self.strict else self.warn_as_error
-        objs = get_selected_primitive(context)
-        for obj in objs:
-            typ_ver = TypeAndVersion.get_type_and_version(
-                get_mpr_modifier(obj.modifiers).node_group.name
-            )
+        warnings: Counter[str] = Counter()
+        errors: dict[str, list[Object]] = {}
+        # Objects whose vertices should be scaled, and the scale
+        scaled: list[tuple[Object, Vector]] = []
+
+        for ng, objs in group_by_node_group(get_selected_primitive(context)).values():
+            # The type and version are resolved once per node group
+            typ_ver = TypeAndVersion.get_type_and_version(ng.name)
             if typ_ver is None:
-                self.report({"WARNING"}, f"unknown primitive type: {obj.name}")
-            else:
-                # For now, make sure it doesn't work unless it's the latest version
-                if get_primitive_version(typ_ver.type) > typ_ver.version:
-                    self.report(
-                        {"ERROR"},
-                        """Primitive version is not up to date
+                errors.setdefault("unknown primitive type", []).extend(objs)
+                continue
+            # For now, make sure it doesn't work unless it's the latest version
+            if get_primitive_version(typ_ver.type) > typ_ver.version:
+                errors.setdefault(
+                    """Primitive version is not up to date
 (Unfortunately, there is no way to update automatically at this time,
  so please convert it manually.)""",
-                    )
-                    continue
-
-                mod = get_mpr_modifier(obj.modifiers)
-                mod = cast(NodesModifier, mod)
-                try:
-                    PROC_MAP[typ_ver.type](obj, mod, warn)
-                    # Since the node group value has been changed, update it here
-                    mod.node_group.interface_update(context)
-                    old_scale = obj.scale.copy()
-                    # reset scale value
-                    obj.scale = Vector((1, 1, 1))
-                    for v in obj.data.vertices:
-                        v.co *= old_scale
-
-                except DGInvalidInput as e:
+                    [],
+                ).extend(objs)
+                continue
+
+            batch = ScaleBatch(objs, ng, self.strict)
+            PROC_MAP[typ_ver.type](batch)
+            batch.write()
+            warnings += batch.warnings
+            for obj, err, flip in zip(objs, batch.errors, batch.flip, strict=True):
+                if err is not None:
                     # An error has occurred, notify the contents
-                    self.report({"ERROR"}, f"{obj.name}: {e!s}")
-
+                    errors.setdefault(err, []).append(obj)
+                    continue
+                if flip:
+                    _rotate_x180(obj)
+                scaled.append((obj, obj.scale.copy()))
+                # reset scale value
+                obj.scale = Vector((1, 1, 1))
+            batch.update(context)
+
+        # Scale the vertices of all the objects at once
+        transform_vertices([obj.data for obj, _ in scaled], scale=[sc for _, sc in scaled])
+        self._report_summary(len(scaled), warnings, errors)
         return {"FINISHED"}
 
 
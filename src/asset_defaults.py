@@ -0,0 +1,137 @@
+"""Parameter values of the asset objects, by type: (asset version, {name: value}).
+Generated by tools/dump_asset_defaults.py, do not edit
+"""
+
+from typing import Any
+
+ASSET_DEFAULTS: dict[str, tuple[int, dict[str, Any]]] = {
+    "Cube": (
+        20,
+        {
+            "Division X": 1,
+            "Division Y": 1,
+            "Division Z": 1,
+            "Global Division": 1.0,
+            "Size": [1.0, 1.0, 1.0],
+        },
+    ),
+    "Cone": (
+        20,
+        {
+            "Bottom Radius": 2.0,
+            "Div Circle": 16,
+            "Div Fill": 1,
+            "Div Side": 1,
+            "Height": 1.0,
+            "Top Radius": 1.0,
+        },
+    ),
+    "Grid": (
+        20,
+        {
+            "Division X": 1,
+            "Division Y": 1,
+            "Global Division": 1,
+            "Size X": 1.0,
+            "Size Y": 1.0,
+        },
+    ),
+    "Torus": (
+        20,
+        {
+            "Div Circle": 16,
+            "Div Ring": 8,
+            "Radius": 1.0,
+            "Ring Radius": 0.5,
+        },
+    ),
+    "Cylinder": (
+        20,
+        {
+            "Div Circle": 16,
+            "Div Fill": 1,
+            "Div Side": 1,
+            "Height": 1.0,
+            "Radius": 1.0,
+        },
+    ),
+    "UVSphere": (
+        20,
+        {
+            "Div Circle": 16,
+            "Div Ring": 8,
+            "Radius": 1.0,
+        },
+    ),
+    "ICOSphere": (
+        20,
+        {
+            "Radius": 1.0,
+            "Subdivision": 2,
+        },
+    ),
+    "Tube": (
+        21,
+        {
+            "Div Circle": 16,
+            "Div Side": 1,
+            "Height": 1.0,
+            "Inner Radius": 0.5,
+            "Outer Radius": 1.0,
+        },
+    ),
+    "Gear": (
+        20,
+        {
+            "Fillet Count": 1,
+            "Fillet Radius": 0.05000000074505806,
+            "Height": 0.25,
+            "Inner Radius": 0.5,
+            "InnerCircle Division": 16,
+            "InnerCircle Radius": 0.5,
+            "Num Blades": 16,
+            "Outer Radius": 1.0,
+            "Twist": 0.0,
+        },
+    ),
+    "Spring": (
+        20,
+        {
+            "Bottom Radius": 1.0,
+            "Div Circle": 16,
+            "Div Ring": 8,
+            "Height": 1.0,
+            "Ring Radius": 0.10000000149011612,
+            "Rotations": 3.0,
+            "Top Radius": 0.5,
+        },
+    ),
+    "DeformableCube": (
+        20,
+        {
+            "Max X": 1.0,
+            "Max Y": 1.0,
+            "Max Z": 1.0,
+            "Min X": 1.0,
+            "Min Y": 1.0,
+            "Min Z": 1.0,
+        },
+    ),
+    "Capsule": (
+        20,
+        {
+            "Div Cap": 8,
+            "Div Circle": 16,
+            "Div Side": 1,
+            "Height": 2.0,
+            "Radius": 1.0,
+        },
+    ),
+    "QuadSphere": (
+        20,
+        {
+            "Radius": 1.0,
+            "Subdivision": 2,
+        },
+    ),
+}
@@ -0,0 +1,288 @@
+from collections.abc import Iterable
+from typing import ClassVar
+
+import bpy
+from bpy.app.handlers import persistent
+from bpy.types import BooleanModifier, Collection, Context, Depsgraph, Object, Scene
+
+from .util.aux_func import (
+    get_addon_preferences,
+    get_mpr_modifier,
+    is_modern_primitive,
+    make_primitive_property_name,
+)
+from .util.aux_node import interface_key
+
+# Entry name to save the original state of the Boolean modifiers switched to the proxy
+#   {modifier name: {"solver": str, "show_viewport": bool}}
+ENTRY_NAME = make_primitive_property_name("boolean_proxy")
+
+# Interval (in seconds) to check whether the gizmo drag has finished
+GIZMO_IDLE_TIME = 0.3
+# Modal operator running while a gizmo is dragged
+GIZMO_TWEAK_IDS = frozenset({"GIZMOGROUP_OT_gizmo_tweak", "gizmogroup.gizmo_tweak"})
+
+SOURCE_MODAL = "modal"
+SOURCE_GIZMO = "gizmo"
+
+proxy_mode_list = (
+    ("NONE", "None", "Always evaluate the Boolean modifiers fully"),
+    ("FAST", "Fast Solver", "Use the Fast solver while a cutter is being edited"),
+    ("SUSPEND", "Suspend", "Disable the Boolean modifiers while a cutter is being edited"),
+)
+
+# (target object name, modifier name)
+BooleanRef = tuple[str, str]
+
+
+def _operands(mod: BooleanModifier) -> list[Object]:
+    if mod.operand_type == "OBJECT":
+        return [] if mod.object is None else [mod.object]
+    return [] if mod.collection is None else list(mod.collection.all_objects)
+
+
+class CutterIndex:
+    """Index from a cutter object to the Boolean modifiers using it.
+    Built once when it's first needed, then only the updated objects
+    (and the targets of updated collections) are re-indexed"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self._built = False
+        # cutter session_uid -> Boolean modifiers
+        self._users: dict[int, set[BooleanRef]] = {}
+        # target name -> cutter session_uids
+        self._cutters: dict[str, set[int]] = {}
+        # collection session_uid -> names of the targets using it as the operand
+        self._collections: dict[int, set[str]] = {}
+
+    def _remove_target(self, name: str) -> None:
+        for uid in self._cutters.pop(name, ()):
+            refs = self._users.get(uid)
+            if refs is not None:
+                refs.difference_update([r for r in refs if r[0] == name])
+        for names in self._collections.values():
+            names.discard(name)
+
+    def _add_target(self, obj: Object) -> None:
+        for mod in obj.modifiers:
+            if mod.type != "BOOLEAN":
+                continue
+            if mod.operand_type == "COLLECTION" and mod.collection is not None:
+                self._collections.setdefault(mod.collection.session_uid, set()).add(obj.name)
+            for cutter in _operands(mod):
+                self._users.setdefault(cutter.session_uid, set()).add((obj.name, mod.name))
+                self._cutters.setdefault(obj.name, set()).add(cutter.session_uid)
+
+    def update_object(self, obj: Object) -> None:
+        self._remove_target(obj.name)
+        self._add_target(obj)
+
+    def on_updates(self, depsgraph: Depsgraph) -> None:
+        # Nothing to maintain until it's built
+        if not self._built:
+            return
+        for upd in depsgraph.updates:
+            id_data = upd.id.original
+            if isinstance(id_data, Object):
+                self.update_object(id_data)
+            elif isinstance(id_data, Collection):
+                for name in list(self._collections.get(id_data.session_uid, ())):
+                    obj = bpy.data.objects.get(name)
+                    if obj is not None:
+                        self.update_object(obj)
+
+    def users(self, cutter: Object) -> list[tuple[Object, BooleanModifier]]:
+        """Boolean modifiers which use the cutter"""
+        if not self._built:
+            for obj in bpy.data.objects:
+                self._add_target(obj)
+            self._built = True
+
+        ret: list[tuple[Object, BooleanModifier]] = []
+        for name, mod_name in self._users.get(cutter.session_uid, ()):
+            obj = bpy.data.objects.get(name)
+            mod = None if obj is None else obj.modifiers.get(mod_name)
+            # The entry may be stale (e.g. renamed), so check it here
+            if mod is not None and mod.type == "BOOLEAN" and cutter in _operands(mod):
+                ret.append((obj, mod))
+        return ret
+
+
+def restore_boolean_state(obj: Object) -> None:
+    saved = obj.get(ENTRY_NAME)
+    if saved is None:
+        return
+    for mod_name, state in saved.items():
+        mod = obj.modifiers.get(mod_name)
+        if mod is not None and mod.type == "BOOLEAN":
+            mod.solver = state["solver"]
+            mod.show_viewport = bool(state["show_viewport"])
+    del obj[ENTRY_NAME]
+
+
+class BooleanProxy:
+    """Switches the Boolean modifiers using the cutters to a cheap state,
+    while any of the sources (modal edit, gizmo) is editing them"""
+
+    def __init__(self):
+        self._sources: set[str] = set()
+        # Names of the objects that have modifiers switched
+        self._targets: set[str] = set()
+
+    def is_active(self, source: str) -> bool:
+        return source in self._sources
+
+    def begin(self, source: str, cutters: Iterable[Object], mode: str) -> None:
+        if mode == "NONE":
+            return
+        self._sources.add(source)
+        for cutter in cutters:
+            for obj, mod in CUTTER_INDEX.users(cutter):
+                saved = obj.get(ENTRY_NAME)
+                saved = {} if saved is None else saved.to_dict()
+                if mod.name in saved:
+                    continue
+                # Save the state also in the object, so that it can be restored
+                #   even if the file is saved while editing
+                saved[mod.name] = {"solver": mod.solver, "show_viewport": mod.show_viewport}
+                obj[ENTRY_NAME] = saved
+                if mode == "FAST":
+                    mod.solver = "FAST"
+                else:
+                    mod.show_viewport = False
+                self._targets.add(obj.name)
+
+    def end(self, source: str) -> None:
+        self._sources.discard(source)
+        if len(self._sources) > 0:
+            return
+        # Full evaluation resumes
+        for name in self._targets:
+            obj = bpy.data.objects.get(name)
+            if obj is not None:
+                restore_boolean_state(obj)
+        self._targets.clear()
+
+    def reset(self) -> None:
+        self._sources.clear()
+        self._targets.clear()
+
+
+CUTTER_INDEX = CutterIndex()
+BOOLEAN_PROXY = BooleanProxy()
+
+
+def get_proxy_mode(context: Context) -> str:
+    return get_addon_preferences(context).boolean_proxy_mode
+
+
+def is_gizmo_dragging(context: Context) -> bool:
+    return any(
+        op.bl_idname in GIZMO_TWEAK_IDS
+        for window in context.window_manager.windows
+        for op in window.modal_operators
+    )
+
+
+class GizmoWatcher:
+    """Detects the parameter changes of the active primitive by a gizmo drag,
+    and holds the proxy until the drag finishes.
+    Other changes (undo, N-panel, apply scale, LOD, ...) are only recorded"""
+
+    def __init__(self):
+        self._uid: int | None = None
+        self._key: tuple | None = None
+
+    def check(self, context: Context) -> None:
+        act = context.active_object
+        if act is None or not is_modern_primitive(act):
+            self._uid = None
+            return
+        key = interface_key(get_mpr_modifier(act.modifiers))
+        if act.session_uid != self._uid:
+            self._uid, self._key = act.session_uid, key
+            return
+        if key == self._key:
+            return
+        self._key = key
+        if (
+            BOOLEAN_PROXY.is_active(SOURCE_MODAL)
+            or BOOLEAN_PROXY.is_active(SOURCE_GIZMO)
+            or not is_gizmo_dragging(context)
+        ):
+            return
+
+        BOOLEAN_PROXY.begin(SOURCE_GIZMO, [act], get_proxy_mode(context))
+        if not bpy.app.timers.is_registered(_end_gizmo_proxy):
+            bpy.app.timers.register(_end_gizmo_proxy, first_interval=GIZMO_IDLE_TIME)
+
+
+def _end_gizmo_proxy() -> float | None:
+    if is_gizmo_dragging(bpy.context):
+        return GIZMO_IDLE_TIME
+    BOOLEAN_PROXY.end(SOURCE_GIZMO)
+    return None
+
+
+def _stop_gizmo_proxy() -> None:
+    if bpy.app.timers.is_registered(_end_gizmo_proxy):
+        bpy.app.timers.unregister(_end_gizmo_proxy)
+    BOOLEAN_PROXY.end(SOURCE_GIZMO)
+
+
+class LocalValue:
+    gizmo_watcher: ClassVar[GizmoWatcher] = GizmoWatcher()
+
+
+@persistent
+def on_deps(scene: Scene, depsgraph: Depsgraph) -> None:
+    CUTTER_INDEX.on_updates(depsgraph)
+    context: Context = bpy.context
+    if context.mode != "OBJECT":
+        return
+    LocalValue.gizmo_watcher.check(context)
+
+
+def _reset_all() -> None:
+    if bpy.app.timers.is_registered(_end_gizmo_proxy):
+        bpy.app.timers.unregister(_end_gizmo_proxy)
+    CUTTER_INDEX.clear()
+    BOOLEAN_PROXY.reset()
+    # Left over in the file or the undo step taken while editing
+    for obj in bpy.data.objects:
+        restore_boolean_state(obj)
+
+
+@persistent
+def on_undo(scene: Scene, *args) -> None:
+    # The data has been replaced (possibly with the proxy state)
+    _reset_all()
+
+
+@persistent
+def load_handler(new_file: str):
+    _reset_all()
+
+
+HANDLERS = (
+    (bpy.app.handlers.depsgraph_update_post, on_deps),
+    (bpy.app.handlers.undo_post, on_undo),
+    (bpy.app.handlers.redo_post, on_undo),
+    (bpy.app.handlers.load_post, load_handler),
+)
+
+
+def register() -> None:
+    for handler, fn in HANDLERS:
+        if fn not in handler:
+            handler.append(fn)
+
+
+def unregister() -> None:
+    _stop_gizmo_proxy()
+    for handler, fn in HANDLERS:
+        if fn in handler:
+            handler.remove(fn)
@@ -0,0 +1,160 @@
+from collections.abc import Callable, Sequence
+
+import numpy as np
+from bpy.types import Context, Object
+from mathutils import Vector
+
+from . import primitive_prop as P
+from .util.aux_func import get_mpr_modifier, group_by_node_group, is_mpr_enabled
+from .util.aux_math import MinMax
+from .util.param_batch import ParamBatch
+from .util.vertex_transform import read_coords
+from .constants import Type
+from .version import TypeAndVersion, get_primitive_version
+
+
+def _vec(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    return np.stack(np.broadcast_arrays(x, y, z), axis=-1)
+
+
+def _centered(half: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    return -half, half
+
+
+def _cube(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    return _centered(np.abs(b.get(P.Size.name)) / 2)
+
+
+def _deformable_cube(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    # Min values are the distances to the negative side
+    return (
+        -_vec(b.get(P.MinX.name), b.get(P.MinY.name), b.get(P.MinZ.name)),
+        _vec(b.get(P.MaxX.name), b.get(P.MaxY.name), b.get(P.MaxZ.name)),
+    )
+
+
+def _grid(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    return _centered(_vec(b.get(P.SizeX.name) / 2, b.get(P.SizeY.name) / 2, 0))
+
+
+def _cylinder(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    r = b.get(P.Radius.name)
+    return _centered(_vec(r, r, b.get(P.Height.name) / 2))
+
+
+def _cone(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    r = np.maximum(b.get(P.TopRadius.name), b.get(P.BottomRadius.name))
+    return _centered(_vec(r, r, b.get(P.Height.name) / 2))
+
+
+def _sphere(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    r = b.get(P.Radius.name)
+    return _centered(_vec(r, r, r))
+
+
+def _torus(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    ring = b.get(P.RingRadius.name)
+    r = b.get(P.Radius.name) + ring
+    return _centered(_vec(r, r, ring))
+
+
+def _tube(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    r = b.get(P.OuterRadius.name)
+    return _centered(_vec(r, r, b.get(P.Height.name) / 2))
+
+
+def _gear(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    r = np.maximum(b.get(P.OuterRadius.name), b.get(P.InnerRadius.name))
+    return _centered(_vec(r, r, b.get(P.Height.name) / 2))
+
+
+def _spring(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    ring = b.get(P.RingRadius.name)
+    r = np.maximum(b.get(P.TopRadius.name), b.get(P.BottomRadius.name)) + ring
+    return _centered(_vec(r, r, b.get(P.Height.name) / 2 + ring))
+
+
+def _capsule(b: ParamBatch) -> tuple[np.ndarray, np.ndarray]:
+    r = b.get(P.Radius.name)
+    return _centered(_vec(r, r, b.get(P.Height.name) / 2 + r))
+
+
+BOUNDS_PROC: dict[Type, Callable[[ParamBatch], tuple[np.ndarray, np.ndarray]]] = {
+    Type.Cube: _cube,
+    Type.Cone: _cone,
+    Type.Grid: _grid,
+    Type.Torus: _torus,
+    Type.Cylinder: _cylinder,
+    Type.UVSphere: _sphere,
+    Type.ICOSphere: _sphere,
+    Type.Tube: _tube,
+    Type.Gear: _gear,
+    Type.Spring: _spring,
+    Type.DeformableCube: _deformable_cube,
+    Type.Capsule: _capsule,
+    Type.QuadSphere: _sphere,
+}
+
+
+def _pivot_offset(b: ParamBatch, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    # The pivot (-1..1 in the box) is placed at the origin
+    try:
+        pivot = b.get(P.CornerRatio.name)
+    except KeyError:
+        return np.zeros_like(lo)
+    return -pivot * (hi - lo) / 2
+
+
+def _base_offset(objs: Sequence[Object]) -> np.ndarray:
+    # The shape is generated around the vertices of the base mesh
+    ret = np.zeros((len(objs), 3))
+    for i, obj in enumerate(objs):
+        coords = read_coords(obj.data)
+        if len(coords) > 0:
+            ret[i] = (coords.min(axis=0) + coords.max(axis=0)) / 2
+    return ret
+
+
+def _is_known(obj: Object, typ_ver: TypeAndVersion | None) -> bool:
+    return (
+        typ_ver is not None
+        and typ_ver.type in BOUNDS_PROC
+        and typ_ver.version <= get_primitive_version(typ_ver.type)
+        and is_mpr_enabled(obj.modifiers)
+    )
+
+
+def calc_primitive_bounds(
+    objs: Sequence[Object], context: Context | None = None
+) -> list[MinMax]:
+    """Bounding box of each primitive (in object space, the result of the MPR modifier).
+    Computed from the parameters without evaluating the node tree;
+    the evaluated bound_box is used only for unknown types / versions
+    (context: given to update the depsgraph before reading them)"""
+    ret: list[MinMax] = [MinMax(Vector(), Vector())] * len(objs)
+    index = {obj: i for i, obj in enumerate(objs)}
+    fallback: list[Object] = []
+    for ng_name, (ng, group_objs) in group_by_node_group(objs).items():
+        typ_ver = TypeAndVersion.get_type_and_version(ng_name)
+        known = [obj for obj in group_objs if _is_known(obj, typ_ver)]
+        fallback += [obj for obj in group_objs if not _is_known(obj, typ_ver)]
+        if len(known) == 0:
+            continue
+
+        batch = ParamBatch([get_mpr_modifier(obj.modifiers) for obj in known], ng)
+        try:
+            lo, hi = BOUNDS_PROC[typ_ver.type](batch)
+        except KeyError:
+            # A parameter is missing (renamed in this version?)
+            fallback += known
+            continue
+        offset = _pivot_offset(batch, lo, hi) + _base_offset(known)
+        for obj, v0, v1 in zip(known, lo + offset, hi + offset, strict=True):
+            ret[index[obj]] = MinMax(Vector(v0), Vector(v1))
+
+    if len(fallback) > 0:
+        if context is not None:
+            context.view_layer.update()
+        for obj, box in zip(fallback, MinMax.from_objs_bb(fallback), strict=True):
+            ret[index[obj]] = box
+    return ret
@@ -0,0 +1,221 @@
+import zlib
+from collections.abc import Iterable, Mapping, Sequence
+from typing import ClassVar
+
+import numpy as np
+from bpy.props import EnumProperty, FloatProperty, IntProperty
+from bpy.types import Context, Object, Operator
+from bpy.utils import register_class, unregister_class
+from mathutils import Vector
+
+from . import primitive as P
+from .util.aux_func import (
+    get_mpr_modifier,
+    get_selected_primitive,
+    get_selection_summary,
+    group_by_node_group,
+)
+from .util.param_batch import ParamBatch
+from .constants import MODERN_PRIMITIVE_PREFIX
+from .primitive_prop import PROP_LIST, Prop, PropType
+from .restore_default import reset_list
+from .topology import TOPOLOGY_PROPS, PolygonBudget
+from .version import TypeAndVersion
+
+# Properties that can be edited as numbers
+NUMERIC_TYPES = (float, int, Vector)
+# (min, max) of randomization
+Range = tuple[float, float]
+
+mode_list = (
+    ("SET", "Set", "Set the value"),
+    ("OFFSET", "Offset", "Add the value"),
+    ("SCALE", "Scale", "Multiply by the value"),
+    ("RANDOM", "Randomize", "Set a random value in the range"),
+    ("RANDOM_SCALE", "Random Scale", "Multiply by a random value in the range"),
+)
+tag_list = (
+    ("Size", "Size", "Parameters related to size"),
+    ("Division", "Division", "Parameters related to number of divisions"),
+    ("Other", "Other", "Other parameters"),
+)
+
+
+def is_numeric_prop(prop: Prop) -> bool:
+    return prop.type in NUMERIC_TYPES
+
+
+def filter_props(props: Iterable[Prop], tags: Iterable[PropType], axis: str) -> list[Prop]:
+    """Numeric props which have any of tags.
+    axis ("All", "Width" or "Height") further limits the props to the axis"""
+    tags = set(tags)
+    ret: list[Prop] = []
+    for p in props:
+        if not is_numeric_prop(p) or tags.isdisjoint(p.prop_type):
+            continue
+        match axis:
+            case "Width":
+                if not p.has_tag(PropType.Width):
+                    continue
+            case "Height":
+                if not p.has_tag(PropType.Height):
+                    continue
+        ret.append(p)
+    return ret
+
+
+def _make_rng(seed: int, *keys: str) -> np.random.Generator:
+    # The same seed always gives the same values for the same objects
+    #   (regardless of the selection order)
+    return np.random.default_rng([seed, *(zlib.crc32(k.encode()) for k in keys)])
+
+
+def _calc_values(
+    cur: np.ndarray, mode: str, value: float, rng_range: Range, rng: np.random.Generator
+) -> np.ndarray:
+    match mode:
+        case "SET":
+            return np.full_like(cur, value)
+        case "OFFSET":
+            return cur + value
+        case "SCALE":
+            return cur * value
+        case "RANDOM":
+            return rng.uniform(*rng_range, size=cur.shape)
+        case "RANDOM_SCALE":
+            return cur * rng.uniform(*rng_range, size=cur.shape)
+    raise ValueError(f"unknown mode: {mode}")
+
+
+def bulk_edit(  # noqa: PLR0913
+    context: Context,
+    objs: Iterable[Object],
+    props: Sequence[Prop],
+    mode: str,
+    *,
+    value: float = 0.0,
+    ranges: Range | Mapping[Prop, Range] = (0.0, 1.0),
+    seed: int = 0,
+    budget: PolygonBudget | None = None,
+) -> int:
+    """Edit the props of all the primitives at once.
+    Values are computed per node group with numpy,
+    then written in one pass and the node group is updated once.
+
+    Args:
+        props: Props to edit (props that a primitive doesn't have are ignored)
+        mode: "SET", "OFFSET", "SCALE", "RANDOM" or "RANDOM_SCALE"
+        value: Operand of SET / OFFSET / SCALE
+        ranges: (min, max) of randomization, common or per prop
+        seed: Seed of randomization
+        budget: Limits the values that exceed the polygon budget
+
+    Returns:
+        Number of objects edited
+    """
+    n_edited = 0
+    for ng_name, (ng, unsorted_objs) in group_by_node_group(objs).items():
+        typ_ver = TypeAndVersion.get_type_and_version(ng_name)
+        if typ_ver is None:
+            continue
+        prim = P.TYPE_TO_PRIMITIVE[typ_ver.type]
+        targets = prim.get_param_if(lambda p: p in props)
+        if len(targets) == 0:
+            continue
+
+        # Sorted, so that random values don't depend on the selection order
+        group_objs = sorted(unsorted_objs, key=lambda o: o.name)
+        batch = ParamBatch([get_mpr_modifier(o.modifiers) for o in group_objs], ng)
+        # Also the flags the estimates depend on (e.g. Fill of the cylinder)
+        inputs = prim.get_param_if(lambda p: is_numeric_prop(p) or p.type is bool)
+        before = {p.name: batch.get(p.name) for p in inputs}
+        for prop in targets:
+            rng_range = ranges[prop] if isinstance(ranges, Mapping) else ranges
+            rng = _make_rng(seed, ng_name, prop.name)
+            new_val = _calc_values(batch.get(prop.name), mode, value, rng_range, rng)
+            batch.set(prop.name, np.clip(new_val, *batch.limits(prop.name)))
+
+        topo_targets = [p for p in targets if p in TOPOLOGY_PROPS]
+        if budget is not None and len(topo_targets) > 0:
+            after = {p.name: batch.get(p.name) for p in inputs}
+            budget.limit(typ_ver.type, before, after, topo_targets)
+            for p in topo_targets:
+                batch.set(p.name, np.clip(after[p.name], *batch.limits(p.name)))
+        batch.write()
+        batch.update(context)
+        n_edited += len(group_objs)
+    return n_edited
+
+
+class BulkEdit_Operator(Operator):
+    """Edit parameters of all the selected primitives at once"""
+
+    bl_idname = f"object.{MODERN_PRIMITIVE_PREFIX}_bulk_edit"
+    bl_label = "Bulk Edit Primitive Parameters"
+    bl_options: ClassVar[set[str]] = {"REGISTER", "UNDO"}
+
+    mode: EnumProperty(name="Mode", items=mode_list, default="RANDOM_SCALE")
+    target: EnumProperty(
+        name="Target",
+        items=(
+            ("TAGS", "By Tags", "Parameters which have the tags"),
+            *((p.name, p.name, "") for p in PROP_LIST if is_numeric_prop(p) and p.prop_type),
+        ),
+        default="TAGS",
+    )
+    tags: EnumProperty(name="Tags", items=tag_list, options={"ENUM_FLAG"}, default={"Size"})
+    axis: EnumProperty(name="Axis", items=reset_list, default="All")
+    value: FloatProperty(name="Value", default=1.0)
+    random_min: FloatProperty(name="Min", default=0.8)
+    random_max: FloatProperty(name="Max", default=1.2)
+    seed: IntProperty(name="Seed", default=0, min=0)
+
+    @classmethod
+    def poll(cls, context: Context | None) -> bool:
+        return get_selection_summary(context).has_primitive
+
+    def draw(self, context: Context) -> None:
+        layout = self.layout
+        layout.prop(self, "target")
+        if self.target == "TAGS":
+            layout.row().prop(self, "tags")
+            layout.prop(self, "axis")
+
+        layout.prop(self, "mode")
+        if self.mode.startswith("RANDOM"):
+            row = layout.row(align=True)
+            row.prop(self, "random_min")
+            row.prop(self, "random_max")
+            layout.prop(self, "seed")
+        else:
+            layout.prop(self, "value")
+
+    def _target_props(self) -> list[Prop]:
+        if self.target == "TAGS":
+            return filter_props(PROP_LIST, (PropType[t] for t in self.tags), self.axis)
+        return [p for p in PROP_LIST if p.name == self.target]
+
+    def execute(self, context: Context) -> set[str]:
+        budget = PolygonBudget.from_preferences(context)
+        n = bulk_edit(
+            context,
+            get_selected_primitive(context),
+            self._target_props(),
+            self.mode,
+            value=self.value,
+            ranges=(self.random_min, self.random_max),
+            seed=self.seed,
+            budget=budget,
+        )
+        if budget is not None and budget.n_limited > 0:
+            self.report({"WARNING"}, budget.message())
+        self.report({"INFO"}, f"{n} Object(s) Edited")
+        return {"FINISHED"}
+
+
+def register() -> None:
+    register_class(BulkEdit_Operator)
+
+
+def unregister() -> None:
+    unregister_class(BulkEdit_Operator)
@@ -1,9 +1,10 @@
 from collections.abc import Iterable
+from typing import ClassVar
 
 import blf
 import bpy
 from bpy.app.handlers import persistent
-from bpy.types import Area, Context, Object, Region, Scene
+from bpy.types import Area, Context, Object, Region
 from mathutils import Color
 
 from .blf_aux import set_color as set_color_g
@@ -41,6 +42,17 @@ def default_draw_func(context: Context, font_id: int, text: str, color: Color) -
 
 textdraw_warning = TextDrawer("", draw_func=default_draw_func)
 
+# The objects being edited can only change with the mode or the active object
+MSGBUS_KEYS = (
+    (bpy.types.LayerObjects, "active"),
+    (bpy.types.Object, "mode"),
+)
+
+
+class LocalValue:
+    # Owner of the message bus subscriptions
+    msgbus_owner: ClassVar[object] = object()
+
 
 def make_warning_message(objs: Iterable[Object]) -> str:
     ret = "Editing ModernPrimitive's Mesh"
@@ -66,43 +78,57 @@ def get_primitive_mesh(context: Context) -> set[Object]:
     return ret
 
 
-@persistent
-def check_editmesh(scene: Scene):
+def _tag_redraw(context: Context) -> None:
+    # Called from the message bus, so context.area may not be set
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == "VIEW_3D":
+                area.tag_redraw()
+
+
+def check_editmesh() -> None:
     context = bpy.context
     if context.mode == "EDIT_MESH":
-        hud_color = HUDColor(context.preferences)
         pm = get_primitive_mesh(context)
         if len(pm) > 0:
+            hud_color = HUDColor(context.preferences)
             textdraw_warning.set_text(make_warning_message(pm))
             textdraw_warning.set_color(hud_color.white)
-            if textdraw_warning.show(context) and context.area is not None:
-                context.area.tag_redraw()
+            textdraw_warning.show(context)
+            _tag_redraw(context)
             return
-    if textdraw_warning.hide(context) and context.area is not None:
-        context.area.tag_redraw()
+    if textdraw_warning.hide(context):
+        _tag_redraw(context)
+
+
+def subscribe() -> None:
+    # Subscriptions are cleared when a file is loaded
+    bpy.msgbus.clear_by_owner(LocalValue.msgbus_owner)
+    for key in MSGBUS_KEYS:
+        bpy.msgbus.subscribe_rna(
+            key=key, owner=LocalValue.msgbus_owner, args=(), notify=check_editmesh
+        )
 
 
 @persistent
 def load_handler(new_file: str):
-    check_editmesh(bpy.context.scene)
+    subscribe()
+    check_editmesh()
 
 
-handler_deps_update = bpy.app.handlers.depsgraph_update_post
 handler_loadpost = bpy.app.handlers.load_post
 
 
 def register() -> None:
-    if check_editmesh not in handler_deps_update:
-        handler_deps_update.append(check_editmesh)
     if load_handler not in handler_loadpost:
         handler_loadpost.append(load_handler)
+    subscribe()
 
 
 def unregister() -> None:
     # if textdrawer is draweing something, hide it now
     textdraw_warning.hide(bpy.context)
 
-    if check_editmesh in handler_deps_update:
-        handler_deps_update.remove(check_editmesh)
+    bpy.msgbus.clear_by_owner(LocalValue.msgbus_owner)
     if load_handler in handler_loadpost:
         handler_loadpost.remove(load_handler)
@@ -23,6 +23,8 @@ MODERN_PRIMITIVE_TAG = "[ModernPrimitive]"
 # used by property-name, operator-id...
 MODERN_PRIMITIVE_PREFIX = "mpr"
 MODERN_PRIMITIVE_CATEGORY = "MPR"
+# Viewport-only copy of the MPR modifier (index 1) made by the division LOD
+DIVISION_LOD_MODIFIER_NAME = f"{MODERN_PRIMITIVE_PREFIX}_division_lod"
 ASSET_DIR_NAME = "assets"
 
 MIN_SIZE = 1e-5
@@ -6,6 +6,7 @@ from .convert_to_cone import ConvertToCone_Operator
 from .convert_to_torus import ConvertToTorus_Operator
 from .convert_to_tube import ConvertToTube_Operator
 from .convert_to_capsule import ConvertToCapsule_Operator
+from .convert_to_best import ConvertToBest_Operator
 from bpy.utils import register_class, unregister_class
 
 _CLS = (
@@ -17,6 +18,7 @@ _CLS = (
     ConvertToTorus_Operator,
     ConvertToTube_Operator,
     ConvertToCapsule_Operator,
+    ConvertToBest_Operator,
 )
 
 
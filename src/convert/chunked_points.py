@@ -0,0 +1,81 @@
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+
+from ..util.aux_math import BBox
+
+# Number of vertices processed at once.
+#   Memory used by the calculation stays at a few chunks regardless of the mesh size
+CHUNK_SIZE = 1 << 18
+
+
+class ChunkedPoints:
+    """Vertex coordinates transformed by a 3x3 matrix (raw[index] @ mat.T).
+    The transformed (float64) coordinates are only produced chunk by chunk,
+    the whole array is never allocated"""
+
+    def __init__(
+        self,
+        raw: np.ndarray,
+        mat: np.ndarray | None = None,
+        chunk_size: int = CHUNK_SIZE,
+        index: np.ndarray | None = None,
+    ):
+        # (N, 3) coordinates as read from the mesh (float32)
+        self._raw = raw
+        self._mat = np.identity(3) if mat is None else mat
+        self._chunk_size = chunk_size
+        # Use only these vertices of raw (None = all)
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._raw if self._index is None else self._index)
+
+    def raw_chunks(self) -> Iterator[np.ndarray]:
+        """Coordinates before the transformation"""
+        cs = self._chunk_size
+        for i in range(0, len(self), cs):
+            if self._index is None:
+                yield self._raw[i : i + cs]
+            else:
+                yield self._raw[self._index[i : i + cs]]
+
+    def chunks(self) -> Iterator[np.ndarray]:
+        for chunk in self.raw_chunks():
+            yield chunk @ self._mat.T
+
+    def _with_matrix(self, mat: np.ndarray):
+        return ChunkedPoints(self._raw, mat, self._chunk_size, self._index)
+
+    def transformed(self, mat: np.ndarray):
+        """Points further transformed by mat (no calculation is done here)"""
+        return self._with_matrix(mat @ self._mat)
+
+    def permuted(self, index_conv: Sequence[int]):
+        """Points whose axes are swapped like vector_conv()"""
+        return self._with_matrix(self._mat[list(index_conv)])
+
+    def bbox(self) -> BBox:
+        min_v = np.full(3, np.inf)
+        max_v = np.full(3, -np.inf)
+        for chunk in self.chunks():
+            min_v = np.minimum(min_v, chunk.min(axis=0))
+            max_v = np.maximum(max_v, chunk.max(axis=0))
+        return BBox.from_array(np.stack((min_v, max_v)))
+
+    def mean_and_cov(self) -> tuple[np.ndarray, np.ndarray]:
+        """Mean and covariance matrix (same as np.cov) accumulated chunk by chunk
+        (pairwise update of Welford's algorithm)"""
+        n = 0
+        mean = np.zeros(3)
+        m2 = np.zeros((3, 3))
+        for chunk in self.chunks():
+            n_b = len(chunk)
+            mean_b = chunk.mean(axis=0)
+            dev = chunk - mean_b
+            delta = mean_b - mean
+            n_ab = n + n_b
+            mean = mean + delta * (n_b / n_ab)
+            m2 = m2 + dev.T @ dev + np.outer(delta, delta) * (n * n_b / n_ab)
+            n = n_ab
+        return mean, m2 / max(n - 1, 1)
@@ -1,10 +1,10 @@
 import sys
-from collections.abc import Sequence
 from typing import cast
 
 from mathutils import Vector
 
 from ..util.aux_math import BBox, calc_sizediff
+from .chunked_points import ChunkedPoints
 from .common_type import IndexConv, SizeBase
 
 # Try three patterns and use the one with the most matching volume.
@@ -24,21 +24,41 @@ def vector_conv(source: Vector, index_conv=None) -> Vector:
     return Vector(source[index_conv[i]] for i in range(3))
 
 
-def calc_fittest_axis(
+def calc_fit_diff(
     primitive_size: type[SizeBase],
     bbox: BBox,
-    verts: Sequence[Vector],
+    verts: ChunkedPoints,
     target_vol: float,
-) -> IndexConv:
+    idx_conv: IndexConv,
+) -> float:
+    size = cast(SizeBase, primitive_size.build(bbox, verts, idx_conv))
+    vol_diff = abs(size.calc_volume() - target_vol)
+    sz_diff = calc_sizediff(size.calc_size(), vector_conv(bbox.size, idx_conv))
+    return vol_diff * VOLUME_DIFF_COEFF + sz_diff * SIZE_DIFF_COEFF
+
+
+# Returns the best axis pattern and its error value
+def calc_fittest_axis_and_diff(
+    primitive_size: type[SizeBase],
+    bbox: BBox,
+    verts: ChunkedPoints,
+    target_vol: float,
+) -> tuple[IndexConv, float]:
     best_diff: float = sys.float_info.max
     result: IndexConv = INDEX[0]
     for idx_conv in INDEX:
-        size = cast(SizeBase, primitive_size.build(bbox, verts, idx_conv))
-        vol_diff = abs(size.calc_volume() - target_vol)
-        sz_diff = calc_sizediff(size.calc_size(), vector_conv(bbox.size, idx_conv))
-        diff = vol_diff * VOLUME_DIFF_COEFF + sz_diff * SIZE_DIFF_COEFF
+        diff = calc_fit_diff(primitive_size, bbox, verts, target_vol, idx_conv)
         if best_diff > diff:
             best_diff = diff
             result = idx_conv
 
-    return result
+    return result, best_diff
+
+
+def calc_fittest_axis(
+    primitive_size: type[SizeBase],
+    bbox: BBox,
+    verts: ChunkedPoints,
+    target_vol: float,
+) -> IndexConv:
+    return calc_fittest_axis_and_diff(primitive_size, bbox, verts, target_vol)[0]
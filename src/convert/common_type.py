@@ -1,17 +1,20 @@
-from collections.abc import Sequence
-from typing import TypeAlias
+from collections.abc import Callable, Sequence
+from typing import Any, NamedTuple, TypeAlias
 
 from mathutils import Vector
 
+from ..constants import Type
 from ..util.aux_math import BBox
+from .chunked_points import ChunkedPoints
 
 IndexConv: TypeAlias = tuple[int, int, int]
 IndexConvOPT: TypeAlias = IndexConv | None
+InterfaceParams: TypeAlias = Sequence[tuple[str, Any]]
 
 
 class SizeBase:
     @staticmethod
-    def build(bbox: BBox, verts: Sequence[Vector], index_conv: IndexConvOPT):
+    def build(bbox: BBox, verts: ChunkedPoints, index_conv: IndexConvOPT):
         pass
 
     def calc_size(self) -> Vector:
@@ -19,3 +22,11 @@ class SizeBase:
 
     def calc_volume(self) -> float:
         raise NotImplementedError("This method should be implemented by subclass")
+
+
+# What a conversion produces:
+#   the primitive type, how its size is fitted and which interface values it receives
+class FitTarget(NamedTuple):
+    typ: Type
+    size_type: type[SizeBase]
+    make_params: Callable[[SizeBase], InterfaceParams]
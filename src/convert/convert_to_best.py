@@ -0,0 +1,116 @@
+from collections import Counter
+from typing import cast
+
+from bpy.props import EnumProperty
+from bpy.types import Context, Object
+
+from ..constants import MODERN_PRIMITIVE_PREFIX
+from ..util.aux_func import is_modern_primitive
+from .common_type import FitTarget
+from .convert_to_baseop import ConvertTo_BaseOperator
+from .convert_to_capsule import CAPSULE
+from .convert_to_cone import CONE
+from .convert_to_cube import CUBE, DCUBE
+from .convert_to_cylinder import CYLINDER
+from .convert_to_grid import GRID
+from .convert_to_sphere import ICO_SPHERE, QUAD_SPHERE, UV_SPHERE
+from .convert_to_torus import TORUS
+from .convert_to_tube import TUBE
+from .fitting import Fitter, FitResult, find_best_target, fit_source
+from .source_mesh import CantConvertException, SourceMesh
+
+# Every type a mesh can be converted to (key, display name, target)
+#   When scores are equal, the one listed first is chosen
+_TARGETS: tuple[tuple[str, str, FitTarget], ...] = (
+    ("Cube", "Cube", CUBE),
+    ("DCube", "D-Cube", DCUBE),
+    ("Grid", "Grid", GRID),
+    ("UV Sphere", "UV Sphere", UV_SPHERE),
+    ("ICO Sphere", "ICO Sphere", ICO_SPHERE),
+    ("Quad Sphere", "Quad Sphere", QUAD_SPHERE),
+    ("Cylinder", "Cylinder", CYLINDER),
+    ("Cone", "Cone", CONE),
+    ("Torus", "Torus", TORUS),
+    ("Tube", "Tube", TUBE),
+    ("Capsule", "Capsule", CAPSULE),
+)
+FIT_TARGETS: dict[str, FitTarget] = {key: target for key, _, target in _TARGETS}
+_TARGET_TO_KEY: dict[FitTarget, str] = {target: key for key, _, target in _TARGETS}
+
+
+class ConvertToBest_Operator(ConvertTo_BaseOperator):
+    """Make the Modern Primitive that fits each object best"""
+
+    bl_idname = f"mesh.{MODERN_PRIMITIVE_PREFIX}_convert_to_best"
+    bl_label = "Convert object to best-fit Modern Primitive"
+
+    candidates: EnumProperty(
+        name="Candidates",
+        options={"ENUM_FLAG"},
+        items=tuple((key, name, "") for key, name, _ in _TARGETS),
+        default=set(FIT_TARGETS),
+    )
+    scope: EnumProperty(
+        name="Scope",
+        default="Selected",
+        items=(
+            ("Selected", "Selected", "Convert the selected objects"),
+            (
+                "Collection",
+                "Collection",
+                "Convert every mesh object in the active collection (including children)",
+            ),
+        ),
+    )
+
+    def draw(self, context: Context) -> None:
+        layout = self.layout
+        layout.prop(self, "scope")
+        box = layout.box()
+        box.label(text="Candidates")
+        grid = box.grid_flow(columns=3, row_major=True)
+        grid.prop(self, "candidates")
+        super().draw(context)
+
+    @classmethod
+    def poll(cls, context: Context | None) -> bool:
+        if context is None:
+            return False
+        return cast(Context, context).mode == "OBJECT"
+
+    def _source_objects(self, context: Context) -> list[Object]:
+        if self.scope == "Selected":
+            return [obj for obj in context.selected_objects if obj.type == "MESH"]
+
+        # Objects that are not in the view layer cannot be selected, so skip them.
+        #   Objects that are already primitives are left as they are
+        view_objs = context.view_layer.objects
+        return [
+            obj
+            for obj in context.collection.all_objects
+            if obj.type == "MESH" and obj.name in view_objs and not is_modern_primitive(obj)
+        ]
+
+    def _make_fitter(self) -> Fitter:
+        targets = [target for key, target in FIT_TARGETS.items() if key in self.candidates]
+        if len(targets) == 0:
+            raise CantConvertException("no candidate primitive type is enabled")
+        options = self._fit_options()
+
+        # Ingestion, volume and automatic axes are computed once
+        #   and shared between all the candidates
+        def fit(source: SourceMesh) -> FitResult:
+            return fit_source(source, find_best_target(source, targets, options), options)
+
+        return fit
+
+    def _on_converted(self, fit: FitResult) -> None:
+        self._chosen[_TARGET_TO_KEY[fit.target]] += 1
+
+    def execute(self, context: Context | None) -> set[str]:
+        self._chosen: Counter[str] = Counter()
+        ret = super().execute(context)
+        if ret == {"FINISHED"}:
+            detail = ", ".join(f"{key}: {n}" for key, n in self._chosen.items())
+            self.report({"INFO"}, f"{self._chosen.total()} Object(s) Converted ({detail})")
+        return ret
@@ -1,16 +1,11 @@
-from collections.abc import Sequence
 from math import pi as PI
-from typing import TypeAlias
 
-import bpy.ops
-from bpy.types import Context, Object
 from mathutils import Vector
 
 from .. import primitive_prop as prop
-from ..util.aux_func import get_mpr_modifier, get_object_just_added
-from ..util.aux_node import set_interface_values
 from ..constants import MIN_RADIUS, MIN_SIZE, Type
-from .common_type import SizeBase
+from .chunked_points import ChunkedPoints
+from .common_type import FitTarget, InterfaceParams, SizeBase
 from .convert_to_baseop import (
     BBox,
     ConvertTo_BaseOperator,
@@ -28,7 +23,7 @@ class Size(SizeBase):
         self.height = max(MIN_SIZE, sz.z - self.radius * 2)
 
     @staticmethod
-    def build(bbox: BBox, verts: Sequence[Vector], index_conv: IndexConvOPT):
+    def build(bbox: BBox, verts: ChunkedPoints, index_conv: IndexConvOPT):
         return Size(vector_conv(bbox.size, index_conv))
 
     def calc_size(self) -> Vector:
@@ -44,6 +39,16 @@ class Size(SizeBase):
         return (4.0 / 3.0) * PI * self.radius**3 + (self.radius**2 * PI * self.height)
 
 
+def _capsule_params(size: Size) -> InterfaceParams:
+    return (
+        (prop.Radius.name, size.radius),
+        (prop.Height.name, size.height),
+    )
+
+
+CAPSULE = FitTarget(Type.Capsule, Size, _capsule_params)
+
+
 class _ConvertToCapsule_Operator(ConvertTo_BaseOperator):
     type = Type.Capsule
 
@@ -54,21 +59,6 @@ class ConvertToCapsule_Operator(_ConvertToCapsule_Operator):
     B = _ConvertToCapsule_Operator
     bl_idname = B.get_bl_idname()
     bl_label = B.get_bl_label()
-    SizeType: TypeAlias = Size
-
-    def _handle_proc(
-        self, context: Context, bbox: BBox, verts: Sequence[Vector]
-    ) -> tuple[Object, Vector]:
-        size = Size.build(bbox, verts, None)
-
-        bpy.ops.mesh.mpr_make_capsule()
-        capsule = get_object_just_added(context)
-        set_interface_values(
-            get_mpr_modifier(capsule.modifiers),
-            context,
-            (
-                (prop.Radius.name, size.radius),
-                (prop.Height.name, size.height),
-            ),
-        )
-        return capsule, Vector()
+
+    def _fit_target(self) -> FitTarget:
+        return CAPSULE
@@ -1,17 +1,13 @@
-from collections.abc import Sequence
 from math import pi as PI
-from typing import TypeAlias
 
-import bpy.ops
-from bpy.types import Context, Object
 from mathutils import Vector
+import numpy as np
 
 from .. import primitive_prop as prop
-from ..util.aux_func import get_mpr_modifier, get_object_just_added
-from ..util.aux_node import set_interface_values
 from ..constants import MIN_RADIUS, Type
-from .common_type import SizeBase
-from .convert_to_baseop import BBox, ConvertTo_BaseOperator, IndexConvOPT, index_to_mat
+from .chunked_points import ChunkedPoints
+from .common_type import FitTarget, InterfaceParams, SizeBase
+from .convert_to_baseop import BBox, ConvertTo_BaseOperator, IndexConvOPT, vector_conv
 
 
 class Size(SizeBase):
@@ -19,30 +15,29 @@ class Size(SizeBase):
     bottom_r: float
     height: float
 
-    def __init__(self, bb_size: Vector, bb_center: Vector, verts: Sequence[Vector]):
+    def __init__(self, bb_size: Vector, bb_center: Vector, verts: ChunkedPoints):
         # Divide into upper half and lower half in the z-axis direction
+        #   and find out how far they are from the center
         top_r: float = MIN_RADIUS
         bottom_r: float = MIN_RADIUS
-
-        for v in verts:
-            if v.z >= bb_center.z:
-                # Get the top half vertices
-                #   and find out how far they are from the center
-                top_r = max(top_r, (v.xy - bb_center.xy).length)
-            else:
-                # Get the vertices in the bottom half
-                #   and find out how far they are from the center
-                bottom_r = max(bottom_r, (v.xy - bb_center.xy).length)
+        center_xy = np.array(bb_center.xy)
+        for chunk in verts.chunks():
+            dist = np.linalg.norm(chunk[:, :2] - center_xy, axis=1)
+            is_top = chunk[:, 2] >= bb_center.z
+            top_r = max(top_r, float(dist[is_top].max(initial=MIN_RADIUS)))
+            bottom_r = max(bottom_r, float(dist[~is_top].max(initial=MIN_RADIUS)))
         self.top_r = top_r
         self.bottom_r = bottom_r
         self.height = bb_size.z
 
     @staticmethod
-    def build(bbox: BBox, verts: Sequence[Vector], index_conv: IndexConvOPT):
-        # TODO: Inefficient implementation, so I'll do something later
-        mat = index_to_mat(index_conv)
-        verts = tuple(mat @ v for v in verts)
-        bbox = BBox(verts)
+    def build(bbox: BBox, verts: ChunkedPoints, index_conv: IndexConvOPT):
+        if index_conv is not None:
+            verts = verts.permuted(index_conv)
+            # Bounding box of the permuted points is the permuted bounding box
+            bbox = BBox.from_array(
+                np.array((vector_conv(bbox.min, index_conv), vector_conv(bbox.max, index_conv)))
+            )
         return Size(bbox.size, bbox.center, verts)
 
     def calc_size(self) -> Vector:
@@ -58,6 +53,17 @@ class Size(SizeBase):
         )
 
 
+def _cone_params(size: Size) -> InterfaceParams:
+    return (
+        (prop.TopRadius.name, size.top_r),
+        (prop.BottomRadius.name, size.bottom_r),
+        (prop.Height.name, size.height),
+    )
+
+
+CONE = FitTarget(Type.Cone, Size, _cone_params)
+
+
 class _ConvertToCone_Operator(ConvertTo_BaseOperator):
     type = Type.Cone
 
@@ -68,22 +74,6 @@ class ConvertToCone_Operator(_ConvertToCone_Operator):
     B = _ConvertToCone_Operator
     bl_idname = B.get_bl_idname()
     bl_label = B.get_bl_label()
-    SizeType: TypeAlias = Size
-
-    def _handle_proc(
-        self, context: Context, bbox: BBox, verts: Sequence[Vector]
-    ) -> tuple[Object, Vector]:
-        size = Size.build(bbox, verts, None)
-
-        bpy.ops.mesh.mpr_make_cone()
-        cone = get_object_just_added(context)
-        set_interface_values(
-            get_mpr_modifier(cone.modifiers),
-            context,
-            (
-                (prop.TopRadius.name, size.top_r),
-                (prop.BottomRadius.name, size.bottom_r),
-                (prop.Height.name, size.height),
-            ),
-        )
-        return cone, Vector()
+
+    def _fit_target(self) -> FitTarget:
+        return CONE
@@ -1,22 +1,12 @@
-from collections.abc import Sequence
-from typing import TypeAlias
-
-import bpy.ops
+import bpy
 from bpy.props import EnumProperty
-from bpy.types import (
-    Context,
-    Object,
-)
+from bpy.types import Context
 from mathutils import Vector
 
 from .. import primitive_prop as prop
-from ..util.aux_func import (
-    get_mpr_modifier,
-    get_object_just_added,
-)
-from ..util.aux_node import set_interface_values
 from ..constants import Type
-from .common_type import SizeBase
+from .chunked_points import ChunkedPoints
+from .common_type import FitTarget, InterfaceParams, SizeBase
 from .convert_to_baseop import BBox, ConvertTo_BaseOperator, IndexConvOPT, vector_conv
 
 
@@ -31,7 +21,7 @@ class Size(SizeBase):
         self.z = sz.z
 
     @staticmethod
-    def build(bbox: BBox, verts: Sequence[Vector], index_conv: IndexConvOPT):
+    def build(bbox: BBox, verts: ChunkedPoints, index_conv: IndexConvOPT):
         return Size(vector_conv(bbox.size, index_conv))
 
     def calc_size(self) -> Vector:
@@ -41,6 +31,25 @@ class Size(SizeBase):
         return self.x * self.y * self.z
 
 
+def _cube_params(size: Size) -> InterfaceParams:
+    return ((prop.Size.name, (size.x, size.y, size.z)),)
+
+
+def _dcube_params(size: Size) -> InterfaceParams:
+    return (
+        (prop.MinX.name, size.x / 2),
+        (prop.MaxX.name, size.x / 2),
+        (prop.MinY.name, size.y / 2),
+        (prop.MaxY.name, size.y / 2),
+        (prop.MinZ.name, size.z / 2),
+        (prop.MaxZ.name, size.z / 2),
+    )
+
+
+CUBE = FitTarget(Type.Cube, Size, _cube_params)
+DCUBE = FitTarget(Type.DeformableCube, Size, _dcube_params)
+
+
 class _ConvertToCube_Operator(ConvertTo_BaseOperator):
     type = Type.Cube
 
@@ -51,7 +60,6 @@ class ConvertToCube_Operator(_ConvertToCube_Operator):
     B = _ConvertToCube_Operator
     bl_idname = B.get_bl_idname()
     bl_label = B.get_bl_label()
-    SizeType: TypeAlias = Size
 
     cube_type: EnumProperty(
         name="Cube Type",
@@ -62,37 +70,8 @@ class ConvertToCube_Operator(_ConvertToCube_Operator):
         ],
     )
 
-    def _handle_proc(
-        self, context: Context, bbox: BBox, verts: Sequence[Vector]
-    ) -> tuple[Object, Vector]:
-        size = Size.build(bbox, verts, None)
-
-        if self.cube_type == "Cube":
-            bpy.ops.mesh.mpr_make_cube()
-        else:
-            bpy.ops.mesh.mpr_make_deformablecube()
-
-        cube = get_object_just_added(context)
-        if self.cube_type == "Cube":
-            set_interface_values(
-                get_mpr_modifier(cube.modifiers),
-                context,
-                ((prop.Size.name, (size.x, size.y, size.z)),),
-            )
-        else:
-            set_interface_values(
-                get_mpr_modifier(cube.modifiers),
-                context,
-                (
-                    (prop.MinX.name, size.x / 2),
-                    (prop.MaxX.name, size.x / 2),
-                    (prop.MinY.name, size.y / 2),
-                    (prop.MaxY.name, size.y / 2),
-                    (prop.MinZ.name, size.z / 2),
-                    (prop.MaxZ.name, size.z / 2),
-                ),
-            )
-        return cube, Vector()
+    def _fit_target(self) -> FitTarget:
+        return CUBE if self.cube_type == "Cube" else DCUBE
 
 
 MENU_TARGET = bpy.types.VIEW3D_MT_object_convert
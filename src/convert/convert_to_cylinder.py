@@ -1,19 +1,11 @@
-from collections.abc import Sequence
 from math import pi as PI
-from typing import TypeAlias
 
-import bpy.ops
-from bpy.types import Context, Object
 from mathutils import Vector
 
 from .. import primitive_prop as prop
-from ..util.aux_func import (
-    get_mpr_modifier,
-    get_object_just_added,
-)
-from ..util.aux_node import set_interface_values
 from ..constants import Type
-from .common_type import SizeBase
+from .chunked_points import ChunkedPoints
+from .common_type import FitTarget, InterfaceParams, SizeBase
 from .convert_to_baseop import BBox, ConvertTo_BaseOperator, IndexConvOPT, vector_conv
 
 
@@ -26,7 +18,7 @@ class Size(SizeBase):
         self.height = sz.z
 
     @staticmethod
-    def build(bbox: BBox, verts: Sequence[Vector], index_conv: IndexConvOPT):
+    def build(bbox: BBox, verts: ChunkedPoints, index_conv: IndexConvOPT):
         return Size(vector_conv(bbox.size, index_conv))
 
     def calc_size(self) -> Vector:
@@ -37,6 +29,16 @@ class Size(SizeBase):
         return self.radius**2 * PI * self.height
 
 
+def _cylinder_params(size: Size) -> InterfaceParams:
+    return (
+        (prop.Radius.name, size.radius),
+        (prop.Height.name, size.height),
+    )
+
+
+CYLINDER = FitTarget(Type.Cylinder, Size, _cylinder_params)
+
+
 class _ConvertToCylinder_Operator(ConvertTo_BaseOperator):
     type = Type.Cylinder
 
@@ -47,21 +49,6 @@ class ConvertToCylinder_Operator(_ConvertToCylinder_Operator):
     B = _ConvertToCylinder_Operator
     bl_idname = B.get_bl_idname()
     bl_label = B.get_bl_label()
-    SizeType: TypeAlias = Size
-
-    def _handle_proc(
-        self, context: Context, bbox: BBox, verts: Sequence[Vector]
-    ) -> tuple[Object, Vector]:
-        size = Size.build(bbox, verts, None)
-
-        bpy.ops.mesh.mpr_make_cylinder()
-        cy = get_object_just_added(context)
-        set_interface_values(
-            get_mpr_modifier(cy.modifiers),
-            context,
-            (
-                (prop.Radius.name, size.radius),
-                (prop.Height.name, size.height),
-            ),
-        )
-        return cy, Vector()
+
+    def _fit_target(self) -> FitTarget:
+        return CYLINDER
@@ -1,19 +1,12 @@
-from collections.abc import Sequence
 from math import pi as PI
-from typing import TypeAlias
 
-import bpy.ops
 from bpy.props import EnumProperty
-from bpy.types import (
-    Context,
-    Object,
-)
 from mathutils import Vector
 
 from .. import primitive_prop as prop
-from ..util.aux_func import get_mpr_modifier, get_object_just_added
-from ..util.aux_node import set_interface_values
-from .common_type import SizeBase
+from ..constants import Type
+from .chunked_points import ChunkedPoints
+from .common_type import FitTarget, InterfaceParams, SizeBase
 from .convert_to_baseop import BBox, ConvertTo_BaseOperator, IndexConvOPT, vector_conv
 
 
@@ -24,7 +17,7 @@ class Size(SizeBase):
         self.radius = max(sz.x, sz.y, sz.z) / 2
 
     @staticmethod
-    def build(bbox: BBox, verts: Sequence[Vector], index_conv: IndexConvOPT):
+    def build(bbox: BBox, verts: ChunkedPoints, index_conv: IndexConvOPT):
         return Size(vector_conv(bbox.size, index_conv))
 
     def calc_size(self) -> Vector:
@@ -35,6 +28,22 @@ class Size(SizeBase):
         return (4.0 / 3.0) * PI * self.radius**3
 
 
+def _sphere_params(size: Size) -> InterfaceParams:
+    # I just want the size of Bounding box.
+    #   so there is no need to read vertices
+    return ((prop.Radius.name, size.radius),)
+
+
+UV_SPHERE = FitTarget(Type.UVSphere, Size, _sphere_params)
+ICO_SPHERE = FitTarget(Type.ICOSphere, Size, _sphere_params)
+QUAD_SPHERE = FitTarget(Type.QuadSphere, Size, _sphere_params)
+SPHERES: dict[str, FitTarget] = {
+    "UVSphere": UV_SPHERE,
+    "ICOSphere": ICO_SPHERE,
+    "QuadSphere": QUAD_SPHERE,
+}
+
+
 class _ConvertToSphere_Operator(ConvertTo_BaseOperator):
     @classmethod
     def get_bl_idname(cls) -> str:
@@ -51,7 +60,6 @@ class ConvertToSphere_Operator(_ConvertToSphere_Operator):
     B = _ConvertToSphere_Operator
     bl_idname = B.get_bl_idname()
     bl_label = B.get_bl_label()
-    SizeType: TypeAlias = Size
 
     sphere_type: EnumProperty(
         name="Sphere Type",
@@ -63,27 +71,5 @@ class ConvertToSphere_Operator(_ConvertToSphere_Operator):
         ),
     )
 
-    def _handle_proc(
-        self, context: Context, bbox: BBox, verts: Sequence[Vector]
-    ) -> tuple[Object, Vector]:
-        size = Size.build(bbox, verts, None)
-
-        match self.sphere_type:
-            case "UVSphere":
-                bpy.ops.mesh.mpr_make_uvsphere()
-            case "ICOSphere":
-                bpy.ops.mesh.mpr_make_icosphere()
-            case "QuadSphere":
-                bpy.ops.mesh.mpr_make_quadsphere()
-
-        sphere = get_object_just_added(context)
-
-        # I just want the size of Bounding box.
-        #   so there is no need to read vertices
-        mod = get_mpr_modifier(sphere.modifiers)
-        set_interface_values(
-            mod,
-            context,
-            ((prop.Radius.name, size.radius),),
-        )
-        return sphere, Vector()
+    def _fit_target(self) -> FitTarget:
+        return SPHERES[self.sphere_type]
@@ -1,19 +1,11 @@
-from collections.abc import Sequence
 from math import pi as PI
-from typing import TypeAlias
 
-import bpy.ops
-from bpy.types import Context, Object
 from mathutils import Vector
 
 from .. import primitive_prop as prop
-from ..util.aux_func import (
-    get_mpr_modifier,
-    get_object_just_added,
-)
-from ..util.aux_node import set_interface_values
 from ..constants import MIN_RADIUS, Type
-from .common_type import SizeBase
+from .chunked_points import ChunkedPoints
+from .common_type import FitTarget, InterfaceParams, SizeBase
 from .convert_to_baseop import BBox, ConvertTo_BaseOperator, IndexConvOPT, vector_conv
 
 
@@ -26,7 +18,7 @@ class Size(SizeBase):
         self.radius = max(MIN_RADIUS, (sz.x + sz.y) / 4 - self.ring_radius)
 
     @staticmethod
-    def build(bbox: BBox, verts: Sequence[Vector], index_conv: IndexConvOPT):
+    def build(bbox: BBox, verts: ChunkedPoints, index_conv: IndexConvOPT):
         return Size(vector_conv(bbox.size, index_conv))
 
     def calc_size(self) -> Vector:
@@ -37,6 +29,16 @@ class Size(SizeBase):
         return 2 * PI**2 * self.radius * self.ring_radius
 
 
+def _torus_params(size: Size) -> InterfaceParams:
+    return (
+        (prop.RingRadius.name, size.ring_radius),
+        (prop.Radius.name, size.radius),
+    )
+
+
+TORUS = FitTarget(Type.Torus, Size, _torus_params)
+
+
 class _ConvertToTorus_Operator(ConvertTo_BaseOperator):
     type = Type.Torus
 
@@ -47,21 +49,6 @@ class ConvertToTorus_Operator(_ConvertToTorus_Operator):
     B = _ConvertToTorus_Operator
     bl_idname = B.get_bl_idname()
     bl_label = B.get_bl_label()
-    SizeType: TypeAlias = Size
-
-    def _handle_proc(
-        self, context: Context, bbox: BBox, verts: Sequence[Vector]
-    ) -> tuple[Object, Vector]:
-        size = Size.build(bbox, verts, None)
-
-        bpy.ops.mesh.mpr_make_torus()
-        torus = get_object_just_added(context)
-        set_interface_values(
-            get_mpr_modifier(torus.modifiers),
-            context,
-            (
-                (prop.RingRadius.name, size.ring_radius),
-                (prop.Radius.name, size.radius),
-            ),
-        )
-        return torus, Vector()
+
+    def _fit_target(self) -> FitTarget:
+        return TORUS
@@ -1,19 +1,11 @@
-from collections.abc import Sequence
 from math import pi as PI
-from typing import TypeAlias
 
-import bpy.ops
-from bpy.types import Context, Object
 from mathutils import Vector
 
 from .. import primitive_prop as prop
-from ..util.aux_func import (
-    get_mpr_modifier,
-    get_object_just_added,
-)
-from ..util.aux_node import set_interface_values
 from ..constants import MIN_RADIUS, MIN_SIZE, Type
-from .common_type import SizeBase
+from .chunked_points import ChunkedPoints
+from .common_type import FitTarget, InterfaceParams, SizeBase
 from .convert_to_baseop import BBox, ConvertTo_BaseOperator, IndexConvOPT, vector_conv
 
 
@@ -28,7 +20,7 @@ class Size(SizeBase):
         self.inner_radius = self.outer_radius / 2
 
     @staticmethod
-    def build(bbox: BBox, verts: Sequence[Vector], index_conv: IndexConvOPT):
+    def build(bbox: BBox, verts: ChunkedPoints, index_conv: IndexConvOPT):
         return Size(vector_conv(bbox.size, index_conv))
 
     def calc_size(self) -> Vector:
@@ -39,6 +31,17 @@ class Size(SizeBase):
         return (self.outer_radius**2 - self.inner_radius**2) * PI * self.height
 
 
+def _tube_params(size: Size) -> InterfaceParams:
+    return (
+        (prop.Height.name, size.height),
+        (prop.OuterRadius.name, size.outer_radius),
+        (prop.InnerRadius.name, size.inner_radius),
+    )
+
+
+TUBE = FitTarget(Type.Tube, Size, _tube_params)
+
+
 class _ConvertToTube_Operator(ConvertTo_BaseOperator):
     type = Type.Tube
 
@@ -49,22 +52,6 @@ class ConvertToTube_Operator(_ConvertToTube_Operator):
     B = _ConvertToTube_Operator
     bl_idname = B.get_bl_idname()
     bl_label = B.get_bl_label()
-    SizeType: TypeAlias = Size
-
-    def _handle_proc(
-        self, context: Context, bbox: BBox, verts: Sequence[Vector]
-    ) -> tuple[Object, Vector]:
-        size = Size.build(bbox, verts, None)
-
-        bpy.ops.mesh.mpr_make_tube()
-        tube = get_object_just_added(context)
-        set_interface_values(
-            get_mpr_modifier(tube.modifiers),
-            context,
-            (
-                (prop.Height.name, size.height),
-                (prop.OuterRadius.name, size.outer_radius),
-                (prop.InnerRadius.name, size.inner_radius),
-            ),
-        )
-        return tube, Vector()
+
+    def _fit_target(self) -> FitTarget:
+        return TUBE
@@ -0,0 +1,143 @@
+import math
+import os
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from mathutils import Matrix, Quaternion
+
+from .common_func import INDEX, calc_fit_diff
+from .common_type import FitTarget, InterfaceParams
+from .source_mesh import CantConvertException, SourceMesh, frame_to_rotation
+
+# Everything in this module works on plain values only (no bpy data),
+#   so that it can be run on worker threads
+
+
+class FitOptions(NamedTuple):
+    # "Auto", "X", "Y" or "Z"
+    main_axis: str
+    invert_main_axis: bool
+
+
+class FitResult(NamedTuple):
+    target: FitTarget
+    params: InterfaceParams
+    # Placement of the primitive relative to the source object
+    matrix: Matrix
+
+
+# Computes the result for a single source (raises CantConvertException on failure)
+Fitter = Callable[[SourceMesh], FitResult]
+
+
+def check_source(source: SourceMesh) -> None:
+    # If the number of vertices is less than 2, conversion is not possible.
+    MIN_VERTS = 2
+    if len(source.points) < MIN_VERTS:
+        raise CantConvertException("it's number of vertices is less than 2")
+
+
+def calc_pre_rotation(source: SourceMesh, target: FitTarget, options: FitOptions) -> Quaternion:
+    # Quaternion for rotating the main axis to the Z axis
+    pre_rot: Quaternion
+    should_flip: bool = False
+    # Size types handle the Z axis as height,
+    #   so convert it in a timely manner.
+    match options.main_axis:
+        case "Auto":
+            axis_idx, _ = source.fittest_axis(target.size_type)
+            pre_rot, should_flip = frame_to_rotation(source.auto_frame, axis_idx)
+        case "X":
+            # -90 degrees rotation around the Y axis
+            pre_rot = Quaternion(((0, 1, 0)), math.radians(-90))
+        case "Y":
+            # 90 degrees around the X-axis
+            pre_rot = Quaternion((1, 0, 0), math.radians(90))
+        case "Z":
+            # Do nothing
+            pre_rot = Quaternion()
+
+    # invert axis if flag set
+    if options.invert_main_axis:
+        should_flip = not should_flip
+
+    if should_flip:
+        pre_rot.rotate(Quaternion((0, 1, 0), math.radians(180)))
+    return pre_rot
+
+
+def _fit_source(source: SourceMesh, target: FitTarget, options: FitOptions) -> FitResult:
+    pre_rot = calc_pre_rotation(source, target, options)
+
+    # Bounding box when the z-axis is the main axis
+    verts, bbox = source.rotated(pre_rot)
+    size = target.size_type.build(bbox, verts, None)
+    return FitResult(
+        target,
+        target.make_params(size),
+        pre_rot.inverted().to_matrix().to_4x4() @ Matrix.Translation(bbox.center),
+    )
+
+
+def fit_source(source: SourceMesh, target: FitTarget, options: FitOptions) -> FitResult:
+    check_source(source)
+    return source.memo(("fit", target, options), lambda: _fit_source(source, target, options))
+
+
+def _calc_score(source: SourceMesh, target: FitTarget, options: FitOptions) -> float:
+    if options.main_axis == "Auto":
+        return source.fittest_axis(target.size_type)[1]
+
+    # The rotation doesn't depend on the target when the axis is given,
+    #   so the rotated vertices are shared by all candidates
+    verts, bbox = source.rotated(calc_pre_rotation(source, target, options))
+    return calc_fit_diff(target.size_type, bbox, verts, source.volume, INDEX[0])
+
+
+def calc_score(source: SourceMesh, target: FitTarget, options: FitOptions) -> float:
+    return source.memo(("score", target, options), lambda: _calc_score(source, target, options))
+
+
+def find_best_target(
+    source: SourceMesh, targets: Sequence[FitTarget], options: FitOptions
+) -> FitTarget:
+    """When scores are equal, the one listed first is chosen"""
+    check_source(source)
+    best: FitTarget | None = None
+    best_score: float = 0.0
+    for target in targets:
+        score = calc_score(source, target, options)
+        if best is None or best_score > score:
+            best = target
+            best_score = score
+    if best is None:
+        raise CantConvertException("no candidate primitive type is enabled")
+    return best
+
+
+def _fit_or_error(fitter: Fitter, source: SourceMesh) -> FitResult | CantConvertException:
+    try:
+        return fitter(source)
+    except CantConvertException as e:
+        return e
+
+
+def fit_all(
+    fitter: Fitter, sources: Sequence[SourceMesh]
+) -> list[FitResult | CantConvertException]:
+    """Apply fitter to every source, in parallel when there are several.
+    The heavy parts are numpy operations which release the GIL.
+    Results are in the same order as sources"""
+    # Meshes with the same content share one SourceMesh (and its caches),
+    #   compute each of them only once
+    unique = list({id(s): s for s in sources}.values())
+    if len(unique) <= 1:
+        results = [_fit_or_error(fitter, s) for s in unique]
+    else:
+        n_worker = min(len(unique), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=n_worker) as executor:
+            results = list(executor.map(lambda s: _fit_or_error(fitter, s), unique))
+
+    by_id = {id(s): r for s, r in zip(unique, results, strict=True)}
+    return [by_id[id(s)] for s in sources]
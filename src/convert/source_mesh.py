@@ -0,0 +1,280 @@
+import hashlib
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from functools import cached_property
+from typing import Any, TypeVar
+
+import numpy as np
+from bpy.types import Depsgraph, Mesh, Object
+from mathutils import Matrix, Quaternion, Vector, geometry
+
+from ..exception import DGException
+from ..util.aux_math import BBox
+from ..util.aux_other import get_tomesh
+from ..util.vertex_transform import read_coords
+from .chunked_points import CHUNK_SIZE, ChunkedPoints
+from .common_func import calc_fittest_axis_and_diff
+from .common_type import IndexConv, SizeBase
+
+Frame = tuple[Vector, Vector, Vector]
+T = TypeVar("T")
+
+
+class CantConvertException(DGException):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+
+
+def read_triangles(mesh: Mesh) -> np.ndarray:
+    mesh.calc_loop_triangles()
+    tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tris)
+    return tris.reshape(-1, 3)
+
+
+def calc_volume(raw: np.ndarray, tris: np.ndarray) -> float:
+    vol = 0.0
+    for i in range(0, len(tris), CHUNK_SIZE):
+        v0, v1, v2 = (raw[tris[i : i + CHUNK_SIZE, j]].astype(np.float64) for j in range(3))
+        vol += float(np.einsum("ij,ij->", v0, np.cross(v1, v2)))
+    return abs(vol) / 6.0
+
+
+def _auto_axis(points: ChunkedPoints) -> Frame:
+    # calc Covariance matrix
+    _, cov = points.mean_and_cov()
+
+    # Eigen values and Eigen vectors
+    eigval, eigvec = np.linalg.eigh(cov)
+    # Sorting the eigenvectors in descending orde
+    eigvec = eigvec[:, eigval.argsort()[::-1]]
+
+    a0 = Vector(eigvec[:, 0])
+    a1 = Vector(eigvec[:, 1])
+    a2 = Vector(eigvec[:, 2])
+    return a0, a1, a2
+
+
+def to_4d_0(vec: Vector) -> Vector:
+    ret = vec.to_4d()
+    ret[3] = 0
+    return ret
+
+
+def frame_to_matrix(axis3: Frame) -> Matrix:
+    return Matrix(
+        (
+            to_4d_0(axis3[0]),
+            to_4d_0(axis3[1]),
+            to_4d_0(axis3[2]),
+            (0, 0, 0, 1),
+        )
+    )
+
+
+def to_array3(mat: Matrix) -> np.ndarray:
+    return np.array(mat.to_3x3())
+
+
+def _convex_hull_2d(verts_2d: np.ndarray) -> np.ndarray:
+    return verts_2d[geometry.convex_hull_2d(verts_2d.tolist())]
+
+
+def calc_convex_hull_2d(points: ChunkedPoints) -> np.ndarray:
+    """Convex hull of the XY coordinates, in order.
+    The hull of each chunk is merged with the hull so far"""
+    hull = np.empty((0, 2))
+    for chunk in points.chunks():
+        hull = _convex_hull_2d(np.concatenate((hull, _convex_hull_2d(chunk[:, :2]))))
+    return hull
+
+
+def _calc_hull_width(verts_2d: np.ndarray, normals: np.ndarray) -> np.ndarray:
+    """For each hull edge, the farthest distance of the hull along its normal"""
+    # Process the edges in blocks so that large hulls don't need an (N, N) buffer
+    BLOCK = 256
+    offset = np.einsum("ij,ij->i", verts_2d, normals)
+    ret = np.empty(len(verts_2d))
+    for i in range(0, len(verts_2d), BLOCK):
+        proj = verts_2d @ normals[i : i + BLOCK].T
+        ret[i : i + BLOCK] = proj.max(axis=0) - offset[i : i + BLOCK]
+    return ret
+
+
+def calc_auto_frame(points: ChunkedPoints) -> Frame:
+    """Determine the (x, y, z) axes of the object from its vertices.
+    z is the principal axis, y is the normal of the narrowest side of the 2D convex hull"""
+    axis = _auto_axis(points)
+    rot = frame_to_matrix((axis[2], axis[1], axis[0])).to_quaternion()
+    # The generated coordinate axes here may not be optimal
+    #   (except for the Z axis)
+    # treat Z-axis to the main axis and projected to 2D
+    z_axis = axis[0]
+    MIN_LENGTH_SQ = 1e-12
+    # calc 2D convex
+    convex_hull = calc_convex_hull_2d(points.transformed(to_array3(rot.to_matrix())))
+    keep = [0]
+    for i in range(1, len(convex_hull)):
+        # Omit the vertices of almost the same position
+        if np.sum((convex_hull[keep[-1]] - convex_hull[i]) ** 2) >= MIN_LENGTH_SQ:
+            keep.append(i)
+    # The last vertex may also be the same as the first one
+    if len(keep) > 1 and np.sum((convex_hull[keep[-1]] - convex_hull[0]) ** 2) < MIN_LENGTH_SQ:
+        keep.pop()
+    verts_2d = convex_hull[keep]
+
+    MIN_VERTS_2D = 2
+    if len(verts_2d) < MIN_VERTS_2D:
+        raise CantConvertException(
+            "error occurred by calculation when determining the conversion axis automatically"
+        )
+
+    edges = np.roll(verts_2d, -1, axis=0) - verts_2d
+    edges /= np.linalg.norm(edges, axis=1, keepdims=True)
+    # normal vector from edge vertices (rotate 90 degrees)
+    normals = np.stack((-edges[:, 1], edges[:, 0]), axis=1)
+    best_normal = Vector((*normals[int(np.argmin(_calc_hull_width(verts_2d, normals)))], 0))
+
+    # best_normal is a temporary coordinate system above,
+    #   so return it to the object coordinate system.
+    invrot_mat = rot.inverted().to_matrix()
+    best_normal = invrot_mat @ best_normal
+
+    # Treat as the Y-axis
+    y_axis = best_normal
+    # X-axis is found by taking the cross product of y_axis and z_axis
+    x_axis: Vector = y_axis.cross(z_axis)
+
+    # <z, x, y at this point in order of longest>
+    return x_axis, y_axis, z_axis
+
+
+def frame_to_rotation(axis3: Frame, axis_idx: IndexConv) -> tuple[Quaternion, bool]:
+    """Rotation that brings the permuted frame to the object axes,
+    and whether its Z axis is facing down (should be flipped)"""
+    new_axis = tuple(axis3[idx] for idx in axis_idx)
+    pre_rot = frame_to_matrix(new_axis).to_quaternion()
+    # If the Z axis is facing down in the object coordinate system,
+    #   flip automatically
+    should_flip = (pre_rot @ Vector((0, 0, 1))).z < 0
+    return pre_rot, should_flip
+
+
+class SourceMesh:
+    """Geometry of a conversion source.
+    Holds no reference to Blender data, so it can be processed outside the main thread.
+    Values derived from it (volume, automatic axes, fitting results) are
+    computed on first use and shared between every primitive type tried against it"""
+
+    # Vertex coordinates in object space
+    points: ChunkedPoints
+
+    def __init__(self, coords: np.ndarray, tris: np.ndarray, index: np.ndarray | None = None):
+        """
+        Args:
+            coords: (N, 3) coordinates (can be shared with other sources)
+            tris: (M, 3) vertex indices (into coords) of the triangles of the surface
+            index: Vertices of coords which belong to this source (None = all)
+        """
+        self.points = ChunkedPoints(coords, index=index)
+        self._coords = coords
+        self._tris = tris
+        self._fit_cache: dict[type[SizeBase], tuple[IndexConv, float]] = {}
+        self._rotated_cache: dict[tuple[float, ...], tuple[ChunkedPoints, BBox]] = {}
+        self._memo: dict[Hashable, Any] = {}
+
+    @classmethod
+    def from_object(cls, obj: Object, depsgraph: Depsgraph):
+        """Read the evaluated mesh of obj.
+        Meshes with the same content share one instance (see SourceCache)"""
+        with get_tomesh(obj.evaluated_get(depsgraph)) as mesh:
+            coords, tris = read_coords(mesh), read_triangles(mesh)
+        return _source_cache.get(coords, tris)
+
+    @classmethod
+    def from_part(cls, coords: np.ndarray, tris: np.ndarray, index: np.ndarray):
+        """Source made of a part (index) of the coordinates shared with other sources"""
+        return _source_cache.get(coords, tris, index)
+
+    @cached_property
+    def volume(self) -> float:
+        return calc_volume(self._coords, self._tris)
+
+    @cached_property
+    def auto_frame(self) -> Frame:
+        return calc_auto_frame(self.points)
+
+    @cached_property
+    def _frame_verts(self) -> tuple[ChunkedPoints, BBox]:
+        # Convert once with the z-axis as the longest (no offset adjustment)
+        verts = self.points.transformed(to_array3(frame_to_matrix(self.auto_frame)))
+        return verts, verts.bbox()
+
+    def fittest_axis(self, size_type: type[SizeBase]) -> tuple[IndexConv, float]:
+        """Best axis pattern (in the automatic frame) and its error value for the size type"""
+        if size_type not in self._fit_cache:
+            verts, bbox = self._frame_verts
+            self._fit_cache[size_type] = calc_fittest_axis_and_diff(
+                size_type, bbox, verts, self.volume
+            )
+        return self._fit_cache[size_type]
+
+    def rotated(self, rot: Quaternion) -> tuple[ChunkedPoints, BBox]:
+        """Vertices rotated by rot and their bounding box"""
+        key = tuple(rot)
+        if key not in self._rotated_cache:
+            verts = self.points.transformed(to_array3(rot.to_matrix()))
+            self._rotated_cache[key] = (verts, verts.bbox())
+        return self._rotated_cache[key]
+
+    def memo(self, key: Hashable, proc: Callable[[], T]) -> T:
+        """Result of proc, computed only the first time for each key"""
+        if key not in self._memo:
+            self._memo[key] = proc()
+        return self._memo[key]
+
+
+class SourceCache:
+    """LRU cache of SourceMesh keyed by the mesh content.
+    Every change in the redo panel re-executes the operator from scratch,
+    this lets the re-execution skip the geometry work (axes, hull, fitting)"""
+
+    MAX_ENTRY: int = 8
+    # Limit the memory held by big meshes
+    MAX_VERTS: int = 4_000_000
+
+    def __init__(self) -> None:
+        self._entry: OrderedDict[bytes, SourceMesh] = OrderedDict()
+
+    @staticmethod
+    def _calc_key(points: ChunkedPoints, tris: np.ndarray) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        for chunk in points.raw_chunks():
+            h.update(np.ascontiguousarray(chunk).data)
+        h.update(np.ascontiguousarray(tris).data)
+        return h.digest()
+
+    def get(
+        self, coords: np.ndarray, tris: np.ndarray, index: np.ndarray | None = None
+    ) -> SourceMesh:
+        key = self._calc_key(ChunkedPoints(coords, index=index), tris)
+        source = self._entry.get(key)
+        if source is not None:
+            self._entry.move_to_end(key)
+            return source
+
+        source = SourceMesh(coords, tris, index)
+        self._entry[key] = source
+        n_verts = sum(len(s.points) for s in self._entry.values())
+        while len(self._entry) > 1 and (
+            len(self._entry) > self.MAX_ENTRY or n_verts > self.MAX_VERTS
+        ):
+            _, old = self._entry.popitem(last=False)
+            n_verts -= len(old.points)
+        return source
+
+    def clear(self) -> None:
+        self._entry.clear()
+
+
+_source_cache = SourceCache()
@@ -0,0 +1,344 @@
+import math
+from collections.abc import Iterable, Sequence
+from typing import ClassVar, NamedTuple, cast
+
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+from bpy.props import BoolProperty, FloatProperty, IntProperty, PointerProperty
+from bpy.types import Context, NodesModifier, Object, PropertyGroup, Scene
+from bpy.utils import register_class, unregister_class
+
+from . import primitive as P
+from . import primitive_prop as prop
+from .constants import DIVISION_LOD_MODIFIER_NAME
+from .util.aux_func import (
+    get_mpr_modifier,
+    group_by_node_group,
+    is_modern_primitive,
+    is_mpr_enabled,
+    make_primitive_property_name,
+)
+from .util.aux_node import copy_geometry_node_params
+from .util.param_batch import ParamBatch
+from .version import TypeAndVersion
+
+# Entry name to save the LOD level of a primitive
+#   (its presence also means the MPR modifier has been hidden by the LOD)
+ENTRY_NAME = make_primitive_property_name("division_lod")
+
+# Seconds between the LOD updates
+UPDATE_INTERVAL = 0.5
+# Maximum number of objects updated per tick (spreads the re-evaluation cost)
+MAX_UPDATES_PER_TICK = 32
+# Margin (in levels) before switching to another level, to avoid thrashing
+HYSTERESIS = 0.25
+# Level of the objects showing the authored values
+AUTHORED = -1
+# Objects closer than this (in clip space w) are treated as behind the view
+MIN_DEPTH = 1e-6
+
+# The number of blades changes the shape, not the resolution
+LOD_PROPS = frozenset(
+    p for p in prop.PROP_LIST if p.has_tag(prop.PT.Division) and p != prop.NumBlades
+)
+
+
+def _on_enabled_update(self, context: Context) -> None:
+    if not self.enabled:
+        # Put everything back at once, the timer no longer runs for it
+        restore_authored(context, bpy.data.objects)
+        LocalValue.params = None
+    sync_timer()
+
+
+class MPR_DivisionLODSettings(PropertyGroup):
+    enabled: BoolProperty(
+        name="Division LOD",
+        description="Reduce the divisions of primitives which look small in the viewport"
+        " (rendering uses the original values)",
+        default=False,
+        update=_on_enabled_update,
+    )
+    full_detail_size: IntProperty(
+        name="Full Detail Size",
+        description="Projected size (in pixels) at which the maximum scale is used",
+        default=256,
+        min=8,
+        subtype="PIXEL",
+    )
+    min_scale: FloatProperty(
+        name="Min Scale",
+        description="Lower limit of the division scale",
+        default=0.125,
+        min=0.01,
+        max=1.0,
+    )
+    max_scale: FloatProperty(
+        name="Max Scale",
+        description="Upper limit of the division scale (1.0: original values)",
+        default=1.0,
+        min=0.01,
+        max=1.0,
+    )
+
+
+class ViewProjection(NamedTuple):
+    perspective_matrix: np.ndarray
+    # Pixels per unit at depth 1
+    pixel_scale: float
+
+
+def _get_views(context: Context) -> list[ViewProjection]:
+    ret: list[ViewProjection] = []
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type != "VIEW_3D":
+                continue
+            region = next((r for r in area.regions if r.type == "WINDOW"), None)
+            r3d = area.spaces.active.region_3d
+            if region is None or r3d is None:
+                continue
+            ret.append(
+                ViewProjection(
+                    np.array(r3d.perspective_matrix, dtype=np.float64),
+                    r3d.window_matrix[1][1] * region.height / 2,
+                )
+            )
+    return ret
+
+
+def projected_sizes(objs: Sequence[Object], views: Sequence[ViewProjection]) -> np.ndarray:
+    """Diameter (in pixels) of the bounding sphere of each object,
+    the largest one of all the views (0 if behind every view)"""
+    # (n, 8, 3) -> world space
+    corners = np.array([obj.bound_box for obj in objs], dtype=np.float64)
+    mats = np.array([obj.matrix_world for obj in objs], dtype=np.float64)
+    corners = np.einsum("nij,nkj->nki", mats[:, :3, :3], corners) + mats[:, None, :3, 3]
+    center = corners.mean(axis=1)
+    radius = np.linalg.norm(corners - center[:, None], axis=2).max(axis=1)
+
+    center_h = np.concatenate([center, np.ones((len(objs), 1))], axis=1)
+    ret = np.zeros(len(objs))
+    for view in views:
+        w = center_h @ view.perspective_matrix[3]
+        depth = np.maximum(w, MIN_DEPTH)
+        size = np.where(w > MIN_DEPTH, 2 * radius * view.pixel_scale / depth, 0)
+        np.maximum(ret, size, out=ret)
+    return ret
+
+
+class LODParams(NamedTuple):
+    full_detail_size: float
+    min_scale: float
+    max_scale: float
+
+    @property
+    def max_level(self) -> int:
+        return math.floor(math.log2(self.max_scale / self.min_scale))
+
+    def scale(self, level: int) -> float:
+        return self.max_scale * 0.5**level
+
+    def target_levels(self, sizes: np.ndarray, current: np.ndarray) -> np.ndarray:
+        """LOD level of each object (AUTHORED for the original values)"""
+        # The level is increased every time the size is halved
+        raw = np.log2(self.full_detail_size / np.maximum(sizes, MIN_DEPTH))
+        target = np.clip(np.floor(raw), 0, self.max_level).astype(np.int64)
+        # Stay at the current level while the size is around its borders
+        #   (the authored values are level 0, unless the max scale is lower than 1)
+        cur = np.clip(np.where(current == AUTHORED, 0, current), 0, self.max_level)
+        has_level = (current != AUTHORED) | (self.max_scale >= 1.0)
+        keep = has_level & (raw >= cur - HYSTERESIS) & (raw < cur + 1 + HYSTERESIS)
+        target = np.where(keep, cur, target)
+        if self.max_scale >= 1.0:
+            # No need to hold the values of level 0
+            target[target == 0] = AUTHORED
+        return target
+
+
+def _lod_value(p: prop.Prop, authored: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    if p == prop.Subdivision:
+        # Each subdivision level quadruples the faces
+        return authored - np.rint(np.log2(1 / scale))
+    return authored * scale
+
+
+def _lod_modifier(obj: Object) -> NodesModifier | None:
+    mods = obj.modifiers
+    if len(mods) > 1 and mods[1].name == DIVISION_LOD_MODIFIER_NAME:
+        return mods[1]
+    return None
+
+
+def _ensure_lod_modifier(obj: Object) -> NodesModifier:
+    """Viewport-only copy of the MPR modifier, placed right after it.
+    The MPR modifier (with the authored values) is hidden in the viewport, but still rendered"""
+    src = get_mpr_modifier(obj.modifiers)
+    mod = _lod_modifier(obj)
+    if mod is None:
+        mod = cast(NodesModifier, obj.modifiers.new(DIVISION_LOD_MODIFIER_NAME, "NODES"))
+        obj.modifiers.move(len(obj.modifiers) - 1, 1)
+        mod.show_render = False
+        mod.show_expanded = False
+    if mod.node_group != src.node_group:
+        mod.node_group = src.node_group
+    # The other parameters follow the authored values
+    copy_geometry_node_params(mod, src)
+    src.show_viewport = False
+    return mod
+
+
+def _remove_lod_modifier(obj: Object) -> None:
+    mod = obj.modifiers.get(DIVISION_LOD_MODIFIER_NAME)
+    if mod is not None:
+        obj.modifiers.remove(mod)
+    if ENTRY_NAME in obj:
+        # Hidden by the LOD
+        get_mpr_modifier(obj.modifiers).show_viewport = True
+        del obj[ENTRY_NAME]
+
+
+def get_level(obj: Object) -> int:
+    if _lod_modifier(obj) is None:
+        return AUTHORED
+    return obj.get(ENTRY_NAME, AUTHORED)
+
+
+def set_levels(
+    context: Context, objs: Iterable[Object], levels: Sequence[int], params: LODParams | None
+) -> None:
+    """Show the primitives with the divisions of the LOD level in the viewport.
+    The reduced values are written to the LOD modifier only,
+    the MPR modifier keeps the authored values"""
+    level_of = dict(zip(objs, levels, strict=True))
+    for obj, level in level_of.items():
+        if level == AUTHORED:
+            _remove_lod_modifier(obj)
+
+    reduced = [obj for obj, level in level_of.items() if level != AUTHORED]
+    for ng_name, (ng, group_objs) in group_by_node_group(reduced).items():
+        typ_ver = TypeAndVersion.get_type_and_version(ng_name)
+        if typ_ver is None:
+            continue
+        targets = P.TYPE_TO_PRIMITIVE[typ_ver.type].get_param_if(lambda p: p in LOD_PROPS)
+        authored = ParamBatch([get_mpr_modifier(o.modifiers) for o in group_objs], ng)
+        batch = ParamBatch([_ensure_lod_modifier(o) for o in group_objs], ng)
+        scales = np.array([params.scale(level_of[o]) for o in group_objs])
+        for p in targets:
+            lod_val = _lod_value(p, authored.get(p.name), scales)
+            batch.set(p.name, np.clip(lod_val, *batch.limits(p.name)))
+        batch.write()
+        for obj in group_objs:
+            obj[ENTRY_NAME] = level_of[obj]
+        # Other users of the node group are unchanged
+        batch.tag_objects()
+
+
+def restore_authored(context: Context, objs: Iterable[Object]) -> int:
+    """Show the authored values again (remove the LOD modifiers).
+    Returns the number of objects"""
+    objs = [
+        obj
+        for obj in objs
+        if (ENTRY_NAME in obj or _lod_modifier(obj) is not None) and is_modern_primitive(obj)
+    ]
+    set_levels(context, objs, [AUTHORED] * len(objs), None)
+    return len(objs)
+
+
+class LocalValue:
+    # Parameters the current levels were computed with
+    params: ClassVar[LODParams | None] = None
+
+
+def _update_lod(context: Context) -> None:
+    settings = context.scene.mpr_division_lod
+    objs = [
+        obj
+        for obj in context.view_layer.objects
+        if is_modern_primitive(obj) and (ENTRY_NAME in obj or is_mpr_enabled(obj.modifiers))
+    ]
+    # The LOD modifier has been removed (or moved) by the user
+    broken = [obj for obj in objs if ENTRY_NAME in obj and _lod_modifier(obj) is None]
+    restore_authored(context, broken)
+    views = _get_views(context)
+    if len(objs) == 0 or len(views) == 0:
+        return
+    params = LODParams(settings.full_detail_size, settings.min_scale, settings.max_scale)
+    current = np.array([get_level(obj) for obj in objs], dtype=np.int64)
+    target = params.target_levels(projected_sizes(objs, views), current)
+    # Selected objects are being edited, so they must show the authored values
+    target[np.array([obj.select_get() for obj in objs], dtype=bool)] = AUTHORED
+
+    if params != LocalValue.params:
+        # The scale of every level has changed
+        changed = np.flatnonzero((target != AUTHORED) | (current != AUTHORED))
+        LocalValue.params = params
+    else:
+        changed = np.flatnonzero(target != current)
+    # The finer objects come first, as they are noticeable
+    changed = changed[np.argsort(target[changed], kind="stable")][:MAX_UPDATES_PER_TICK]
+    set_levels(context, [objs[i] for i in changed], target[changed].tolist(), params)
+
+
+def _is_enabled_anywhere() -> bool:
+    return any(scene.mpr_division_lod.enabled for scene in bpy.data.scenes)
+
+
+def on_timer() -> float | None:
+    if not _is_enabled_anywhere():
+        # Registered again when enabled
+        return None
+    context = bpy.context
+    if (
+        context.scene is not None
+        and context.scene.mpr_division_lod.enabled
+        and context.view_layer is not None
+        and context.mode == "OBJECT"
+    ):
+        _update_lod(context)
+    return UPDATE_INTERVAL
+
+
+def sync_timer() -> None:
+    """Run the timer only while the LOD is enabled (in any scene)"""
+    running = bpy.app.timers.is_registered(on_timer)
+    if _is_enabled_anywhere():
+        if not running:
+            bpy.app.timers.register(on_timer, first_interval=UPDATE_INTERVAL, persistent=True)
+    elif running:
+        bpy.app.timers.unregister(on_timer)
+
+
+@persistent
+def load_handler(new_file: str) -> None:
+    LocalValue.params = None
+    sync_timer()
+
+
+# Rendering and saving need nothing, as the MPR modifier keeps the authored values
+#   (and the LOD modifier is not rendered)
+HANDLERS = ((bpy.app.handlers.load_post, load_handler),)
+
+
+def register() -> None:
+    register_class(MPR_DivisionLODSettings)
+    Scene.mpr_division_lod = PointerProperty(type=MPR_DivisionLODSettings)
+    for handler, fn in HANDLERS:
+        if fn not in handler:
+            handler.append(fn)
+    # bpy.data may not be accessible while the add-on is being enabled
+    bpy.app.timers.register(sync_timer, first_interval=0.0)
+
+
+def unregister() -> None:
+    if bpy.app.timers.is_registered(sync_timer):
+        bpy.app.timers.unregister(sync_timer)
+    if bpy.app.timers.is_registered(on_timer):
+        bpy.app.timers.unregister(on_timer)
+    for handler, fn in HANDLERS:
+        if fn in handler:
+            handler.remove(fn)
+    del Scene.mpr_division_lod
+    unregister_class(MPR_DivisionLODSettings)
@@ -1,7 +1,7 @@
 from typing import ClassVar
 
-import bmesh
 import bpy.utils
+import numpy as np
 from bpy.props import BoolProperty
 from bpy.types import Context, Object, Operator
 from mathutils import Vector
@@ -9,11 +9,11 @@ from mathutils import Vector
 from .util.aux_func import (
     BackupSelection,
     get_mpr_modifier,
-    is_modern_primitive_specific,
-    is_mpr_enabled,
+    get_selection_summary,
 )
-from .util.aux_math import MinMax
 from .util.aux_node import get_interface_value, set_interface_value
+from .util.vertex_transform import write_coords
+from .bounds import calc_primitive_bounds
 from .constants import MODERN_PRIMITIVE_PREFIX, Type
 from .primitive_prop import get_max, get_min
 from .reset_origin import ResetOrigin_Operator
@@ -28,31 +28,22 @@ class Equalize_DCube_Operator(Operator):
 
     @classmethod
     def poll(cls, context: Context | None) -> bool:
-        if len(context.selected_objects) == 0:
-            return False
-        for obj in context.selected_objects:
-            if not is_modern_primitive_specific(obj, Type.DeformableCube) or not is_mpr_enabled(
-                obj.modifiers
-            ):
-                return False
-        return True
+        sel = get_selection_summary(context)
+        return sel.only_primitives and sel.types == {Type.DeformableCube} and sel.all_enabled
 
     @staticmethod
-    def _make_single_vertex(context: Context, obj: Object, pos: Vector) -> None:
+    def _make_single_vertex(obj: Object, pos: Vector) -> None:
         """Replaces the meshes that an object has at a single vertex
         with specified coordinates"""
-        context.view_layer.objects.active = obj
-        bpy.ops.object.mode_set(mode="EDIT")
-        mesh = bmesh.from_edit_mesh(obj.data)
-        bmesh.ops.delete(mesh, geom=mesh.verts[:], context="VERTS")
-        mesh.verts.new(pos)
-        bmesh.update_edit_mesh(obj.data)
-        bpy.ops.object.mode_set(mode="OBJECT")
-        bpy.ops.ed.undo_push()
+        # Edit the mesh data directly (no need to enter edit mode)
+        mesh = obj.data
+        mesh.clear_geometry()
+        mesh.vertices.add(1)
+        write_coords(mesh, np.array([pos]))
 
     @staticmethod
     def _make_centered(obj: Object, context: Context) -> None:
-        bb = MinMax.from_obj_bb(obj)
+        bb = calc_primitive_bounds([obj], context)[0]
 
         # Equalize the modifier values
         mod = get_mpr_modifier(obj.modifiers)
@@ -67,7 +58,7 @@ class Equalize_DCube_Operator(Operator):
             set_interface_value(mod, (max_name, width))
 
         mod.node_group.interface_update(context)
-        __class__._make_single_vertex(context, obj, bb.average)
+        __class__._make_single_vertex(obj, bb.average)
 
     def execute(self, context: Context | None) -> set[str]:
         # preserve active object
@@ -75,8 +66,8 @@ class Equalize_DCube_Operator(Operator):
         sel = context.selected_objects.copy()
         for obj in sel:
             self._make_centered(obj, context)
-            if self.reset_origin:
-                ResetOrigin_Operator.proc_obj(obj)
+        if self.reset_origin:
+            ResetOrigin_Operator.proc_objs(sel, context)
         # restore active obejct
         bkup.restore(context)
         return {"FINISHED"}
@@ -1,66 +1,40 @@
-from collections.abc import Callable
+from collections.abc import Sequence
+from functools import partial
 from typing import ClassVar
 
 import bmesh
 import bpy
-from bmesh.types import BMFace
+import numpy as np
 from bpy.props import BoolProperty, EnumProperty, StringProperty
 from bpy.types import Context, Event, Object, Operator
 from bpy.utils import register_class, unregister_class
+from mathutils import Matrix
 
 from .constants import MODERN_PRIMITIVE_PREFIX
-from .convert import (
-    ConvertToCapsule_Operator as C_Capsule,
-)
-from .convert import (
-    ConvertToCone_Operator as C_Cone,
-)
-from .convert import (
-    ConvertToCube_Operator as C_Cube,
-)
-from .convert import (
-    ConvertToCylinder_Operator as C_Cylinder,
-)
-from .convert import (
-    ConvertToGrid_Operator as C_Grid,
-)
-from .convert import (
-    ConvertToSphere_Operator as C_Sphere,
-)
-from .convert import (
-    ConvertToTorus_Operator as C_Torus,
-)
-from .convert import (
-    ConvertToTube_Operator as C_Tube,
-)
-from .convert.convert_to_baseop import ConvertTo_BaseOperator
-from .exception import DGException, DGInvalidInput
-from .util.aux_func import get_object_just_added
+from .convert.convert_to_baseop import add_primitive_modifier, update_primitive_interfaces
+from .convert.convert_to_best import FIT_TARGETS
+from .convert.common_type import FitTarget
+from .convert.fitting import FitOptions, FitResult, fit_all, fit_source
+from .convert.source_mesh import CantConvertException, SourceMesh, read_coords
+from .exception import DGInvalidInput
+from .util.aux_math import is_uniform
+from .util.face_island import FaceIslands, get_selected_face_islands
 from .util.aux_other import make_bmesh
-from .util.union_find import UnionFind
 
 
-def _get_ops(op: type[ConvertTo_BaseOperator]) -> Callable[[...], None]:
-    return getattr(bpy.ops.mesh, op.bl_idname.split(".")[1])
-
-
-PROC: dict[str, Callable[[...], None]] = {
-    "Cube": _get_ops(C_Cube),
-    "DCube": lambda **kwargs: _get_ops(C_Cube)(cube_type="DeformableCube", **kwargs),
-    "Grid": _get_ops(C_Grid),
-    "UV Sphere": lambda **kwargs: _get_ops(C_Sphere)(sphere_type="UVSphere", **kwargs),
-    "ICO Sphere": lambda **kwargs: _get_ops(C_Sphere)(sphere_type="ICOSphere", **kwargs),
-    "Quad Sphere": lambda **kwargs: _get_ops(C_Sphere)(sphere_type="QuadSphere", **kwargs),
-    "Cylinder": _get_ops(C_Cylinder),
-    "Cone": _get_ops(C_Cone),
-    "Torus": _get_ops(C_Torus),
-    "Tube": _get_ops(C_Tube),
-    "Capsule": _get_ops(C_Capsule),
-}
-
-
-class DGConvertFailed(DGException):
-    pass
+def _calc_hull_triangles(coords: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Triangles (indices into coords) of the convex hull of coords[index]"""
+    # Only a temporary bmesh is used here (no mesh datablock)
+    bm = bmesh.new()
+    try:
+        for co in coords[index].tolist():
+            bm.verts.new(co)
+        bm.verts.index_update()
+        bmesh.ops.convex_hull(bm, input=bm.verts)
+        local = [[loop.vert.index for loop in tri] for tri in bm.calc_loop_triangles()]
+    finally:
+        bm.free()
+    return index[np.array(local, dtype=np.int64).reshape(-1, 3)]
 
 
 class ExtractPrimitive_Operator(Operator):
@@ -108,7 +82,6 @@ class ExtractPrimitive_Operator(Operator):
 
     @classmethod
     def poll(cls, context: Context | None) -> bool:
-        # For now, only object mode is supported
         if context.mode not in ("OBJECT", "EDIT_MESH"):
             return False
         # All selected objects are mesh?
@@ -119,137 +92,121 @@ class ExtractPrimitive_Operator(Operator):
         return self.execute(context)
 
     @staticmethod
-    def _make_convex_from_faces(faces: set[BMFace], obj: Object) -> Object:
-        # Copy Select Face to New BMesh
-        new_bm = bmesh.new()
-
-        for face in faces:
-            new_face_verts = []
-            for v in face.verts:
-                # Create vertex (if not available)
-                try:
-                    nv = new_bm.verts[v.index]
-                except IndexError:
-                    nv = new_bm.verts.new(v.co)
-
-                new_face_verts.append(nv)
-            new_face = new_bm.faces.new(new_face_verts)
-            new_face.smooth = face.smooth
-
-        # Make Convex-Hull
-        bmesh.ops.convex_hull(new_bm, input=new_bm.verts)
-
-        # Save as new mesh data
-        new_mesh = bpy.data.meshes.new(obj.name + "_selected_faces")
-        new_bm.to_mesh(new_mesh)
-        new_bm.free()
-
-        new_mesh.update()
-
-        # Add as a new object
-        new_obj = bpy.data.objects.new(obj.name, new_mesh)
-
-        # Place in the same position as the original
-        new_obj.matrix_world = obj.matrix_world
-        return new_obj
-
-    def _make_convex(self, obj: Object) -> list[Object]:
-        ret: list[Object] = []
-        with make_bmesh(obj.data, False) as bm:
-            selected_faces = [f for f in bm.faces if f.select]
-            if len(selected_faces) == 0:
-                raise DGInvalidInput("no selected faces")
-
-            uf_face: list[BMFace] = []
-            faceidx_to_ufidx: dict[int, int] = {}
-
-            for idx, f in enumerate(selected_faces):
-                uf_face.append(f)
-                faceidx_to_ufidx[f.index] = idx
-
-            # Grouping with union-find algorithm
-            uf = UnionFind(len(uf_face))
-            for f in uf_face:
-                for e in f.edges:
-                    for f2 in e.link_faces:
-                        if not f2.select:
-                            continue
-                        if f == f2:
-                            continue
-                        uf.connect(faceidx_to_ufidx[f.index], faceidx_to_ufidx[f2.index])
-
-            groups = uf.get_groups()
-            for g in groups:
-                group_faces = [uf_face[ufid] for ufid in g]
-                new_obj = self._make_convex_from_faces(group_faces, obj)
-
-                # Delete original polygons (if needed)
-                if not self.keep_original_mesh:
-                    if self.fill_hole:
-                        # Store the edges
-                        # associated with the face to reselect edges before deleting
-                        related_edges = {e for f in group_faces for e in f.edges}
-
-                    # Delete Faces
-                    bmesh.ops.delete(bm, geom=group_faces, context="FACES")
-
-                    if self.fill_hole:
-                        # After deletion, select the edges used for the original face
-                        for e in bm.edges:
-                            # Select only non-manifold edges
-                            e.select_set(e in related_edges and not e.is_manifold)
-                        # Fill the face
-                        bmesh.ops.holes_fill(
-                            bm, edges=[e for e in bm.edges if e.select], sides=0
-                        )
-                ret.append(new_obj)
-        return ret
-
-    def _make_primitive(self, context: Context, convex: Object) -> Object:
-        # Postfix something appropriately
-        # prev_name = convex.name
-        with context.temp_override(
-            active_object=convex, object=convex, selected_objects=[convex]
-        ):
-            # Crash if we don't leave the source
-            proc = PROC[self.primitive_type]
-            proc(keep_original=True, postfix=self.postfix)
+    def _read_sources(obj: Object, in_edit_mode: bool) -> tuple[list[SourceMesh], FaceIslands]:
+        """Source of each face island (selected faces connected by edges)"""
+        if in_edit_mode:
+            # Copy the edit-mesh to the mesh data (without leaving edit mode)
+            #   so that it can be read at once with foreach_get
+            obj.update_from_editmode()
+        islands = get_selected_face_islands(obj.data)
+        if len(islands.faces) == 0:
+            raise DGInvalidInput("no selected faces")
+
+        # All the islands refer to this coordinate buffer
+        coords = read_coords(obj.data)
+        sources = [
+            SourceMesh.from_part(coords, _calc_hull_triangles(coords, verts), verts)
+            for verts in islands.verts
+        ]
+        return sources, islands
+
+    def _delete_faces(self, obj: Object, islands: FaceIslands, in_edit_mode: bool) -> None:
+        # In edit mode, the edit-mesh is modified directly and written back once
+        with make_bmesh(obj.data, in_edit_mode) as bm:
+            # Face indices of the bmesh are the same as the mesh
+            bm.faces.ensure_lookup_table()
+            faces = [bm.faces[i] for i in np.concatenate(islands.faces).tolist()]
+            # Store the edges associated with the faces before deleting
+            related_edges = {e for f in faces for e in f.edges} if self.fill_hole else set()
+
+            # Delete the faces of all the islands at once
+            bmesh.ops.delete(bm, geom=faces, context="FACES")
+
+            if self.fill_hole:
+                # Edges left after the deletion and no longer manifold
+                #   are the borders of the holes
+                border = [e for e in related_edges if e.is_valid and not e.is_manifold]
+                # Fill the face
+                bmesh.ops.holes_fill(bm, edges=border, sides=0)
+
+    def _make_primitives(
+        self,
+        context: Context,
+        target: FitTarget,
+        jobs: Sequence[tuple[Object, Matrix]],
+        fits: Sequence[FitResult | CantConvertException],
+    ) -> list[Object]:
+        # Make the primitives directly (no temporary object, no operator call)
+        new_objs: list[Object] = []
+        for (obj, obj_mat), fit in zip(jobs, fits, strict=True):
+            if isinstance(fit, CantConvertException):
+                self.report({"WARNING"}, f'Couldn\'t extract from "{obj.name}" because {fit}')
+                continue
+            name = obj.name + self.postfix
+            new_obj = bpy.data.objects.new(name, bpy.data.meshes.new(name))
+            context.collection.objects.link(new_obj)
+            add_primitive_modifier(new_obj, target.typ, fit.params)
+            new_obj.matrix_world = obj_mat @ fit.matrix
+            new_objs.append(new_obj)
+        return new_objs
 
-            try:
-                return get_object_just_added(context)
-                # return bpy.data.objects[prev_name + self.postfix]
-            except KeyError as e:
-                raise DGConvertFailed() from e
+    @staticmethod
+    def _source_objects(context: Context) -> list[Object]:
+        if context.mode == "EDIT_MESH":
+            # Every mesh in edit mode (multi-object editing)
+            return [obj for obj in context.objects_in_mode if obj.type == "MESH"]
+        return list(context.selected_objects)
 
     def execute(self, context: Context | None) -> set[str]:
-        new_objs: list[Object] = []
-
-        if context.mode != "OBJECT":
-            bpy.ops.object.mode_set(mode="OBJECT")
+        in_edit_mode = context.mode == "EDIT_MESH"
 
         # If we don't update explicitly,
         # object.location and object.matrix world may be different
         context.view_layer.update()
-        for obj in context.selected_objects:
-            try:
-                convex_s = self._make_convex(obj)
-                for c in convex_s:
-                    context.collection.objects.link(c)
-
-                    new_obj = self._make_primitive(context, c)
-                    new_objs.append(new_obj)
-
-                    bpy.data.objects.remove(c)
 
+        # Read the islands of all the objects, then fit them at once
+        jobs: list[tuple[Object, Matrix]] = []
+        sources: list[SourceMesh] = []
+        for obj in self._source_objects(context):
+            # Primitives are fitted with automatic axes,
+            #   which doesn't work with non uniform scaling
+            if not is_uniform(obj.scale):
+                self.report(
+                    {"WARNING"}, f'Skipped "{obj.name}" because it has non uniform scaling'
+                )
+                continue
+            try:
+                obj_sources, islands = self._read_sources(obj, in_edit_mode)
             except DGInvalidInput as e:
-                print(e)
-            except DGConvertFailed:
-                print("Convert failed")
-
-        bpy.ops.object.select_all(action="DESELECT")
-        print(new_objs)
-        for obj in new_objs:
-            obj.select_set(True)
+                self.report({"WARNING"}, f'Skipped "{obj.name}" because {e}')
+                continue
+            # Delete original polygons (if needed)
+            if not self.keep_original_mesh:
+                self._delete_faces(obj, islands, in_edit_mode)
+            jobs += [(obj, obj.matrix_world.copy())] * len(obj_sources)
+            sources += obj_sources
+
+        target = FIT_TARGETS[self.primitive_type]
+        options = FitOptions("Auto", False)
+        fits = fit_all(partial(fit_source, target=target, options=options), sources)
+
+        new_objs = self._make_primitives(context, target, jobs, fits)
+        update_primitive_interfaces(context, new_objs)
+
+        if len(new_objs) > 0:
+            if not in_edit_mode:
+                # In edit mode, the objects being edited stay active and selected
+                for obj in context.selected_objects:
+                    obj.select_set(False)
+                context.view_layer.objects.active = new_objs[-1]
+            for obj in new_objs:
+                obj.select_set(True)
+            context.view_layer.update()
+            # Same as "Apply Scaling" of the convert operators
+            with context.temp_override(
+                active_object=new_objs[-1], object=new_objs[-1], selected_objects=new_objs
+            ):
+                bpy.ops.object.mpr_apply_scale(strict=False)
 
         self.report({"INFO"}, f"{len(new_objs)} Object(s) Converted.")
         return {"FINISHED"}
@@ -0,0 +1,159 @@
+from collections.abc import Iterable, Sequence
+from typing import ClassVar
+
+import bpy
+from bpy.app.handlers import persistent
+from bpy.props import BoolProperty
+from bpy.types import Context, Mesh, Object, Operator, Scene
+from bpy.utils import register_class, unregister_class
+
+from .apply_mesh import bake_primitive_meshes
+from .constants import MODERN_PRIMITIVE_PREFIX
+from .util.aux_func import (
+    disable_modifier,
+    get_mpr_modifier,
+    get_selection_summary,
+    is_modern_primitive,
+    is_mpr_enabled,
+    make_primitive_property_name,
+    remove_if_unused,
+)
+
+# Entry name to save the original mesh of a frozen primitive
+#   (the presence of the entry itself means "frozen")
+ENTRY_NAME = make_primitive_property_name("frozen_mesh")
+# Render visibility of the MPR modifier before freezing
+RENDER_ENTRY_NAME = make_primitive_property_name("frozen_show_render")
+
+
+def is_frozen(obj: Object) -> bool:
+    return ENTRY_NAME in obj
+
+
+def freeze_primitives(context: Context, objs: Sequence[Object]) -> int:
+    """Replace the result of the MPR modifier with a baked (and shared) mesh,
+    and disable the modifier so that it's no longer evaluated.
+    Returns the number of objects frozen"""
+    objs = [obj for obj in objs if not is_frozen(obj) and is_mpr_enabled(obj.modifiers)]
+    # The baked mesh is also used for rendering, so it's baked with the full divisions
+    #   (bake_primitive_meshes restores the authored values)
+    meshes = bake_primitive_meshes(context, objs, share=True)
+    for obj, mesh in zip(objs, meshes, strict=True):
+        # The original mesh is held by the property, so it won't be freed
+        obj[ENTRY_NAME] = obj.data
+        obj.data = mesh
+        mod = get_mpr_modifier(obj.modifiers)
+        obj[RENDER_ENTRY_NAME] = mod.show_render
+        disable_modifier(mod)
+    return len(objs)
+
+
+def thaw_primitives(objs: Iterable[Object]) -> int:
+    """Restore the original mesh and re-enable the MPR modifier.
+    Objects whose MPR modifier has been removed keep the baked mesh.
+    Returns the number of objects thawed"""
+    baked: list[Mesh] = []
+    count = 0
+    for obj in objs:
+        if not is_frozen(obj) or not is_modern_primitive(obj):
+            continue
+        orig = obj[ENTRY_NAME]
+        del obj[ENTRY_NAME]
+        if isinstance(orig, Mesh):
+            baked.append(obj.data)
+            obj.data = orig
+        mod = get_mpr_modifier(obj.modifiers)
+        mod.show_viewport = True
+        mod.show_render = bool(obj.pop(RENDER_ENTRY_NAME, True))
+        count += 1
+    # Baked meshes are shared, so free them after all the objects are restored
+    remove_if_unused(baked)
+    return count
+
+
+def freeze_candidates(context: Context) -> list[Object]:
+    # Hidden objects aren't evaluated anyway
+    return [
+        obj
+        for obj in context.view_layer.objects
+        if not obj.select_get() and obj.visible_get() and is_modern_primitive(obj)
+    ]
+
+
+class FreezePrimitives_Operator(Operator):
+    """Swap the unselected primitives for baked meshes (or restore them).
+    Frozen primitives are restored automatically when selected"""
+
+    bl_idname = f"object.{MODERN_PRIMITIVE_PREFIX}_freeze_primitives"
+    bl_label = "Freeze/Unfreeze Primitives"
+    bl_options: ClassVar[set[str]] = {"REGISTER", "UNDO"}
+
+    freeze: BoolProperty(name="Freeze", default=True)
+
+    @classmethod
+    def poll(cls, context: Context | None) -> bool:
+        return context is not None and context.mode == "OBJECT"
+
+    def execute(self, context: Context) -> set[str]:
+        if self.freeze:
+            n = freeze_primitives(context, freeze_candidates(context))
+            self.report({"INFO"}, f"{n} primitive(s) frozen")
+        else:
+            n = thaw_primitives(context.view_layer.objects)
+            self.report({"INFO"}, f"{n} primitive(s) unfrozen")
+        return {"FINISHED"}
+
+
+class LocalValue:
+    # Is thawing already scheduled?
+    thaw_requested: ClassVar[bool] = False
+
+
+def _thaw_selected_async() -> None:
+    LocalValue.thaw_requested = False
+    context = bpy.context
+    if context.mode == "OBJECT":
+        thaw_primitives(context.selected_objects)
+
+
+@persistent
+def on_deps(scene: Scene) -> None:
+    context: Context = bpy.context
+    if context.mode != "OBJECT" or LocalValue.thaw_requested:
+        return
+    # Selected for editing: switch back to the live modifier.
+    # We can't change the object data during the depsgraph update,
+    #   so it's done by the application timer
+    # (the selection summary is cached, and already updated for this depsgraph
+    #   update as primitive_registry is registered first)
+    sel = get_selection_summary(context)
+    # Frozen primitives have their MPR modifier disabled
+    if not sel.all_enabled and any(is_frozen(obj) for obj in sel.primitives):
+        LocalValue.thaw_requested = True
+        bpy.app.timers.register(_thaw_selected_async, first_interval=0.0)
+
+
+@persistent
+def load_handler(new_file: str):
+    LocalValue.thaw_requested = False
+    on_deps(bpy.context.scene)
+
+
+handler_deps_update = bpy.app.handlers.depsgraph_update_post
+handler_loadpost = bpy.app.handlers.load_post
+
+
+def register() -> None:
+    register_class(FreezePrimitives_Operator)
+    if on_deps not in handler_deps_update:
+        handler_deps_update.append(on_deps)
+    if load_handler not in handler_loadpost:
+        handler_loadpost.append(load_handler)
+
+
+def unregister() -> None:
+    unregister_class(FreezePrimitives_Operator)
+    if on_deps in handler_deps_update:
+        handler_deps_update.remove(on_deps)
+    if load_handler in handler_loadpost:
+        handler_loadpost.remove(load_handler)
@@ -9,15 +9,14 @@ from bpy.types import Context, Depsgraph, NodesModifier, Object, Operator, Scene
 from bpy.utils import register_class, unregister_class
 
 from ..constants import MODERN_PRIMITIVE_PREFIX, Type
-from ..exception import DGUnknownType
 from ..store_gizmoinfo import get_gizmo_info
 from ..util.aux_func import (
     get_addon_preferences,
     get_mpr_modifier,
+    get_primitive_entry,
     is_modern_primitive,
-    type_from_modifier_name,
 )
-from ..version import SNAPPING_CAPABLE, TypeAndVersion
+from ..version import SNAPPING_CAPABLE
 from . import (
     capsule,
     cone,
@@ -100,7 +99,7 @@ class MPR_Hud(Operator):
                 return
 
             obj = context.active_object
-            if not is_primitive_selected(obj) or obj not in context.selected_objects:
+            if not is_primitive_selected(obj) or not obj.select_get():
                 return
 
             space = cast(SpaceView3D, context.space_data)
@@ -108,40 +107,37 @@ class MPR_Hud(Operator):
             if not (space.show_gizmo and space.show_gizmo_modifier):
                 return
 
-            try:
-                typ = type_from_modifier_name(get_mpr_modifier(obj.modifiers).name)
-                if typ not in PROCS:
-                    return
+            ent = get_primitive_entry(obj)
+            typ = ent.type
+            if typ not in PROCS:
+                return
 
-                reg3d = context.region_data
-                show_hud = True
+            reg3d = context.region_data
+            show_hud = True
+
+            gizmo_info = get_gizmo_info()
+            if gizmo_info is None:
+                return
 
-                gizmo_info = get_gizmo_info()
-                if gizmo_info is None:
+            QUADVIEW_NUM = 4
+            # In quad view mode,
+            # scale values are not displayed except for the upper-right view
+            if (
+                len(space.region_quadviews) == QUADVIEW_NUM
+                and space.region_quadviews[-1] != reg3d
+            ):
+                show_hud = False
+            prefs = get_addon_preferences(context)
+            with Drawer(blf, context, obj.matrix_world, prefs.show_world_space_value) as drawer:
+                if show_hud:
+                    drawer.show_hud(obj.scale)
+
+                mod = ent.modifier
+                if ent.version is None or mod is None:
                     return
+                is_snap_capable = ent.version >= SNAPPING_CAPABLE
+                PROCS[typ](mod, drawer, gizmo_info, is_snap_capable)
 
-                QUADVIEW_NUM = 4
-                # In quad view mode,
-                # scale values are not displayed except for the upper-right view
-                if (
-                    len(space.region_quadviews) == QUADVIEW_NUM
-                    and space.region_quadviews[-1] != reg3d
-                ):
-                    show_hud = False
-                prefs = get_addon_preferences(context)
-                with Drawer(blf, context, obj.matrix_world, prefs.show_world_space_value) as drawer:
-                    if show_hud:
-                        drawer.show_hud(obj.scale)
-
-                    mod = get_mpr_modifier(obj.modifiers)
-                    typ_ver = TypeAndVersion.get_type_and_version(mod.node_group.name)
-                    if typ_ver is None:
-                        return
-                    is_snap_capable = typ_ver.version >= SNAPPING_CAPABLE
-                    PROCS[typ](mod, drawer, gizmo_info, is_snap_capable)
-
-            except DGUnknownType:
-                pass
         except Exception:
             pass
 
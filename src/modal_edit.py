@@ -7,8 +7,10 @@ from idprop.types import IDPropertyArray
 from mathutils import Vector
 
 from . import primitive_prop as P
+from .boolean_proxy import BOOLEAN_PROXY, SOURCE_MODAL, get_proxy_mode
 from .primitive import TYPE_TO_PRIMITIVE
 from .text import TextDrawer
+from .topology import PolygonBudget, estimate_topology
 from .hud.modal_edit_hud import ModalEditHUD
 from .util.aux_func import (
     get_active_and_selected_primitive,
@@ -292,6 +294,7 @@ class MPR_OT_modal_edit(Operator):
         self._mod = get_mpr_modifier(self._obj.modifiers)
 
         type_c = type_from_modifier_name(self._mod.name)
+        self._type = type_c
         primitive_class = TYPE_TO_PRIMITIVE[type_c]
         self._primitive_name = primitive_class.type_name
         self._params = primitive_class.get_param_names()
@@ -316,6 +319,9 @@ class MPR_OT_modal_edit(Operator):
 
         self._input_str = ""
 
+        # Boolean modifiers using this object are evaluated cheaply while editing
+        BOOLEAN_PROXY.begin(SOURCE_MODAL, [self._obj], get_proxy_mode(context))
+
         self._text_drawer = TextDrawer("", draw_func=ModalEditHUD())
         self._text_drawer.show(context)
         self._update_text()
@@ -324,6 +330,7 @@ class MPR_OT_modal_edit(Operator):
         return {"RUNNING_MODAL"}
 
     def finish(self, context: Context) -> None:
+        BOOLEAN_PROXY.end(SOURCE_MODAL)
         if self._text_drawer:
             self._text_drawer.hide(context)
 
@@ -332,7 +339,8 @@ class MPR_OT_modal_edit(Operator):
             for name, val in self._initial_values.items():
                 set_interface_value(self._mod, (name, val))
             update_node_interface(self._mod, context)
-            context.view_layer.update()
+        BOOLEAN_PROXY.end(SOURCE_MODAL)
+        context.view_layer.update()
 
         if self._text_drawer:
             self._text_drawer.hide(context)
@@ -410,29 +418,52 @@ class MPR_OT_modal_edit(Operator):
             set_interface_value(self._mod, (prop.name, tuple(new_val)))
 
         elif prop.type is int:
-            val_int = int(val)
-            val_int = max(1, min(100, val_int))
+            val_int = self._int_value(context, prop, val)
+            if val_int is None:
+                return
             set_interface_value(self._mod, (prop.name, val_int))
 
         elif prop.type is float:
-            if prop.has_tag(P.PT.Smooth):
-                # Convert degree input to radians for the engine
-                val = math.radians(val)
-            else:
-                val = (
-                    max(0.001, min(100.0, val))
-                    if prop.has_tag(P.PT.Division)
-                    else max(0.001, val)
-                )
-            set_interface_value(self._mod, (prop.name, val))
+            val_float = self._float_value(context, prop, val)
+            if val_float is None:
+                return
+            set_interface_value(self._mod, (prop.name, val_float))
 
         elif prop.type is bool:
             set_interface_value(self._mod, (prop.name, val > 0))
 
         update_node_interface(self._mod, context)
 
+    def _int_value(self, context: Context, prop: P.Prop, val: float) -> int | None:
+        """Input value for the int property (None: rejected by the budget)"""
+        val_int = max(1, min(100, int(val)))
+        limited = self._limit_by_budget(context, prop, val_int)
+        return None if limited is None else int(limited)
+
+    def _float_value(self, context: Context, prop: P.Prop, val: float) -> float | None:
+        """Input value for the float property (None: rejected by the budget)"""
+        if prop.has_tag(P.PT.Smooth):
+            # Convert degree input to radians for the engine
+            return math.radians(val)
+        val = max(0.001, min(100.0, val)) if prop.has_tag(P.PT.Division) else max(0.001, val)
+        limited = self._limit_by_budget(context, prop, val)
+        return None if limited is None else float(limited)
+
+    def _limit_by_budget(self, context: Context, prop: P.Prop, val: float) -> float | None:
+        """The value limited by the polygon budget (None: rejected)"""
+        budget = PolygonBudget.from_preferences(context)
+        if budget is None:
+            return val
+        before = get_interface_values(self._mod, self._params)
+        after = {**before, prop.name: val}
+        if not budget.limit(self._type, before, after, [prop]):
+            return val
+        self.report({"WARNING"}, budget.message())
+        return None if budget.action == "REJECT" else after[prop.name]
+
     def _update_text(self) -> None:
         vals = get_interface_values(self._mod, self._params)
+        topo = estimate_topology(self._type, vals)
         msg = f"MPR Modal Edit ({self._primitive_name})\n"
         current_input = self._input_str if self._input_str else "-"
         msg += f"Mode: {self._mode} | Input: {current_input}\n"
@@ -511,6 +542,10 @@ class MPR_OT_modal_edit(Operator):
                 displayed_props.add(prop.name)
 
         msg += "-" * SEPARATOR_WIDTH + "\n"
+        msg += (
+            f"Estimated: {int(topo.verts):,} verts / {int(topo.faces):,} faces"
+            f" / {int(topo.tris):,} tris\n"
+        )
         shortcut_info = " ".join([f"[{k}]" for k in sorted(self._key_to_modes.keys())])
         msg += f"{shortcut_info} [Tab:Next] [Shift+S:Snap] [W:{P.Smooth.name}]\n"
         msg += "[L-Click/Enter:Confirm] [R-Click/Esc:Cancel] [BS:Reset]"
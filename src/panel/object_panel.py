@@ -8,8 +8,10 @@ from ..apply_material import (
 )
 from ..apply_mesh import ApplyAndRemoveMesh_Operator, ApplyMesh_Operator
 from ..apply_scale import ApplyScale_Operator
+from ..bulk_edit import BulkEdit_Operator
 from ..constants import MODERN_PRIMITIVE_CATEGORY
 from ..convert import (
+    ConvertToBest_Operator,
     ConvertToCapsule_Operator,
     ConvertToCone_Operator,
     ConvertToCube_Operator,
@@ -22,6 +24,7 @@ from ..convert import (
 from ..equalize_dcube_size import Equalize_DCube_Operator
 from ..extract_primitive import ExtractPrimitive_Operator
 from ..focus_modifier import FocusModifier_Operator
+from ..freeze import FreezePrimitives_Operator
 from ..make_primitive import OPS_GROUPS, make_operator_to_layout
 from ..material_prop import (
     GRID_MATERIAL_NAME,
@@ -100,6 +103,16 @@ class MPR_PT_Restore(MPR_PT_Base):
         btn.reset_division_mode = "All"
         btn.reset_other = False
 
+        box_bulk = self.layout.box()
+        box_bulk.label(text="Bulk Edit")
+        row = box_bulk.row()
+        btn = row.operator(BulkEdit_Operator.bl_idname, text="Randomize Size")
+        btn.target = "TAGS"
+        btn.tags = {"Size"}
+        btn.mode = "RANDOM_SCALE"
+        btn = row.operator(BulkEdit_Operator.bl_idname, text="Edit")
+        btn.mode = "SET"
+
         box_origin = self.layout.box()
         box_origin.label(text="Origin")
         box_origin.operator(ResetOrigin_Operator.bl_idname, text="Reset")
@@ -132,6 +145,12 @@ class MPR_PT_Convert(MPR_PT_Base):
         grid.operator(ConvertToTube_Operator.bl_idname, text="Tube")
         grid.operator(ConvertToCapsule_Operator.bl_idname, text="Capsule")
 
+        row = box.row()
+        b = row.operator(ConvertToBest_Operator.bl_idname, text="Best Fit")
+        b.scope = "Selected"
+        b = row.operator(ConvertToBest_Operator.bl_idname, text="Best Fit (Collection)")
+        b.scope = "Collection"
+
 
 class MPR_PT_Extract(MPR_PT_Base):
     bl_idname = "MPR_PT_Extract"
@@ -244,6 +263,21 @@ class MPR_PT_ViewportDisplay(MPR_PT_Base):
             sp.label(text=view_text)
             sp.operator(SwitchWireframe.bl_idname, text="Switch")
 
+        row = layout.row(align=True)
+        btn = row.operator(FreezePrimitives_Operator.bl_idname, text="Freeze Unselected")
+        btn.freeze = True
+        btn = row.operator(FreezePrimitives_Operator.bl_idname, text="Unfreeze All")
+        btn.freeze = False
+
+        lod = ctx.scene.mpr_division_lod
+        box = layout.box()
+        box.prop(lod, "enabled")
+        col = box.column(align=True)
+        col.enabled = lod.enabled
+        col.prop(lod, "full_detail_size")
+        col.prop(lod, "min_scale")
+        col.prop(lod, "max_scale")
+
 
 class MPR_PT_ApplyScale(MPR_PT_Base):
     bl_idname = "MPR_PT_ApplyScale"
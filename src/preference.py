@@ -1,9 +1,10 @@
 import bpy
 import rna_keymap_ui
-from bpy.props import BoolProperty
+from bpy.props import BoolProperty, EnumProperty, IntProperty, StringProperty
 from bpy.types import AddonPreferences, Context, UILayout
 from bpy.utils import register_class, unregister_class
 
+from .boolean_proxy import proxy_mode_list
 from .constants import get_addon_name
 from .util.keymap_manager import KeymapManager
 
@@ -51,6 +52,57 @@ class Preference(AddonPreferences):
     )
     # ------
 
+    # --- Cache Option ---
+    use_geometry_cache: BoolProperty(
+        name="Geometry Cache",
+        description="Reuse the baked meshes of primitives with the same parameters",
+        default=False,
+    )
+    geometry_cache_dir: StringProperty(
+        name="Cache Directory",
+        description="Directory to store baked meshes (empty: the extension's user directory)",
+        subtype="DIR_PATH",
+        default="",
+    )
+    geometry_cache_memory_mb: IntProperty(
+        name="Memory Limit (MB)",
+        description="Maximum size of the baked meshes kept in memory",
+        default=256,
+        min=0,
+    )
+    # ------
+
+    # --- Polygon Budget Option ---
+    polygon_budget: IntProperty(
+        name="Polygon Budget (Triangles)",
+        description="Estimated number of triangles a primitive can have"
+        " when the divisions are edited (0: unlimited)",
+        default=2_000_000,
+        min=0,
+    )
+    polygon_budget_action: EnumProperty(
+        name="Over Budget",
+        description="What to do when the estimate exceeds the budget"
+        " (the estimates are approximate for some primitive types)",
+        items=(
+            ("WARN", "Warn", "Apply the value and show a warning"),
+            ("REJECT", "Reject", "Keep the previous value and show a warning"),
+            ("CLAMP", "Clamp", "Reduce the value to fit in the budget"),
+        ),
+        default="WARN",
+    )
+    # ------
+
+    # --- Boolean Option ---
+    boolean_proxy_mode: EnumProperty(
+        name="Boolean Proxy",
+        description="How the Boolean modifiers using a primitive as the cutter"
+        " are evaluated while the primitive is being edited",
+        items=proxy_mode_list,
+        default="NONE",
+    )
+    # ------
+
     # --- N-Panel Option ---
     show_npanel: BoolProperty(
         name="Show N-Panel",
@@ -73,6 +125,28 @@ class Preference(AddonPreferences):
         box.prop(self, "show_gizmo_value", text="Show Gizmo Value (Initial state)")
         box.prop(self, "show_world_space_value", text="Show World-Space Values")
 
+    def __box_cache(self, layout: UILayout) -> None:
+        box = layout.box()
+        box.label(text="Geometry Cache")
+        box.prop(self, "use_geometry_cache")
+        col = box.column()
+        col.enabled = self.use_geometry_cache
+        col.prop(self, "geometry_cache_dir")
+        col.prop(self, "geometry_cache_memory_mb")
+
+    def __box_budget(self, layout: UILayout) -> None:
+        box = layout.box()
+        box.label(text="Polygon Budget")
+        box.prop(self, "polygon_budget")
+        row = box.row()
+        row.enabled = self.polygon_budget > 0
+        row.prop(self, "polygon_budget_action")
+
+    def __box_boolean(self, layout: UILayout) -> None:
+        box = layout.box()
+        box.label(text="Boolean")
+        box.prop(self, "boolean_proxy_mode")
+
     def __box_shortcuts(self, layout: UILayout) -> None:
         wm = bpy.context.window_manager
         kc = wm.keyconfigs.user
@@ -123,6 +197,9 @@ class Preference(AddonPreferences):
     def draw(self, ctx: Context) -> None:
         self.__box_create(self.layout)
         self.__box_gizmo(self.layout)
+        self.__box_cache(self.layout)
+        self.__box_budget(self.layout)
+        self.__box_boolean(self.layout)
         self.__box_shortcuts(self.layout)
 
 
@@ -0,0 +1,252 @@
+from collections.abc import Hashable
+from typing import NamedTuple
+
+import bpy
+from bpy.app.handlers import persistent
+from bpy.types import Collection, Context, Depsgraph, NodesModifier, Object, Scene
+
+from .constants import DIVISION_LOD_MODIFIER_NAME, MODERN_PRIMITIVE_TAG, Type
+from .version import TypeAndVersion, VersionInt
+
+
+class PrimitiveEntry(NamedTuple):
+    obj: Object
+    # None if the type / version can't be determined (e.g. made by a newer add-on)
+    type: Type | None
+    version: VersionInt | None
+    # The modifier itself is not kept, as it's freed when removed
+    modifier_name: str
+
+    @property
+    def modifier(self) -> NodesModifier | None:
+        """The MPR modifier, resolved on access.
+        None if it was removed, renamed or moved since the scan"""
+        mods = self.obj.modifiers
+        if len(mods) == 0 or mods[0].name != self.modifier_name:
+            return None
+        return mods[0]
+
+    @property
+    def enabled(self) -> bool:
+        """Is the MPR modifier shown in the viewport?
+        (the division LOD hides it, and shows its copy instead)"""
+        mods = self.obj.modifiers
+        mod = self.modifier
+        return mod is not None and (
+            mod.show_viewport or (len(mods) > 1 and mods[1].name == DIVISION_LOD_MODIFIER_NAME)
+        )
+
+
+def _scan(obj: Object) -> PrimitiveEntry | None:
+    if obj.type != "MESH" or len(obj.modifiers) == 0:
+        return None
+    # For now, MPR modifier is fixed at 0 in the modifier list
+    mod = obj.modifiers[0]
+    if not mod.name.startswith(MODERN_PRIMITIVE_TAG):
+        return None
+    typ = Type.__members__.get(mod.name[len(MODERN_PRIMITIVE_TAG) :])
+    ng = getattr(mod, "node_group", None)
+    typ_ver = None if ng is None else TypeAndVersion.get_type_and_version(ng.name)
+    return PrimitiveEntry(obj, typ, None if typ_ver is None else typ_ver.version, mod.name)
+
+
+def _is_alive(obj: Object) -> bool:
+    try:
+        return bool(obj.name) or True
+    except ReferenceError:
+        return False
+
+
+class PrimitiveRegistry:
+    """Primitive information by object session_uid.
+    Objects are scanned on the first query, and re-scanned only when
+    the depsgraph reports them as updated"""
+
+    def __init__(self):
+        # Incremented on every change
+        self.generation = 0
+        self.clear()
+
+    def clear(self) -> None:
+        self._built = False
+        # None: known not to be a primitive
+        self._entries: dict[int, PrimitiveEntry | None] = {}
+        self.bump()
+
+    def bump(self) -> None:
+        # Results derived from the objects (e.g. SelectionCache) are outdated
+        self.generation += 1
+
+    def get(self, obj: Object) -> PrimitiveEntry | None:
+        uid = obj.session_uid
+        try:
+            ent = self._entries[uid]
+            # The modifier stack may have changed since the last depsgraph update
+            if ent is None or ent.modifier is not None:
+                return ent
+        except KeyError:
+            # Not reported by the depsgraph yet (e.g. just added in this operator)
+            pass
+        ent = self._entries[uid] = _scan(obj.original)
+        return ent
+
+    def invalidate(self, obj: Object) -> None:
+        """Must be called after the MPR modifier of obj is added or removed,
+        if it's queried again before the next depsgraph update"""
+        self._entries.pop(obj.session_uid, None)
+        self.bump()
+
+    def on_updates(self, depsgraph: Depsgraph) -> None:
+        # Selection changes are also reported as updates (of the scene)
+        self.bump()
+        for upd in depsgraph.updates:
+            id_data = upd.id.original
+            if isinstance(id_data, Object):
+                self._entries.pop(id_data.session_uid, None)
+                if self._built:
+                    self.get(id_data)
+
+    def _build(self) -> None:
+        if not self._built:
+            for obj in bpy.data.objects:
+                self.get(obj)
+            self._built = True
+
+    def objects(
+        self,
+        type_c: Type | None = None,
+        version: VersionInt | None = None,
+        collection: Collection | None = None,
+    ) -> list[Object]:
+        """All the primitives in the file, optionally filtered"""
+        self._build()
+        members = None if collection is None else set(collection.all_objects)
+        ret: list[Object] = []
+        dead: list[int] = []
+        for uid, ent in self._entries.items():
+            if ent is None:
+                continue
+            # Removed objects are not reported by the depsgraph
+            if not _is_alive(ent.obj):
+                dead.append(uid)
+                continue
+            if (
+                (type_c is None or ent.type == type_c)
+                and (version is None or ent.version == version)
+                and (members is None or ent.obj in members)
+            ):
+                ret.append(ent.obj)
+        for uid in dead:
+            del self._entries[uid]
+        return ret
+
+    def selected(self, context: Context) -> list[Object]:
+        """Selected primitives (in the order of context.selected_objects)"""
+        return [obj for obj in context.selected_objects if self.get(obj) is not None]
+
+
+PRIMITIVE_REGISTRY = PrimitiveRegistry()
+
+
+class SelectionSummary(NamedTuple):
+    n_selected: int
+    # Selected primitives (in the order of context.selected_objects)
+    primitives: list[Object]
+    # Types of the selected primitives (None for unknown types)
+    types: frozenset[Type | None]
+    # Are the MPR modifiers of all the selected primitives enabled?
+    all_enabled: bool
+    # Are all the selected objects meshes in object mode?
+    all_mesh: bool
+
+    @property
+    def has_primitive(self) -> bool:
+        return len(self.primitives) > 0
+
+    @property
+    def only_primitives(self) -> bool:
+        return self.n_selected > 0 and len(self.primitives) == self.n_selected
+
+
+class SelectionCache:
+    """Classification of the selection, shared by the polls and panels
+    until the selection, the active object or the mode changes.
+    The active object is a part of the key, so a context override
+    that replaces it (with the selection) gets its own result"""
+
+    def __init__(self):
+        self._key: Hashable = None
+        self._summary: SelectionSummary | None = None
+
+    @staticmethod
+    def _make_key(context: Context) -> Hashable:
+        act = context.active_object
+        return (
+            PRIMITIVE_REGISTRY.generation,
+            context.scene.session_uid,
+            context.view_layer.name,
+            context.mode,
+            None if act is None else act.session_uid,
+        )
+
+    def get(self, context: Context) -> SelectionSummary:
+        key = self._make_key(context)
+        if key != self._key or self._summary is None:
+            self._summary = self._classify(context)
+            self._key = key
+        return self._summary
+
+    @staticmethod
+    def _classify(context: Context) -> SelectionSummary:
+        sel = context.selected_objects
+        ents = [ent for ent in map(PRIMITIVE_REGISTRY.get, sel) if ent is not None]
+        return SelectionSummary(
+            len(sel),
+            [ent.obj for ent in ents],
+            frozenset(ent.type for ent in ents),
+            all(ent.enabled for ent in ents),
+            all(obj.type == "MESH" and obj.mode == "OBJECT" for obj in sel),
+        )
+
+    def clear(self) -> None:
+        self._key = None
+        self._summary = None
+
+
+SELECTION_CACHE = SelectionCache()
+
+
+@persistent
+def on_deps(scene: Scene, depsgraph: Depsgraph) -> None:
+    PRIMITIVE_REGISTRY.on_updates(depsgraph)
+
+
+@persistent
+def on_reset(*args) -> None:
+    # The data has been replaced, so the references are no longer valid
+    PRIMITIVE_REGISTRY.clear()
+    SELECTION_CACHE.clear()
+
+
+HANDLERS = (
+    (bpy.app.handlers.depsgraph_update_post, on_deps),
+    (bpy.app.handlers.undo_post, on_reset),
+    (bpy.app.handlers.redo_post, on_reset),
+    (bpy.app.handlers.load_post, on_reset),
+)
+
+
+def register() -> None:
+    PRIMITIVE_REGISTRY.clear()
+    SELECTION_CACHE.clear()
+    for handler, fn in HANDLERS:
+        if fn not in handler:
+            handler.append(fn)
+
+
+def unregister() -> None:
+    for handler, fn in HANDLERS:
+        if fn in handler:
+            handler.remove(fn)
+    PRIMITIVE_REGISTRY.clear()
+    SELECTION_CACHE.clear()
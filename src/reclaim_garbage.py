@@ -0,0 +1,96 @@
+import re
+from typing import ClassVar
+
+import bpy
+from bpy.types import ID, Context, Mesh, NodeGroup, Operator
+from bpy.utils import register_class, unregister_class
+
+from .util.aux_func import remove_if_unused
+from .util.aux_other import estimate_mesh_size, format_size
+from .constants import MODERN_PRIMITIVE_PREFIX, MODERN_PRIMITIVE_TAG
+
+# Prefix that the old version of "Apply Mesh" gave to the replaced meshes
+LEAKED_MESH_PREFIX = "__to_delete_"
+# "name.001" -> "name"
+RE_DUPLICATE_SUFFIX: re.Pattern[str] = re.compile(r"^(.+)\.\d{3,}$")
+
+
+def _is_mpr_node_group(ng: NodeGroup) -> bool:
+    return ng.name.startswith(MODERN_PRIMITIVE_TAG)
+
+
+def merge_duplicate_node_groups() -> list[NodeGroup]:
+    """Make the users of "[ModernPrimitive]xxx.001" use "[ModernPrimitive]xxx" instead.
+    Returns the node groups that are no longer used"""
+    ret: list[NodeGroup] = []
+    for ng in bpy.data.node_groups:
+        if not _is_mpr_node_group(ng):
+            continue
+        res = RE_DUPLICATE_SUFFIX.match(ng.name)
+        if res is None:
+            continue
+        base = bpy.data.node_groups.get(res.group(1))
+        if base is None or base.bl_idname != ng.bl_idname:
+            continue
+        ng.user_remap(base)
+        ret.append(ng)
+    return ret
+
+
+def collect_garbage() -> tuple[list[Mesh], list[NodeGroup]]:
+    """Datablocks left behind by the add-on which are no longer used"""
+    meshes = [
+        m for m in bpy.data.meshes if m.name.startswith(LEAKED_MESH_PREFIX) and m.users == 0
+    ]
+    node_groups = merge_duplicate_node_groups()
+    node_groups += [
+        ng
+        for ng in bpy.data.node_groups
+        if _is_mpr_node_group(ng) and ng.users == 0 and ng not in node_groups
+    ]
+    # Data which the user wants to keep is left alone
+    return (
+        [m for m in meshes if not m.use_fake_user],
+        [ng for ng in node_groups if not ng.use_fake_user],
+    )
+
+
+class ReclaimGarbage_Operator(Operator):
+    """Free the datablocks left behind by ModernPrimitive
+    (replaced meshes, unused or duplicated node groups)"""
+
+    bl_idname = f"wm.{MODERN_PRIMITIVE_PREFIX}_reclaim_garbage"
+    bl_label = "Reclaim MPR Garbage"
+    bl_options: ClassVar[set[str]] = {"REGISTER", "UNDO"}
+
+    def execute(self, context: Context) -> set[str]:
+        meshes, node_groups = collect_garbage()
+        size = sum(estimate_mesh_size(m) for m in meshes)
+        garbage: list[ID] = [*meshes, *node_groups]
+        if remove_if_unused(garbage) == 0:
+            self.report({"INFO"}, "No MPR garbage found")
+        else:
+            self.report(
+                {"INFO"},
+                f"Reclaimed {len(meshes)} mesh(es) and {len(node_groups)} node group(s)"
+                f" (mesh data: about {format_size(size)})",
+            )
+        return {"FINISHED"}
+
+
+MENU_TARGET = bpy.types.TOPBAR_MT_file_cleanup
+
+
+def menu_func(self, context: Context) -> None:
+    self.layout.separator()
+    self.layout.operator(ReclaimGarbage_Operator.bl_idname)
+
+
+def register() -> None:
+    register_class(ReclaimGarbage_Operator)
+    MENU_TARGET.append(menu_func)
+
+
+def unregister() -> None:
+    unregister_class(ReclaimGarbage_Operator)
+    MENU_TARGET.remove(menu_func)
@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from contextlib import suppress
 from typing import ClassVar
 
@@ -5,9 +6,11 @@ from bpy.types import Context, Object, Operator
 from bpy.utils import register_class, unregister_class
 from mathutils import Vector
 
-from .util.aux_func import get_mpr_modifier, get_selected_primitive
+from .bounds import calc_primitive_bounds
+from .util.aux_func import get_mpr_modifier, get_selected_primitive, get_selection_summary
 from .util.aux_math import MinMax
 from .util.aux_node import get_interface_value
+from .util.vertex_transform import transform_vertices
 from .constants import MODERN_PRIMITIVE_PREFIX
 from .primitive_prop import CornerRatio
 
@@ -21,35 +24,35 @@ class ResetOrigin_Operator(Operator):
     def poll(cls, context: Context | None) -> bool:
         if context is None:
             return False
-        return len(get_selected_primitive(context)) > 0
-
-    @classmethod
-    def proc_obj(cls, obj: Object) -> None:
-        box = MinMax.from_obj_bb(obj)
+        return get_selection_summary(context).has_primitive
 
+    @staticmethod
+    def _calc_center(obj: Object, box: MinMax) -> Vector:
         # Get pivot coordinates
         mod = get_mpr_modifier(obj.modifiers)
         diff = Vector()
         with suppress(KeyError):
             pivot = Vector(val for val in get_interface_value(mod, CornerRatio.name))
             diff = pivot * (box.size / 2)
+        return box.average + diff
 
-        center = box.average + diff
-        obj.location = obj.matrix_world @ center
+    @classmethod
+    def proc_objs(cls, objs: Sequence[Object], context: Context | None = None) -> None:
+        centers = [
+            cls._calc_center(obj, box)
+            for obj, box in zip(objs, calc_primitive_bounds(objs, context), strict=True)
+        ]
+        for obj, center in zip(objs, centers, strict=True):
+            obj.location = obj.matrix_world @ center
+        # Inverse offset vertices (of all the objects at once)
+        transform_vertices([obj.data for obj in objs], offset=[-c for c in centers])
 
-        mesh = obj.data
-        offset = -center
-        # Inverse offset vertices
-        for v in mesh.vertices:
-            v.co += offset
-        mesh.update()
+    @classmethod
+    def proc_obj(cls, obj: Object) -> None:
+        cls.proc_objs([obj])
 
     def execute(self, context: Context | None) -> set[str]:
-        sel = get_selected_primitive(context)
-        cls = self.__class__
-        for obj in sel:
-            cls.proc_obj(obj)
-
+        self.__class__.proc_objs(get_selected_primitive(context), context)
         return {"FINISHED"}
 
 
@@ -2,20 +2,23 @@ from typing import Any, ClassVar
 
 import bpy
 from bpy.props import BoolProperty, EnumProperty
-from bpy.types import Context, Object, Operator
+from bpy.types import ID, Context, NodeGroup, Object, Operator
 from bpy.utils import register_class, unregister_class
 from idprop.types import IDPropertyArray
 
 from . import primitive as P
+from .asset_defaults import ASSET_DEFAULTS
 from .util.aux_func import (
     get_blend_file_path_by_type,
     get_mpr_modifier,
     get_selected_primitive,
+    get_selection_summary,
     type_from_modifier_name,
 )
-from .util.aux_node import get_interface_values, set_interface_values
+from .util.aux_node import get_interface_values, set_interface_value
 from .constants import MODERN_PRIMITIVE_PREFIX, Type
 from .primitive_prop import Prop, PropType, prop_from_name
+from .version import get_primitive_version
 
 reset_list = (
     ("All", "All", "Around XYZ axis"),
@@ -39,7 +42,7 @@ class RestoreDefault_Operator(Operator):
 
     @classmethod
     def poll(cls, context: Context | None) -> bool:
-        return len(get_selected_primitive(context)) > 0
+        return get_selection_summary(context).has_primitive
 
     def draw(self, context: Context):
         layout = self.layout
@@ -54,41 +57,46 @@ class RestoreDefault_Operator(Operator):
 
         layout.prop(self, "reset_other")
 
+    @staticmethod
+    def _match_mode(k: Prop, mode: str) -> bool:
+        match mode:
+            case "All":
+                return True
+            case "Width":
+                return k.has_tag(PropType.Width)
+            case "Height":
+                return k.has_tag(PropType.Height)
+        return False
+
+    def _is_target(self, k: Prop) -> bool:
+        return (
+            (
+                k.has_tag(PropType.Size)
+                and self.reset_size
+                and self._match_mode(k, self.reset_size_mode)
+            )
+            or (
+                k.has_tag(PropType.Division)
+                and self.reset_division
+                and self._match_mode(k, self.reset_division_mode)
+            )
+            or (k.has_tag(PropType.Other) and self.reset_other)
+        )
+
     def execute(self, context: Context) -> set[str]:
         sel = get_selected_primitive(context)
+        node_groups: dict[str, NodeGroup] = {}
         for obj in sel:
             mod = get_mpr_modifier(obj.modifiers)
             typ = type_from_modifier_name(mod.name)
-            def_val = get_default_value(typ)
-
-            params: list[tuple[str, Any]] = []
-            for k, v in def_val.items():
-                valid = False
-                if k.has_tag(PropType.Size) and self.reset_size:
-                    match self.reset_size_mode:
-                        case "All":
-                            valid = True
-                        case "Width":
-                            valid |= k.has_tag(PropType.Width)
-                        case "Height":
-                            valid |= k.has_tag(PropType.Height)
-
-                if k.has_tag(PropType.Division) and self.reset_division:
-                    match self.reset_division_mode:
-                        case "All":
-                            valid = True
-                        case "Width":
-                            valid |= k.has_tag(PropType.Width)
-                        case "Height":
-                            valid |= k.has_tag(PropType.Height)
-
-                if k.has_tag(PropType.Other) and self.reset_other:
-                    valid = True
-
-                if valid:
-                    params.append((k.name, v))
-            set_interface_values(mod, context, params)
-
+            for k, v in get_default_value(typ).items():
+                if self._is_target(k):
+                    set_interface_value(mod, (k.name, v))
+            node_groups[mod.node_group.name] = mod.node_group
+
+        # Update each node group only once
+        for ng in node_groups.values():
+            ng.interface_update(context)
         return {"FINISHED"}
 
 
@@ -101,26 +109,61 @@ def expand_idarray(val: Any) -> Any:
     return val
 
 
-def get_default_value(typ: Type) -> dict[Prop, Any]:
-    if typ not in _default_value:
-        path = get_blend_file_path_by_type(typ, False)
-        with bpy.data.libraries.load(str(path)) as (data_from, data_to):
-            data_to.objects = [str(typ.name)]
+# Datablocks the asset object brings in (with it)
+_ASSET_COLLECTIONS = ("meshes", "node_groups", "materials", "images")
+
+
+def _remove_loaded(before: dict[str, set[ID]]) -> None:
+    # Free everything appended with the asset object,
+    #   dependencies become unused only after their users are removed
+    loaded = [
+        i
+        for name in _ASSET_COLLECTIONS
+        for i in getattr(bpy.data, name)
+        if i not in before[name]
+    ]
+    while True:
+        unused = {i for i in loaded if i.users == 0 and not i.use_fake_user}
+        if len(unused) == 0:
+            break
+        bpy.data.batch_remove(unused)
+        loaded = [i for i in loaded if i not in unused]
 
-        obj: Object = data_to.objects[0]
 
-        param_names = P.TYPE_TO_PRIMITIVE[typ].get_param_names()
+def load_default_value(typ: Type) -> dict[Prop, Any]:
+    """Read the values of the asset object (appended, and removed right away)"""
+    path = get_blend_file_path_by_type(typ, False)
+    before = {name: set(getattr(bpy.data, name)) for name in _ASSET_COLLECTIONS}
+    with bpy.data.libraries.load(str(path)) as (data_from, data_to):
+        data_to.objects = [str(typ.name)]
 
-        result: dict[Prop, Any] = {}
-        param_values = get_interface_values(get_mpr_modifier(obj.modifiers), param_names)
-        for k, v in param_values.items():
-            result[prop_from_name(k)] = expand_idarray(v)
+    obj: Object = data_to.objects[0]
 
-        # I'm done with it so I'll delete it now
-        bpy.data.objects.remove(obj)
+    param_names = P.TYPE_TO_PRIMITIVE[typ].get_param_names()
 
-        _default_value[typ] = result
+    result: dict[Prop, Any] = {}
+    param_values = get_interface_values(get_mpr_modifier(obj.modifiers), param_names)
+    for k, v in param_values.items():
+        result[prop_from_name(k)] = expand_idarray(v)
 
+    # I'm done with it so I'll delete it now (with its mesh, node groups...)
+    bpy.data.objects.remove(obj)
+    _remove_loaded(before)
+    return result
+
+
+def _stored_default_value(typ: Type) -> dict[Prop, Any] | None:
+    # None if the asset has been updated since the values were stored
+    stored = ASSET_DEFAULTS.get(typ.name)
+    if stored is None or stored[0] != get_primitive_version(typ).num:
+        return None
+    return {prop_from_name(k): v for k, v in stored[1].items()}
+
+
+def get_default_value(typ: Type) -> dict[Prop, Any]:
+    if typ not in _default_value:
+        value = _stored_default_value(typ)
+        _default_value[typ] = load_default_value(typ) if value is None else value
     return _default_value[typ]
 
 
@@ -0,0 +1,406 @@
+import itertools
+from collections.abc import Callable, Mapping, MutableMapping, Sequence
+from typing import Any, NamedTuple
+
+import bpy
+import numpy as np
+from bpy.types import Context, NodesModifier, Object
+
+from . import primitive_prop as P
+from .util.aux_func import get_addon_preferences, get_mpr_modifier, load_primitive_from_asset
+from .util.aux_node import set_interface_values
+from .constants import Type
+
+# Interface values (a scalar or an array per object) by property name
+Params = Mapping[str, Any]
+
+# Properties that change the number of polygons
+TOPOLOGY_PROPS = frozenset(
+    {p for p in P.PROP_LIST if p.has_tag(P.PT.Division)} | {P.Rotations, P.FilletCount}
+)
+
+
+class Topology(NamedTuple):
+    verts: np.ndarray
+    faces: np.ndarray
+    tris: np.ndarray
+
+
+def _div(params: Params, prop: P.Prop, minimum: int = 1) -> np.ndarray:
+    return np.maximum(np.rint(np.asarray(params[prop.name], dtype=np.float64)), minimum)
+
+
+def _global_div(params: Params, prop: P.Prop) -> np.ndarray:
+    # Divisions per axis are multiplied by the global division (in float32, and truncated)
+    g = np.asarray(params[P.GlobalDivision.name], dtype=np.float32)
+    div = np.rint(np.asarray(params[prop.name], dtype=np.float64)).astype(np.float32)
+    return np.maximum(np.floor(div * g), 1).astype(np.float64)
+
+
+def _is_zero(params: Params, prop: P.Prop) -> np.ndarray:
+    # Values not given (e.g. by the bulk edit) are assumed to be non-zero
+    return np.asarray(params.get(prop.name, 1.0), dtype=np.float64) == 0
+
+
+def _grid(a: np.ndarray, b: np.ndarray) -> Topology:
+    return Topology((a + 1) * (b + 1), a * b, 2 * a * b)
+
+
+def _box(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Topology:
+    faces = 2 * (a * b + b * c + c * a)
+    return Topology((a + 1) * (b + 1) * (c + 1) - (a - 1) * (b - 1) * (c - 1), faces, 2 * faces)
+
+
+# Top and bottom
+CYLINDER_ENDS = 2
+
+
+def _cylinder(
+    circle: np.ndarray,
+    side: np.ndarray,
+    fill: np.ndarray,
+    n_apex: np.ndarray,
+    has_caps: np.ndarray,
+) -> Topology:
+    """n_apex: number of the ends with zero radius (0-2),
+    which are merged into a vertex and have no cap"""
+    n_caps = np.where(has_caps, CYLINDER_ENDS - n_apex, 0)
+    # Each cap: rings of quads + a n-gon at the center
+    cap_quads = circle * (fill - 1)
+    verts = circle * (side + 1) - n_apex * (circle - 1) + n_caps * cap_quads
+    faces = circle * side + n_caps * (cap_quads + 1)
+    # The side faces touching an apex are triangles
+    tris = 2 * circle * side - n_apex * circle + n_caps * (2 * cap_quads + circle - 2)
+    # Both ends at zero: only a line is left
+    line = n_apex >= CYLINDER_ENDS
+    return Topology(
+        np.where(line, side + 1, verts), np.where(line, 0, faces), np.where(line, 0, tris)
+    )
+
+
+def _cube(params: Params) -> Topology:
+    return _box(
+        _global_div(params, P.DivisionX),
+        _global_div(params, P.DivisionY),
+        _global_div(params, P.DivisionZ),
+    )
+
+
+def _grid_type(params: Params) -> Topology:
+    return _grid(_global_div(params, P.DivisionX), _global_div(params, P.DivisionY))
+
+
+def _cone(params: Params) -> Topology:
+    return _cylinder(
+        _div(params, P.DivisionCircle, 3),
+        _div(params, P.DivisionSide),
+        _div(params, P.DivisionFill),
+        _is_zero(params, P.TopRadius).astype(np.float64)
+        + _is_zero(params, P.BottomRadius).astype(np.float64),
+        np.bool_(True),
+    )
+
+
+def _cylinder_type(params: Params) -> Topology:
+    return _cylinder(
+        _div(params, P.DivisionCircle, 3),
+        _div(params, P.DivisionSide),
+        _div(params, P.DivisionFill),
+        2 * _is_zero(params, P.Radius).astype(np.float64),
+        # Assume the caps if not given (e.g. by the bulk edit)
+        np.asarray(params.get(P.Fill.name, True), dtype=bool),
+    )
+
+
+def _torus(params: Params) -> Topology:
+    n = _div(params, P.DivisionRing, 3) * _div(params, P.DivisionCircle, 3)
+    return Topology(n, n, 2 * n)
+
+
+def _uv_sphere(params: Params) -> Topology:
+    circle = _div(params, P.DivisionCircle, 3)
+    ring = _div(params, P.DivisionRing, 2)
+    return Topology(circle * (ring - 1) + 2, circle * ring, 2 * circle * (ring - 1))
+
+
+def _ico_sphere(params: Params) -> Topology:
+    n = 4 ** (_div(params, P.Subdivision) - 1)
+    return Topology(10 * n + 2, 20 * n, 20 * n)
+
+
+def _quad_sphere(params: Params) -> Topology:
+    # Subdivided cube
+    a = 2 ** _div(params, P.Subdivision, 0)
+    return _box(a, a, a)
+
+
+def _tube(params: Params) -> Topology:
+    circle = _div(params, P.DivisionCircle, 3)
+    side = _div(params, P.DivisionSide)
+    # Outer and inner walls (quads) + top and bottom rings (triangulated)
+    return Topology(
+        2 * circle * (side + 1),
+        2 * circle * side + 4 * circle,
+        4 * circle * side + 4 * circle,
+    )
+
+
+def _capsule(params: Params) -> Topology:
+    circle = _div(params, P.DivisionCircle, 3)
+    side = _div(params, P.DivisionSide)
+    cap = _div(params, P.DivisionCap)
+    # Cylinder + two hemispheres (rings of quads and a triangle fan)
+    return Topology(
+        circle * (side + 1) + 2 * (circle * (cap - 1) + 1),
+        circle * side + 2 * circle * cap,
+        2 * circle * side + 2 * (2 * circle * (cap - 1) + circle),
+    )
+
+
+def _spring(params: Params) -> Topology:
+    # A ring swept along the helix (the partial segment of the last turn is dropped)
+    path = _div(params, P.DivisionCircle, 3) * np.maximum(
+        np.asarray(params[P.Rotations.name], dtype=np.float32), 0
+    )
+    path = np.floor(path).astype(np.float64) + 1
+    ring = _div(params, P.DivisionRing, 3)
+    return Topology(
+        path * ring,
+        (path - 1) * ring + 2,
+        2 * (path - 1) * ring + 2 * (ring - 2),
+    )
+
+
+def _gear(params: Params) -> Topology:
+    # Outline of the blades (2 + 2 per fillet step, at least one) and the inner circle,
+    #   extruded by the height. Top and bottom faces are triangle strips between the two.
+    # With 3 blades, or the inner circle larger than the blade root,
+    #   some of the faces are merged, so it's an upper bound
+    outline = _div(params, P.NumBlades, 3) * (2 + 2 * _div(params, P.FilletCount, 1))
+    side = outline + _div(params, P.InnerCircleDivision, 3)
+    return Topology(2 * side, 3 * side, 4 * side)
+
+
+def _deformable_cube(params: Params) -> Topology:
+    one = np.ones_like(np.asarray(params[P.MinX.name], dtype=np.float64))
+    return _box(one, one, one)
+
+
+ESTIMATOR: dict[Type, Callable[[Params], Topology]] = {
+    Type.Cube: _cube,
+    Type.Cone: _cone,
+    Type.Grid: _grid_type,
+    Type.Torus: _torus,
+    Type.Cylinder: _cylinder_type,
+    Type.UVSphere: _uv_sphere,
+    Type.ICOSphere: _ico_sphere,
+    Type.Tube: _tube,
+    Type.Gear: _gear,
+    Type.Spring: _spring,
+    Type.DeformableCube: _deformable_cube,
+    Type.Capsule: _capsule,
+    Type.QuadSphere: _quad_sphere,
+}
+
+
+def estimate_topology(type_c: Type, params: Params) -> Topology:
+    """Vertex / face / triangle counts of the primitive, computed from the parameters
+    without evaluating the node tree (the values can be arrays, to estimate many at once).
+    Snapping may change the actual divisions, so it's an estimate"""
+    return ESTIMATOR[type_c](params)
+
+
+def _scale_params(
+    params: Params, targets: Sequence[P.Prop], factor: np.ndarray
+) -> dict[str, Any]:
+    ret = dict(params)
+    for p in targets:
+        val = np.asarray(params[p.name], dtype=np.float64) * factor
+        ret[p.name] = np.floor(val) if p.type is int else val
+    return ret
+
+
+def fit_factor(
+    type_c: Type, params: Params, targets: Sequence[P.Prop], max_tris: int
+) -> np.ndarray:
+    """Largest factor (<= 1) of the targets which makes the estimate fit in max_tris"""
+    tris = np.asarray(estimate_topology(type_c, params).tris)
+    lo = np.where(tris <= max_tris, 1.0, 0.0)
+    hi = np.ones(tris.shape)
+    # Bisection (for all the objects at once)
+    for _ in range(24):
+        mid = (lo + hi) / 2
+        fits = estimate_topology(type_c, _scale_params(params, targets, mid)).tris <= max_tris
+        lo = np.where(fits, mid, lo)
+        hi = np.where(fits, hi, mid)
+    return lo
+
+
+class PolygonBudget:
+    """Keeps the primitives under the triangle budget of the preferences
+    when the division parameters are changed"""
+
+    def __init__(self, max_tris: int, action: str):
+        self.max_tris = max_tris
+        # "WARN", "REJECT" or "CLAMP"
+        self.action = action
+        # Number of objects over the budget
+        self.n_limited = 0
+
+    @classmethod
+    def from_preferences(cls, context: Context):
+        """None if the budget is disabled"""
+        pref = get_addon_preferences(context)
+        if pref.polygon_budget <= 0:
+            return None
+        return cls(pref.polygon_budget, pref.polygon_budget_action)
+
+    def over_budget(self, type_c: Type, before: Params, after: Params) -> np.ndarray:
+        # Values that reduce the polygons are always accepted
+        tris = estimate_topology(type_c, after).tris
+        return (tris > self.max_tris) & (tris > estimate_topology(type_c, before).tris)
+
+    def limit(
+        self,
+        type_c: Type,
+        before: Params,
+        after: MutableMapping[str, Any],
+        targets: Sequence[P.Prop],
+    ) -> np.ndarray:
+        """Limit the target values of after (modified in place).
+        The objects over the budget are clamped, get back the values of before,
+        or are left as they are (WARN). Returns the mask of the objects over the budget"""
+        over = self.over_budget(type_c, before, after)
+        if not np.any(over):
+            return over
+        if self.action == "WARN":
+            pass
+        elif self.action == "CLAMP":
+            factor = fit_factor(type_c, after, targets, self.max_tris)
+            scaled = _scale_params(after, targets, factor)
+            for p in targets:
+                after[p.name] = np.where(over, scaled[p.name], after[p.name])
+        else:
+            for p in targets:
+                after[p.name] = np.where(over, before[p.name], after[p.name])
+        self.n_limited += int(np.count_nonzero(over))
+        return over
+
+    def message(self) -> str:
+        action = {"CLAMP": "clamped", "REJECT": "rejected"}.get(self.action, "applied")
+        return (
+            f"{self.n_limited} object(s) {action}:"
+            f" over the polygon budget ({self.max_tris:,} triangles)"
+        )
+
+
+def measure_topology(context: Context, obj: Object) -> Topology:
+    """Actual counts of the evaluated mesh"""
+    mesh = obj.evaluated_get(context.evaluated_depsgraph_get()).to_mesh()
+    try:
+        mesh.calc_loop_triangles()
+        return Topology(
+            np.asarray(len(mesh.vertices)),
+            np.asarray(len(mesh.polygons)),
+            np.asarray(len(mesh.loop_triangles)),
+        )
+    finally:
+        obj.evaluated_get(context.evaluated_depsgraph_get()).to_mesh_clear()
+
+
+def validate_estimator(
+    context: Context, type_c: Type, grid: Mapping[str, Sequence[Any]]
+) -> list[tuple[dict[str, Any], Topology, Topology]]:
+    """Compare the estimates with the evaluated meshes over the parameter grid
+    (for development, e.g. from the Python console).
+    Returns (params, estimated, measured) of the mismatches"""
+    obj = load_primitive_from_asset(type_c, context, False)
+    mod = get_mpr_modifier(obj.modifiers)
+    try:
+        mismatches: list[tuple[dict[str, Any], Topology, Topology]] = []
+        for values in itertools.product(*grid.values()):
+            grid_params = dict(zip(grid.keys(), values, strict=True))
+            set_interface_values(mod, context, grid_params.items())
+            context.view_layer.update()
+            measured = measure_topology(context, obj)
+            params = {name: mod[key] for name, key in _interface_names(mod).items()}
+            estimated = estimate_topology(type_c, params)
+            if any(int(e) != int(m) for e, m in zip(estimated, measured, strict=True)):
+                mismatches.append((grid_params, estimated, measured))
+        return mismatches
+    finally:
+        bpy.data.objects.remove(obj)
+
+
+# Parameter grids validate_estimators() checks (snapping disabled)
+VALIDATION_GRIDS: dict[Type, dict[str, list[Any]]] = {
+    Type.Cube: {
+        P.DivisionX.name: [1, 2, 5],
+        P.DivisionY.name: [1, 3],
+        P.DivisionZ.name: [1, 4],
+        P.GlobalDivision.name: [0.3, 0.5, 1.0, 2.5],
+    },
+    Type.Cone: {
+        P.DivisionCircle.name: [3, 4, 16],
+        P.DivisionSide.name: [1, 3],
+        P.DivisionFill.name: [1, 2, 4],
+        P.TopRadius.name: [0.0, 1e-4, 1.0],
+        P.BottomRadius.name: [0.0, 2.0],
+    },
+    Type.Grid: {
+        P.DivisionX.name: [1, 2, 7],
+        P.DivisionY.name: [1, 5],
+        P.GlobalDivision.name: [1, 3],
+    },
+    Type.Torus: {P.DivisionRing.name: [3, 8], P.DivisionCircle.name: [3, 16]},
+    Type.Cylinder: {
+        P.DivisionCircle.name: [3, 16],
+        P.DivisionSide.name: [1, 3],
+        P.DivisionFill.name: [1, 2, 4],
+        P.Fill.name: [True, False],
+    },
+    Type.UVSphere: {P.DivisionRing.name: [2, 3, 8], P.DivisionCircle.name: [3, 16]},
+    Type.ICOSphere: {P.Subdivision.name: [1, 2, 4]},
+    Type.Tube: {P.DivisionCircle.name: [3, 16], P.DivisionSide.name: [1, 3]},
+    # Left out as the estimates are upper bounds: 3 blades,
+    #   and the inner circle larger than the blade root (Inner Radius)
+    Type.Gear: {
+        P.NumBlades.name: [4, 5, 16],
+        P.InnerCircleDivision.name: [3, 16],
+        P.FilletCount.name: [0, 1, 3],
+        P.InnerRadius.name: [0.6, 0.9],
+        P.InnerCircleRadius.name: [0.1, 0.5],
+    },
+    Type.Spring: {
+        P.DivisionCircle.name: [3, 16],
+        P.DivisionRing.name: [3, 8],
+        P.Rotations.name: [0.5, 1.0, 2.3, 3.0],
+    },
+    Type.DeformableCube: {P.MinX.name: [0.5, 1.0]},
+    Type.Capsule: {
+        P.DivisionCircle.name: [3, 16],
+        P.DivisionCap.name: [1, 2, 8],
+        P.DivisionSide.name: [1, 3],
+    },
+    Type.QuadSphere: {P.Subdivision.name: [0, 1, 2, 4]},
+}
+
+
+def validate_estimators(
+    context: Context,
+) -> dict[Type, list[tuple[dict[str, Any], Topology, Topology]]]:
+    """validate_estimator() over VALIDATION_GRIDS (for development, see tools/).
+    Returns the mismatches of each type"""
+    return {
+        type_c: validate_estimator(context, type_c, grid)
+        for type_c, grid in VALIDATION_GRIDS.items()
+    }
+
+
+def _interface_names(mod: NodesModifier) -> dict[str, str]:
+    # Socket name -> identifier
+    return {
+        item.name: item.identifier
+        for item in mod.node_group.interface.items_tree
+        if item.item_type == "SOCKET" and item.in_out == "INPUT" and item.identifier in mod
+    }
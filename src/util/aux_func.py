@@ -5,6 +5,7 @@ from pathlib import Path
 import bpy
 from bpy.types import (
     AddonPreferences,
+    ID,
     Context,
     Modifier,
     NodeGroup,
@@ -18,6 +19,7 @@ from mathutils import Matrix, Vector
 
 from ..constants import (
     ASSET_DIR_NAME,
+    DIVISION_LOD_MODIFIER_NAME,
     MODERN_PRIMITIVE_PREFIX,
     MODERN_PRIMITIVE_TAG,
     MODERN_PRIMITIVE_CATEGORY,
@@ -27,12 +29,18 @@ from ..constants import (
 )
 from ..exception import (
     DGFileNotFound,
-    DGInvalidVersionNumber,
     DGModifierNotFound,
+    DGNodeGroupNotFound,
     DGObjectNotFound,
     DGUnknownType,
 )
-from ..version import VersionInt, get_primitive_version
+from ..primitive_registry import (
+    PRIMITIVE_REGISTRY,
+    SELECTION_CACHE,
+    PrimitiveEntry,
+    SelectionSummary,
+)
+from ..version import NODE_GROUP_INDEX, TypeAndVersion, VersionInt, get_primitive_version
 
 
 def get_mpr_modifier(mods: ObjectModifiers) -> NodesModifier:
@@ -128,19 +136,7 @@ def show_error_message(msg: str, title: str = "Error") -> None:
 
 
 def get_node_group(type_c: Type, minimum_version: VersionInt) -> NodeGroup | None:
-    prefix: str = node_group_name_prefix(type_c)
-    matched: NodeGroup | None = None
-
-    for ng in bpy.data.node_groups:
-        if ng.name.startswith(prefix):
-            try:
-                ver: VersionInt = VersionInt.get_version_from_string(ng.name)
-                if ver >= minimum_version:
-                    matched = ng
-            except DGInvalidVersionNumber:
-                pass
-
-    return matched
+    return NODE_GROUP_INDEX.newest(type_c, minimum_version)
 
 
 def share_node_group_if_exists(type_c: Type, obj: Object) -> None:
@@ -155,6 +151,31 @@ def share_node_group_if_exists(type_c: Type, obj: Object) -> None:
         bpy.data.node_groups.remove(to_delete)
 
 
+def append_node_group_from_asset(type_c: Type) -> NodeGroup:
+    file_path = Path(get_blend_file_path_by_type(type_c, False))
+    if not file_path.exists():
+        raise DGFileNotFound(file_path)
+
+    with bpy.data.libraries.load(str(file_path)) as (data_from, data_to):
+        for ng_name in data_from.node_groups:
+            tv = TypeAndVersion.get_type_and_version(ng_name)
+            if tv is not None and tv.type == type_c:
+                data_to.node_groups = [ng_name]
+                break
+        else:
+            raise DGNodeGroupNotFound(type_c.name, str(file_path))
+    return data_to.node_groups[0]
+
+
+# Returns the node group already in the file if possible,
+#   otherwise load only the node group (not the whole object) from the asset
+def get_or_load_node_group(type_c: Type) -> NodeGroup:
+    node_group = get_node_group(type_c, get_primitive_version(type_c))
+    if node_group is None:
+        node_group = append_node_group_from_asset(type_c)
+    return node_group
+
+
 def load_primitive_from_asset(type_c: Type, context: Context, set_rot: bool) -> Object:
     obj = append_object_from_asset(type_c, context)
     # This line may not be necessary,
@@ -171,18 +192,18 @@ def load_primitive_from_asset(type_c: Type, context: Context, set_rot: bool) ->
     return obj
 
 
+# Type, version and modifier of the primitive (None if obj isn't one)
+def get_primitive_entry(obj: Object) -> PrimitiveEntry | None:
+    return PRIMITIVE_REGISTRY.get(obj)
+
+
 def is_modern_primitive(obj: Object) -> bool:
-    if obj.type != "MESH" or len(obj.modifiers) == 0:
-        return False
-    with suppress(DGModifierNotFound):
-        return is_primitive_mod(get_mpr_modifier(obj.modifiers))
-    return False
+    return PRIMITIVE_REGISTRY.get(obj) is not None
 
 
 def is_modern_primitive_specific(obj: Object, type_c: Type) -> bool:
-    if not is_modern_primitive(obj):
-        return False
-    return get_mpr_modifier(obj.modifiers).name == modifier_name(type_c)
+    ent = PRIMITIVE_REGISTRY.get(obj)
+    return ent is not None and ent.type == type_c
 
 
 def get_blend_file_path_by_type(type_c: Type, is_relative: bool) -> str:
@@ -234,23 +255,41 @@ def is_primitive_property(name: str) -> bool:
 
 def get_active_and_selected_primitive(context: Context) -> Object | None:
     obj = context.view_layer.objects.active
-    if obj is not None and is_modern_primitive(obj):
-        sel = context.selected_objects
-        if obj in sel:
-            return obj
+    if obj is not None and obj.select_get() and is_modern_primitive(obj):
+        return obj
     return None
 
 
 # Return the selected modern primitive
 def get_selected_primitive(context: Context) -> list[Object]:
-    ret: list[Object] = []
-    sel = context.selected_objects
-    for obj in sel:
-        if is_modern_primitive(obj):
-            ret.append(obj)
+    return PRIMITIVE_REGISTRY.selected(context)
+
+
+# Classification of the selection for poll() and panels
+#   (cached until the selection changes, don't use it after modifying the selection)
+def get_selection_summary(context: Context) -> SelectionSummary:
+    return SELECTION_CACHE.get(context)
+
+
+# Group the primitives by the node group of their modifier
+#   (node group name -> (node group, objects))
+def group_by_node_group(objs: Iterable[Object]) -> dict[str, tuple[NodeGroup, list[Object]]]:
+    ret: dict[str, tuple[NodeGroup, list[Object]]] = {}
+    for obj in objs:
+        ng = get_mpr_modifier(obj.modifiers).node_group
+        ret.setdefault(ng.name, (ng, []))[1].append(obj)
     return ret
 
 
+# Free the datablocks nothing uses any more right away
+#   (instead of leaving them until the file is reloaded or purged)
+def remove_if_unused(ids: Iterable[ID]) -> int:
+    to_remove = {i for i in ids if i.users == 0 and not i.use_fake_user}
+    if len(to_remove) > 0:
+        bpy.data.batch_remove(to_remove)
+    return len(to_remove)
+
+
 def get_addon_preferences(context: Context) -> AddonPreferences:
     return context.preferences.addons[get_addon_name()].preferences
 
@@ -310,7 +349,8 @@ def disable_modifier(mod: Modifier) -> None:
 
 
 def is_mpr_enabled(mod: ObjectModifiers) -> bool:
-    return mod[0].show_viewport
+    # The division LOD hides it, and shows its copy instead
+    return mod[0].show_viewport or (len(mod) > 1 and mod[1].name == DIVISION_LOD_MODIFIER_NAME)
 
 
 def get_view3d_pos(region: RegionView3D) -> Vector:
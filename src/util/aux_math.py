@@ -1,10 +1,11 @@
 import math
 import sys
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from math import isclose as m_isclose
 from sys import float_info
 from typing import NamedTuple
 
+import numpy as np
 from bpy.types import Object
 from mathutils import Quaternion, Vector
 
@@ -33,18 +34,32 @@ class MinMax(NamedTuple):
 
     @staticmethod
     def from_iterable(verts: Iterable[Iterable[float]]):
-        min_v = make_vec3(float_info.max)
-        max_v = make_vec3(-float_info.max)
-        for pos in verts:
-            for i in range(3):
-                min_v[i] = min(min_v[i], pos[i])
-                max_v[i] = max(max_v[i], pos[i])
-        return MinMax(min_v, max_v)
+        return MinMax.from_array(np.array([tuple(pos) for pos in verts], dtype=np.float64))
+
+    @staticmethod
+    def from_array(verts: np.ndarray):
+        """verts: (N, 3) array"""
+        if len(verts) == 0:
+            return MinMax(make_vec3(float_info.max), make_vec3(-float_info.max))
+        return MinMax(Vector(verts.min(axis=0)), Vector(verts.max(axis=0)))
 
     @classmethod
     def from_obj_bb(cls, obj: Object):
-        cls.update_obj(obj)
-        return MinMax.from_iterable(obj.bound_box)
+        return cls.from_objs_bb([obj])[0]
+
+    @classmethod
+    def from_objs_bb(cls, objs: Sequence[Object]) -> list["MinMax"]:
+        """Bounding box of each object (in local space)"""
+        for obj in objs:
+            cls.update_obj(obj)
+        if len(objs) == 0:
+            return []
+        # (n, 8, 3): corners of every bound_box at once
+        corners = np.array([obj.bound_box for obj in objs], dtype=np.float64)
+        return [
+            MinMax(Vector(lo), Vector(hi))
+            for lo, hi in zip(corners.min(axis=1), corners.max(axis=1), strict=True)
+        ]
 
     def __str__(self) -> str:
         return f"MinMax(min={self.min}, max={self.max})"
@@ -117,6 +132,16 @@ class BBox:
         self.size = self.max - self.min
         self.center = (self.min + self.max) / 2
 
+    @classmethod
+    def from_array(cls, verts: np.ndarray):
+        """Make from an (N, 3) coordinate array"""
+        ret = cls.__new__(cls)
+        ret.min = Vector(verts.min(axis=0))
+        ret.max = Vector(verts.max(axis=0))
+        ret.size = ret.max - ret.min
+        ret.center = (ret.min + ret.max) / 2
+        return ret
+
     def __str__(self) -> str:
         return f"BBox(min={self.min}, max={self.max},\
 size={self.size}, center={self.center})"
@@ -2,11 +2,14 @@ from typing import Any
 from collections.abc import Callable, Iterable
 
 from bpy.types import (
+    ID,
     Context,
     NodeGroup,
     NodeGroupInput,
     NodesModifier,
+    NodeTree,
 )
+from idprop.types import IDPropertyArray
 
 
 def find_group_input(node_group: NodeGroup) -> NodeGroupInput:
@@ -24,20 +27,115 @@ def find_interface_name(node_group: NodeGroup, name: str) -> str:
     raise KeyError(name)
 
 
-def copy_geometry_node_params(mod_dst: NodesModifier, mod_src: NodesModifier) -> None:
-    def enum_group_input(node_group: NodeGroup) -> list[str]:
-        ret = []
-        gi = find_group_input(node_group)
-        for o in gi.outputs:
-            if o.identifier.startswith("_") or o.type == "GEOMETRY":
-                continue
-            ret.append(o.identifier)
-        return ret
+# Identifiers of the parameters of the node group (except geometry)
+def enum_group_input(node_group: NodeGroup) -> list[str]:
+    ret = []
+    gi = find_group_input(node_group)
+    for o in gi.outputs:
+        if o.identifier.startswith("_") or o.type == "GEOMETRY":
+            continue
+        ret.append(o.identifier)
+    return ret
+
 
+def copy_geometry_node_params(mod_dst: NodesModifier, mod_src: NodesModifier) -> None:
     for sock_name in enum_group_input(mod_src.node_group):
         mod_dst[sock_name] = mod_src[sock_name]
 
 
+def canonical_value(val: Any) -> Any:
+    """Hashable value which doesn't depend on the session"""
+    if isinstance(val, IDPropertyArray):
+        return tuple(val.to_list())
+    if isinstance(val, ID):
+        return val.name
+    return val
+
+
+# Node properties which don't affect the result
+_LAYOUT_PROPS = frozenset(
+    {
+        "rna_type",
+        "name",
+        "label",
+        "location",
+        "location_absolute",
+        "width",
+        "height",
+        "dimensions",
+        "select",
+        "hide",
+        "show_options",
+        "show_preview",
+        "show_texture",
+        "color",
+        "color_tag",
+        "use_custom_color",
+        "parent",
+    }
+)
+
+
+def _rna_value(val: Any) -> Any:
+    if isinstance(val, NodeTree):
+        return node_tree_key(val)
+    if isinstance(val, ID):
+        return val.name
+    if isinstance(val, set):
+        return tuple(sorted(val))
+    if val is None or isinstance(val, str | int | float):
+        return val
+    try:
+        # Vectors, colors and arrays
+        return tuple(val)
+    except TypeError:
+        # Other structs (not an input of the node)
+        return None
+
+
+def node_tree_key(node_tree: NodeTree) -> tuple:
+    """Contents of the node tree which affect the result, as a hashable tuple
+    (nodes, their settings and unlinked input values, links and nested node groups)"""
+    nodes = tuple(
+        (
+            node.name,
+            node.bl_idname,
+            tuple(
+                (p.identifier, _rna_value(getattr(node, p.identifier)))
+                for p in node.bl_rna.properties
+                if p.identifier not in _LAYOUT_PROPS and p.type != "COLLECTION"
+            ),
+            tuple(
+                _rna_value(s.default_value)
+                for s in node.inputs
+                if hasattr(s, "default_value") and not s.is_linked
+            ),
+        )
+        for node in sorted(node_tree.nodes, key=lambda n: n.name)
+    )
+    links = tuple(
+        sorted(
+            (
+                lk.from_node.name,
+                lk.from_socket.identifier,
+                lk.to_node.name,
+                lk.to_socket.identifier,
+            )
+            for lk in node_tree.links
+            if not lk.is_muted
+        )
+    )
+    return (nodes, links)
+
+
+def interface_key(mod: NodesModifier, identifiers: Iterable[str] | None = None) -> tuple:
+    """All the parameter values of the modifier, as a hashable tuple
+    (identifiers can be given to avoid looking them up for each modifier)"""
+    if identifiers is None:
+        identifiers = enum_group_input(mod.node_group)
+    return tuple((i, canonical_value(mod.get(i))) for i in identifiers)
+
+
 def set_interface_value(mod: NodesModifier, data: tuple[str, Any]) -> None:
     sock_name = find_interface_name(mod.node_group, data[0])
     mod[sock_name] = data[1]
@@ -6,6 +6,26 @@ from bmesh.types import BMesh
 from bpy.types import Mesh, Object
 
 
+def estimate_mesh_size(mesh: Mesh) -> int:
+    """Rough size of the mesh data in bytes
+    (positions, edges, corners and faces; other attributes are not counted)"""
+    return (
+        len(mesh.vertices) * 12
+        + len(mesh.edges) * 8
+        + len(mesh.loops) * 8
+        + len(mesh.polygons) * 4
+    )
+
+
+def format_size(n_bytes: float) -> str:
+    KB = 1024
+    for unit in ("B", "KB", "MB"):
+        if n_bytes < KB:
+            return f"{n_bytes:.1f} {unit}"
+        n_bytes /= KB
+    return f"{n_bytes:.1f} GB"
+
+
 class classproperty:
     def __init__(self, func):
         self.func = func
@@ -0,0 +1,79 @@
+from typing import NamedTuple
+
+import numpy as np
+from bpy.types import Mesh
+
+from .union_find import label_components
+
+
+class FaceIslands(NamedTuple):
+    # Face indices of each island
+    faces: list[np.ndarray]
+    # Vertex indices (sorted, unique) of each island
+    verts: list[np.ndarray]
+
+
+def _split_by(ids: np.ndarray, values: np.ndarray, n: int) -> list[np.ndarray]:
+    """Split values into n groups by ids (in the original order inside a group)"""
+    order = np.argsort(ids, kind="stable")
+    counts = np.bincount(ids, minlength=n)
+    return np.split(values[order], np.cumsum(counts)[:-1])
+
+
+def calc_face_islands(
+    select: np.ndarray, loop_total: np.ndarray, loop_edge: np.ndarray, loop_vert: np.ndarray
+) -> FaceIslands:
+    """Group the selected faces that share an edge.
+
+    Args:
+        select: Selection state of each face
+        loop_total: Number of loops of each face
+        loop_edge: Edge index of each loop (loops are stored in order of faces)
+        loop_vert: Vertex index of each loop
+    """
+    loop_face = np.repeat(np.arange(len(loop_total)), loop_total)
+    is_sel = select[loop_face]
+    face = loop_face[is_sel]
+    edge = loop_edge[is_sel]
+    vert = loop_vert[is_sel]
+
+    sel_face = np.flatnonzero(select)
+    if len(sel_face) == 0:
+        return FaceIslands([], [])
+    # face index -> index in sel_face
+    to_compact = np.full(len(select), -1)
+    to_compact[sel_face] = np.arange(len(sel_face))
+
+    # Faces next to each other in edge order share that edge
+    order = np.argsort(edge, kind="stable")
+    face_s = face[order]
+    shared = edge[order][1:] == edge[order][:-1]
+    labels = label_components(
+        len(sel_face), to_compact[face_s[:-1][shared]], to_compact[face_s[1:][shared]]
+    )
+    # island number of each selected face
+    _, island = np.unique(labels, return_inverse=True)
+    n_island = int(island.max()) + 1
+
+    # Unique (island, vertex) pairs of the selected loops
+    n_vert = int(vert.max()) + 1
+    pair = np.unique(island[to_compact[face]].astype(np.int64) * n_vert + vert)
+    return FaceIslands(
+        _split_by(island, sel_face, n_island),
+        _split_by(pair // n_vert, pair % n_vert, n_island),
+    )
+
+
+def get_selected_face_islands(mesh: Mesh) -> FaceIslands:
+    n_face = len(mesh.polygons)
+    select = np.empty(n_face, dtype=bool)
+    mesh.polygons.foreach_get("select", select)
+    loop_total = np.empty(n_face, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+
+    n_loop = len(mesh.loops)
+    loop_edge = np.empty(n_loop, dtype=np.int32)
+    mesh.loops.foreach_get("edge_index", loop_edge)
+    loop_vert = np.empty(n_loop, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    return calc_face_islands(select, loop_total, loop_edge, loop_vert)
@@ -0,0 +1,331 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import bpy
+import numpy as np
+from bpy.types import Context, Mesh, NodeTree
+
+from ..constants import get_addon_name
+from ..version import TypeAndVersion
+from .aux_func import get_addon_preferences
+from .aux_node import node_tree_key
+
+# Sub directory of the extension's user directory,
+#   used when no directory is given in the preferences
+DEFAULT_CACHE_SUBDIR = "geometry_cache"
+META_FILE = "meta.json"
+# Layout of the stored entries (entries of other formats are ignored)
+FORMAT_VERSION = 2
+
+
+class CacheKey(NamedTuple):
+    type_name: str
+    version: int
+    # Hash of the parameter values
+    digest: str
+
+    def path(self, root: Path) -> Path:
+        return (
+            root
+            / f"format{FORMAT_VERSION}"
+            / self.type_name
+            / f"{self.version:04d}"
+            / self.digest
+        )
+
+
+def _digest(data: Any) -> str:
+    return hashlib.blake2b(repr(data).encode(), digest_size=16).hexdigest()
+
+
+def node_tree_digest(node_tree: NodeTree) -> str:
+    """Hash of the contents of the node tree,
+    so that a node group edited under the same name doesn't get the stored geometry"""
+    return _digest(node_tree_key(node_tree))
+
+
+def make_cache_key(node_tree: NodeTree, tree_digest: str, inputs: Any) -> CacheKey | None:
+    """tree_digest: node_tree_digest() of node_tree
+    inputs: canonical (session independent) values of everything else the result depends on,
+        such as interface_key() and the hash of the base mesh"""
+    tv = TypeAndVersion.get_type_and_version(node_tree.name)
+    if tv is None:
+        return None
+    return CacheKey(tv.type.name, tv.version.num, _digest((tree_digest, inputs)))
+
+
+# Layout of the generic attributes: data type -> (foreach key, dtype, width)
+ATTRIBUTE_FORMAT: dict[str, tuple[str, type, int]] = {
+    "FLOAT": ("value", np.float32, 1),
+    "INT": ("value", np.int32, 1),
+    "INT8": ("value", np.int32, 1),
+    "BOOLEAN": ("value", bool, 1),
+    "FLOAT2": ("vector", np.float32, 2),
+    "INT32_2D": ("value", np.int32, 2),
+    "FLOAT_VECTOR": ("vector", np.float32, 3),
+    "FLOAT_COLOR": ("color", np.float32, 4),
+    "BYTE_COLOR": ("color", np.float32, 4),
+    "QUATERNION": ("value", np.float32, 4),
+    "FLOAT4X4": ("value", np.float32, 16),
+}
+# Custom normals are restored by normals_split_custom_set() (stored as an attribute in 4.4+)
+CUSTOM_NORMAL_ATTR = "custom_normal"
+
+
+class AttributeData(NamedTuple):
+    name: str
+    domain: str
+    data_type: str
+    values: np.ndarray
+
+
+def _read(coll, attr: str, n: int, dtype: type, width: int = 1) -> np.ndarray:
+    buf = np.empty(n * width, dtype=dtype)
+    coll.foreach_get(attr, buf)
+    return buf if width == 1 else buf.reshape(-1, width)
+
+
+class GeometryData(NamedTuple):
+    """Evaluated mesh of a primitive, as plain arrays.
+    Topology, all the generic attributes (UV maps, sharp edges/faces, material indices...)
+    and the custom normals are stored, so the mesh is reproduced as it was baked"""
+
+    # (N, 3) float32
+    positions: np.ndarray
+    # (E, 2) int32
+    edges: np.ndarray
+    # (F,) int32
+    loop_total: np.ndarray
+    # (L,) int32: vertex / edge index of each face corner
+    corner_verts: np.ndarray
+    corner_edges: np.ndarray
+    attributes: list[AttributeData]
+    # (L, 3) float32, None if the mesh has no custom normals
+    normals: np.ndarray | None
+    # Names of the materials of the mesh
+    materials: list[str]
+    active_uv: str | None
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [
+            self.positions,
+            self.edges,
+            self.loop_total,
+            self.corner_verts,
+            self.corner_edges,
+            *(a.values for a in self.attributes),
+        ]
+        if self.normals is not None:
+            arrays.append(self.normals)
+        return sum(a.nbytes for a in arrays)
+
+    @classmethod
+    def from_mesh(cls, mesh: Mesh):
+        """None if the mesh has data which can't be reproduced (e.g. string attributes)"""
+        n_loop = len(mesh.loops)
+        sizes = {
+            "POINT": len(mesh.vertices),
+            "EDGE": len(mesh.edges),
+            "FACE": len(mesh.polygons),
+            "CORNER": n_loop,
+        }
+        attributes: list[AttributeData] = []
+        for attr in mesh.attributes:
+            # Internal ones are restored with the topology
+            if attr.name.startswith(".") or attr.name in ("position", CUSTOM_NORMAL_ATTR):
+                continue
+            fmt = ATTRIBUTE_FORMAT.get(attr.data_type)
+            if fmt is None or attr.domain not in sizes:
+                return None
+            key, dtype, width = fmt
+            values = _read(attr.data, key, sizes[attr.domain], dtype, width)
+            attributes.append(AttributeData(attr.name, attr.domain, attr.data_type, values))
+
+        active = mesh.uv_layers.active
+        return cls(
+            _read(mesh.vertices, "co", sizes["POINT"], np.float32, 3),
+            _read(mesh.edges, "vertices", sizes["EDGE"], np.int32, 2),
+            _read(mesh.polygons, "loop_total", sizes["FACE"], np.int32),
+            _read(mesh.loops, "vertex_index", n_loop, np.int32),
+            _read(mesh.loops, "edge_index", n_loop, np.int32),
+            attributes,
+            _read(mesh.corner_normals, "vector", n_loop, np.float32, 3)
+            if mesh.has_custom_normals
+            else None,
+            [m.name if m is not None else "" for m in mesh.materials],
+            None if active is None else active.name,
+        )
+
+    def to_mesh(self, name: str) -> Mesh | None:
+        """None if some of the materials don't exist in this file"""
+        materials = [bpy.data.materials.get(m) if m else None for m in self.materials]
+        for mat, mat_name in zip(materials, self.materials, strict=True):
+            if mat is None and mat_name:
+                return None
+
+        mesh = bpy.data.meshes.new(name)
+        mesh.vertices.add(len(self.positions))
+        mesh.vertices.foreach_set("co", np.ravel(self.positions))
+        mesh.edges.add(len(self.edges))
+        mesh.edges.foreach_set("vertices", np.ravel(self.edges))
+        mesh.loops.add(len(self.corner_verts))
+        mesh.loops.foreach_set("vertex_index", self.corner_verts)
+        mesh.loops.foreach_set("edge_index", self.corner_edges)
+        mesh.polygons.add(len(self.loop_total))
+        loop_start = np.zeros(len(self.loop_total), dtype=np.int32)
+        np.cumsum(self.loop_total[:-1], out=loop_start[1:])
+        mesh.polygons.foreach_set("loop_start", loop_start)
+
+        for a in self.attributes:
+            attr = mesh.attributes.get(a.name)
+            if attr is not None and (attr.domain != a.domain or attr.data_type != a.data_type):
+                mesh.attributes.remove(attr)
+                attr = None
+            if attr is None:
+                attr = mesh.attributes.new(a.name, a.data_type, a.domain)
+            attr.data.foreach_set(ATTRIBUTE_FORMAT[a.data_type][0], np.ravel(a.values))
+        if self.active_uv is not None and self.active_uv in mesh.uv_layers:
+            mesh.uv_layers.active = mesh.uv_layers[self.active_uv]
+
+        mesh.update()
+        for m in materials:
+            mesh.materials.append(m)
+        if self.normals is not None:
+            mesh.normals_split_custom_set(np.asarray(self.normals))
+        return mesh
+
+    def save(self, path: Path) -> None:
+        path.mkdir(parents=True)
+        for attr in ("positions", "edges", "loop_total", "corner_verts", "corner_edges"):
+            np.save(path / f"{attr}.npy", getattr(self, attr))
+        if self.normals is not None:
+            np.save(path / "normals.npy", self.normals)
+        for i, a in enumerate(self.attributes):
+            np.save(path / f"attr_{i}.npy", a.values)
+        meta = {
+            "attributes": [[a.name, a.domain, a.data_type] for a in self.attributes],
+            "custom_normals": self.normals is not None,
+            "materials": self.materials,
+            "active_uv": self.active_uv,
+        }
+        (path / META_FILE).write_text(json.dumps(meta))
+
+    @classmethod
+    def load(cls, path: Path):
+        """Arrays are memory-mapped (read only)"""
+        meta = json.loads((path / META_FILE).read_text())
+
+        def load(name: str) -> np.ndarray:
+            return np.load(path / f"{name}.npy", mmap_mode="r")
+
+        return cls(
+            load("positions"),
+            load("edges"),
+            load("loop_total"),
+            load("corner_verts"),
+            load("corner_edges"),
+            [
+                AttributeData(name, domain, data_type, load(f"attr_{i}"))
+                for i, (name, domain, data_type) in enumerate(meta["attributes"])
+            ],
+            load("normals") if meta["custom_normals"] else None,
+            meta["materials"],
+            meta["active_uv"],
+        )
+
+
+class GeometryCache:
+    """Two-level cache of evaluated primitive meshes.
+    1st: in-memory LRU (limited by bytes), 2nd: .npy files in a directory
+    which can be shared between sessions (and users)"""
+
+    def __init__(self, memory_limit: int, directory: Path | None):
+        self.memory_limit = memory_limit
+        self.directory = directory
+        self._entries: OrderedDict[CacheKey, GeometryData] = OrderedDict()
+        self._size = 0
+
+    def _put_memory(self, key: CacheKey, data: GeometryData) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        if data.nbytes > self.memory_limit:
+            return
+        self._entries[key] = data
+        self._size += data.nbytes
+        while self._size > self.memory_limit:
+            _, old = self._entries.popitem(last=False)
+            self._size -= old.nbytes
+
+    def get(self, key: CacheKey) -> GeometryData | None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        if self.directory is None:
+            return None
+        path = key.path(self.directory)
+        if not (path / META_FILE).exists():
+            return None
+        try:
+            data = GeometryData.load(path)
+        except (OSError, ValueError, KeyError):
+            # Broken entry (e.g. written by a different version)
+            return None
+        self._put_memory(key, data)
+        return data
+
+    def put(self, key: CacheKey, data: GeometryData) -> None:
+        self._put_memory(key, data)
+        if self.directory is None:
+            return
+        path = key.path(self.directory)
+        if path.exists():
+            return
+        # Write to a temporary directory and rename it,
+        #   so that other processes never see a partially written entry
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        try:
+            data.save(tmp)
+            os.replace(tmp, path)
+        except OSError:
+            # Written by someone else at the same time, or not writable
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+_geometry_cache: GeometryCache | None = None
+
+
+def get_geometry_cache(context: Context) -> GeometryCache | None:
+    """Cache configured by the preferences (None if disabled)"""
+    global _geometry_cache  # noqa: PLW0603
+    pref = get_addon_preferences(context)
+    if not pref.use_geometry_cache:
+        return None
+
+    if pref.geometry_cache_dir:
+        directory = Path(pref.geometry_cache_dir)
+    else:
+        directory = Path(
+            bpy.utils.extension_path_user(
+                get_addon_name(), path=DEFAULT_CACHE_SUBDIR, create=True
+            )
+        )
+    memory_limit = pref.geometry_cache_memory_mb * 1024 * 1024
+    if (
+        _geometry_cache is None
+        or _geometry_cache.directory != directory
+        or _geometry_cache.memory_limit != memory_limit
+    ):
+        _geometry_cache = GeometryCache(memory_limit, directory)
+    return _geometry_cache
@@ -0,0 +1,79 @@
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+from bpy.types import Context, NodeGroup, NodesModifier
+
+from .aux_node import find_interface_name
+
+
+class ParamBatch:
+    """Interface values of the modifiers sharing one node group, as arrays.
+    Values are read once into numpy arrays ((n,) or (n, 3)),
+    and written back to the modifiers in write()"""
+
+    def __init__(self, mods: Sequence[NodesModifier], node_group: NodeGroup):
+        self.mods = mods
+        self.node_group = node_group
+        # Socket identifiers are resolved only once per group
+        self._sock: dict[str, str] = {}
+        self._values: dict[str, np.ndarray] = {}
+        # Python type of the stored values (int values are written back as int)
+        self._kind: dict[str, type] = {}
+        self._modified: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.mods)
+
+    def _sock_name(self, name: str) -> str:
+        if name not in self._sock:
+            self._sock[name] = find_interface_name(self.node_group, name)
+        return self._sock[name]
+
+    def get(self, name: str) -> np.ndarray:
+        if name not in self._values:
+            sock = self._sock_name(name)
+            raw = [mod[sock] for mod in self.mods]
+            self._kind[name] = type(raw[0]) if len(raw) > 0 else float
+            self._values[name] = np.array(raw, dtype=np.float64)
+        return self._values[name]
+
+    def set(self, name: str, values: np.ndarray) -> None:
+        self.get(name)
+        self._values[name] = np.broadcast_to(values, self._values[name].shape)
+        self._modified.add(name)
+
+    def limits(self, name: str) -> tuple[float, float]:
+        """(min, max) of the socket defined in the node group"""
+        for item in self.node_group.interface.items_tree:
+            if item.item_type == "SOCKET" and item.in_out == "INPUT" and item.name == name:
+                return (
+                    getattr(item, "min_value", -np.inf),
+                    getattr(item, "max_value", np.inf),
+                )
+        return -np.inf, np.inf
+
+    def _to_python(self, name: str, val: np.ndarray) -> Any:
+        kind = self._kind[name]
+        if kind is bool:
+            return bool(val)
+        if kind is int:
+            return int(np.rint(val))
+        return val.tolist()
+
+    def write(self, mask: np.ndarray | None = None) -> None:
+        """Write the modified values (only of the objects in mask, if specified)"""
+        for name in self._modified:
+            sock = self._sock_name(name)
+            for i, (mod, val) in enumerate(zip(self.mods, self._values[name], strict=True)):
+                if mask is None or mask[i]:
+                    mod[sock] = self._to_python(name, val)
+
+    def update(self, context: Context) -> None:
+        # Since the node group value has been changed, update it here (once per group)
+        self.node_group.interface_update(context)
+
+    def tag_objects(self) -> None:
+        """Re-evaluate only the objects of the modifiers (instead of every user of the group)"""
+        for mod in self.mods:
+            mod.id_data.update_tag()
@@ -1,26 +1,34 @@
+import numpy as np
+
+
 class UnionFind:
     # Index -> connected-index
     _lead_to: list[int]
+    _rank: list[int]
 
     def __init__(self, size: int):
-        self._lead_to = [-1] * size
+        self._lead_to = list(range(size))
+        self._rank = [0] * size
 
     def connect(self, from_idx: int, to_idx: int) -> None:
-        if from_idx == to_idx:
-            return
-        if self.get_id(to_idx) == from_idx:
+        root0 = self.get_id(from_idx)
+        root1 = self.get_id(to_idx)
+        if root0 == root1:
             return
-        self._lead_to[from_idx] = to_idx
+        # union by rank
+        if self._rank[root0] < self._rank[root1]:
+            root0, root1 = root1, root0
+        self._lead_to[root1] = root0
+        if self._rank[root0] == self._rank[root1]:
+            self._rank[root0] += 1
 
     def get_id(self, from_idx: int) -> int:
         cur = from_idx
-        while True:
-            next_idx = self._lead_to[cur]
-            if next_idx == -1:
-                break
-            cur = next_idx
-        if cur != from_idx:
-            self._lead_to[from_idx] = cur
+        lead_to = self._lead_to
+        while lead_to[cur] != cur:
+            # path halving
+            lead_to[cur] = lead_to[lead_to[cur]]
+            cur = lead_to[cur]
         return cur
 
     def get_groups(self) -> list[list[int]]:
@@ -41,3 +49,37 @@ class UnionFind:
             ret += ", "
         ret += ")"
         return ret
+
+
+def label_components(size: int, idx0: np.ndarray, idx1: np.ndarray) -> np.ndarray:
+    """Vectorized union-find.
+    Connects idx0[i] and idx1[i] for every i,
+    and returns the label (smallest index of the component) of each element"""
+    parent = np.arange(size)
+    if len(idx0) == 0:
+        return parent
+
+    while True:
+        root0 = parent[idx0]
+        root1 = parent[idx1]
+        diff = root0 != root1
+        if not diff.any():
+            return parent
+        # Hook the larger root under the smaller one
+        #   (roots only decrease, so no cycle can be made)
+        root0 = root0[diff]
+        root1 = root1[diff]
+        np.minimum.at(parent, np.maximum(root0, root1), np.minimum(root0, root1))
+        # Pointer jumping until every element points to its root
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def labels_to_groups(labels: np.ndarray) -> list[np.ndarray]:
+    """Element indices of each label (in order of the smallest element)"""
+    order = np.argsort(labels, kind="stable")
+    _, first = np.unique(labels[order], return_index=True)
+    return np.split(order, first[1:])
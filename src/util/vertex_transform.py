@@ -0,0 +1,87 @@
+import hashlib
+from collections.abc import Sequence
+
+import numpy as np
+from bpy.types import Mesh
+
+
+def read_coords(mesh: Mesh) -> np.ndarray:
+    """(N, 3) float32 array, as stored in the mesh"""
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    return coords.reshape(-1, 3)
+
+
+def coords_digest(mesh: Mesh) -> str:
+    """Hash of the vertex positions (e.g. of the base mesh of a primitive)"""
+    return hashlib.blake2b(read_coords(mesh).tobytes(), digest_size=16).hexdigest()
+
+
+def write_coords(mesh: Mesh, coords: np.ndarray) -> None:
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(coords, dtype=np.float32).ravel())
+    mesh.update()
+
+
+def _split_rounds(meshes: Sequence[Mesh]) -> list[list[int]]:
+    """Split mesh indices so that a mesh appears at most once in each round.
+    (A mesh shared by several objects is transformed once per object, in order)"""
+    rounds: list[list[int]] = []
+    pending = list(range(len(meshes)))
+    while len(pending) > 0:
+        seen: set[int] = set()
+        cur: list[int] = []
+        rest: list[int] = []
+        for i in pending:
+            ptr = meshes[i].as_pointer()
+            (rest if ptr in seen else cur).append(i)
+            seen.add(ptr)
+        rounds.append(cur)
+        pending = rest
+    return rounds
+
+
+def _transform_round(
+    meshes: Sequence[Mesh],
+    matrix: np.ndarray | None,
+    scale: np.ndarray | None,
+    offset: np.ndarray | None,
+) -> None:
+    coords = [read_coords(m) for m in meshes]
+    counts = [len(c) for c in coords]
+    if sum(counts) == 0:
+        return
+    # Process the vertices of all the meshes as one buffer
+    buf = np.concatenate(coords).astype(np.float64)
+    mesh_idx = np.repeat(np.arange(len(meshes)), counts)
+    if matrix is not None:
+        buf = np.einsum("nij,nj->ni", matrix[mesh_idx], buf)
+    if scale is not None:
+        buf *= scale[mesh_idx]
+    if offset is not None:
+        buf += offset[mesh_idx]
+
+    for m, co in zip(meshes, np.split(buf, np.cumsum(counts)[:-1]), strict=True):
+        if len(co) > 0:
+            write_coords(m, co)
+
+
+def transform_vertices(
+    meshes: Sequence[Mesh],
+    matrix: Sequence | None = None,
+    scale: Sequence | None = None,
+    offset: Sequence | None = None,
+) -> None:
+    """Transform the vertices of every mesh at once:
+    co = (matrix[i] @ co) * scale[i] + offset[i] for meshes[i].
+
+    Args:
+        matrix: (n, 3, 3) linear part of each mesh (None = identity)
+        scale: (n, 3) scale of each mesh (None = 1)
+        offset: (n, 3) translation of each mesh (None = 0)
+    """
+    args = [
+        None if a is None else np.asarray(a, dtype=np.float64) for a in (matrix, scale, offset)
+    ]
+    for idx in _split_rounds(meshes):
+        sub_args = [None if a is None else a[idx] for a in args]
+        _transform_round([meshes[i] for i in idx], *sub_args)
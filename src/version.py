@@ -2,8 +2,12 @@ import re
 from functools import total_ordering
 from pathlib import Path
 from collections.abc import Callable
+from typing import ClassVar
 
 import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+from bpy.types import NodeGroup
 
 from .constants import (
     MODERN_PRIMITIVE_TAG,
@@ -43,20 +47,34 @@ class VersionInt:
         return self.num >= other.num
 
     # Read MAX_DIGITS of numbers at the end of the string
+    #   (the result is shared between the same strings, don't modify it)
     @classmethod
     def get_version_from_string(cls, v_str: str):
+        try:
+            return _VERSION_MEMO[v_str]
+        except KeyError:
+            pass
         res = cls.RE_DIGITS.match(v_str)
         if res is not None:
-            return cls(int(res.group(1)))
+            ret = _VERSION_MEMO[v_str] = cls(int(res.group(1)))
+            return ret
         raise DGInvalidVersionNumber(-1)
 
 
+# Parsed versions by string
+_VERSION_MEMO: dict[str, VersionInt] = {}
+
+
 _version_num: list[VersionInt] = []
 
 
 # A set of primitive type and version number
 class TypeAndVersion:
     RE_TYPE_AND_DIGIT: re.Pattern[str] = re.compile(r"(\w+)(_.+)$")
+    # Parsed results by node group name (None: not a primitive's node group)
+    _memo: ClassVar[dict[str, "TypeAndVersion | None"]] = {}
+    # Interned instances, so that the equal names share one
+    _interned: ClassVar[dict[tuple[Type, int], "TypeAndVersion"]] = {}
 
     type: Type
     version: VersionInt
@@ -74,30 +92,118 @@ class TypeAndVersion:
         return hash((self.type, self.version))
 
     # Extract the primitive type + version number
-    # from the node group name (returns none if it cannot be identified)
+    # from the node group name (returns none if it cannot be identified).
+    # The result is memoized (and shared), don't modify it
     @classmethod
     def get_type_and_version(cls, src: str):
-        if src.startswith(MODERN_PRIMITIVE_TAG):
-            s_name = src[len(MODERN_PRIMITIVE_TAG) :]
-            res = cls.RE_TYPE_AND_DIGIT.match(s_name)
-            if res is not None:
-                try:
-                    return cls(
-                        Type[res.group(1)],
-                        VersionInt.get_version_from_string(res.group(2)),
-                    )
-                except DGInvalidVersionNumber:
-                    pass
+        if not src.startswith(MODERN_PRIMITIVE_TAG):
+            return None
+        try:
+            return cls._memo[src]
+        except KeyError:
+            ret = cls._memo[src] = cls._parse(src)
+            return ret
+
+    @classmethod
+    def _parse(cls, src: str):
+        s_name = src[len(MODERN_PRIMITIVE_TAG) :]
+        res = cls.RE_TYPE_AND_DIGIT.match(s_name)
+        if res is not None:
+            try:
+                typ = Type[res.group(1)]
+                ver = VersionInt.get_version_from_string(res.group(2))
+            except (KeyError, DGInvalidVersionNumber):
+                return None
+            return cls._interned.setdefault((typ, ver.num), cls(typ, ver))
         return None
 
 
+class NodeGroupIndex:
+    """Node groups of the primitives by type, sorted by version (newest first).
+    Rebuilt when a node group is added or removed, or the entry turns out to be stale"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self._uids: np.ndarray | None = None
+        self._index: dict[Type, list[tuple[VersionInt, NodeGroup]]] = {}
+
+    @staticmethod
+    def _session_uids() -> np.ndarray:
+        # session_uid is never reused in a session, so any node group added or removed
+        #   changes it (even if the number of node groups stays the same)
+        uids = np.empty(len(bpy.data.node_groups), dtype=np.int64)
+        bpy.data.node_groups.foreach_get("session_uid", uids)
+        return uids
+
+    def _build(self, uids: np.ndarray) -> None:
+        self._index = {}
+        for ng in bpy.data.node_groups:
+            tv = TypeAndVersion.get_type_and_version(ng.name)
+            if tv is not None:
+                self._index.setdefault(tv.type, []).append((tv.version, ng))
+        for entries in self._index.values():
+            entries.sort(key=lambda e: e[0].num, reverse=True)
+        self._uids = uids
+
+    def _is_valid(self, type_c: Type) -> bool:
+        entries = self._index.get(type_c)
+        if not entries:
+            return True
+        ver, ng = entries[0]
+        try:
+            tv = TypeAndVersion.get_type_and_version(ng.name)
+        except ReferenceError:
+            return False
+        # Renamed?
+        return tv is not None and tv.type == type_c and tv.version == ver
+
+    def newest(self, type_c: Type, minimum_version: VersionInt) -> NodeGroup | None:
+        """The newest node group of type_c, if it's minimum_version or later"""
+        uids = self._session_uids()
+        if (
+            self._uids is None
+            or not np.array_equal(uids, self._uids)
+            or not self._is_valid(type_c)
+        ):
+            self._build(uids)
+        entries = self._index.get(type_c)
+        if not entries or entries[0][0] < minimum_version:
+            return None
+        return entries[0][1]
+
+
+NODE_GROUP_INDEX = NodeGroupIndex()
+
+
+@persistent
+def on_reset(*args) -> None:
+    # The node groups have been replaced
+    NODE_GROUP_INDEX.clear()
+
+
+HANDLERS = (
+    (bpy.app.handlers.undo_post, on_reset),
+    (bpy.app.handlers.redo_post, on_reset),
+    (bpy.app.handlers.load_post, on_reset),
+)
+
+
 def register() -> None:
     global _version_num
     _version_num = []
+    NODE_GROUP_INDEX.clear()
+    for handler, fn in HANDLERS:
+        if fn not in handler:
+            handler.append(fn)
 
 
 def unregister() -> None:
-    pass
+    for handler, fn in HANDLERS:
+        if fn in handler:
+            handler.remove(fn)
+    NODE_GROUP_INDEX.clear()
 
 
 # Is the version number of the primitive that comes with the add-on already read?
@@ -10,12 +10,19 @@ from .util.aux_func import is_primitive_mod, make_primitive_property_name, obj_i
 # (before the wireframe is forcibly displayed by the add-on)
 ENTRY_NAME = make_primitive_property_name("original_wireframe_state")
 
+# Properties whose change may switch the target object (published by the message bus).
+# Selection isn't published, it's checked on the depsgraph update
+MSGBUS_KEYS = (
+    (bpy.types.LayerObjects, "active"),
+    (bpy.types.Object, "mode"),
+    (bpy.types.Modifier, "show_viewport"),
+    (bpy.types.Modifier, "is_active"),
+)
+
 
 class ObjectHold:
     def __init__(self):
         self._obj: Object | None = None
-        # Is there a state update request from the drawing hook? (on_draw_hook)
-        self._draw_hook_called = False
 
     # Switch target object
     def _set_target(self, obj: Object | None) -> None:
@@ -44,10 +51,10 @@ class ObjectHold:
 
     # Determine whether the object is eligible for wireframe display
     @staticmethod
-    def _obj_is_eligible(obj: Object, act: Object | None, sel: list[Object]) -> bool:
+    def _obj_is_eligible(obj: Object, act: Object | None) -> bool:
         assert obj is not None
         # Check: target is active object and selected
-        if obj == act and obj in sel:
+        if obj == act and obj.select_get():
             # has the modern primitive modifier and it is selected
             for mod in obj.modifiers:
                 if is_primitive_mod(mod):
@@ -55,14 +62,14 @@ class ObjectHold:
         return False
 
     # Determine whether the object should show wireframe
-    def _obj_is_still_eligible(self, act: Object | None, sel: list[Object]) -> bool:
+    def _obj_is_still_eligible(self, act: Object | None) -> bool:
         assert self._obj is not None
-        return self.__class__._obj_is_eligible(self._obj, act, sel) and obj_is_alive(self._obj)
+        return obj_is_alive(self._obj) and self.__class__._obj_is_eligible(self._obj, act)
 
-    def check_state(self, act: Object | None, sel: list[Object]) -> None:
+    def check_state(self, act: Object | None) -> None:
         # Determine whether the currently selected object is still valid
         if self._obj is not None:
-            if not self._obj_is_still_eligible(act, sel):
+            if not self._obj_is_still_eligible(act):
                 # Since the target is invalid, set it to none once
                 self._set_target(None)
 
@@ -73,48 +80,44 @@ class ObjectHold:
         assert self._obj is None
 
         # If there is a new target(eligible) object, set it here
-        if act is not None and self.__class__._obj_is_eligible(act, act, sel):
+        if act is not None and self.__class__._obj_is_eligible(act, act):
             self._set_target(act)
             return
 
-    def _on_draw_hook_async(self) -> None:
-        self._draw_hook_called = False
-        ctx = bpy.context
-        self.check_state(ctx.active_object, ctx.selected_objects)
-
-    def on_draw_hook(self, context: Context) -> None:
-        # We want to judge the wireframe display,
-        #   but since we can't change the display state of the object here.
-        # We have to process it again using the application timer.
-
-        # Provide some grace time to reduce the frequency of callbacks
-        if not self._draw_hook_called:
-            self._draw_hook_called = True
-            bpy.app.timers.register(self._on_draw_hook_async, first_interval=0.1)
-
 
 class LocalValue:
     target_obj: ClassVar[ObjectHold] = ObjectHold()
+    # Owner of the message bus subscriptions
+    msgbus_owner: ClassVar[object] = object()
 
 
-@persistent
-def on_deps(scene: Scene) -> None:
+def update_state() -> None:
     context: Context = bpy.context
     if context.mode != "OBJECT":
         return
-    LocalValue.target_obj.check_state(context.active_object, context.selected_objects)
+    # Only looks at the active object, so it's cheap enough for every update
+    LocalValue.target_obj.check_state(context.active_object)
 
 
-def on_draw_hook(self, context: Context):
-    if context.mode != "OBJECT":
-        return
-    LocalValue.target_obj.on_draw_hook(context)
+@persistent
+def on_deps(scene: Scene) -> None:
+    # Selection changes aren't published by the message bus
+    update_state()
+
+
+def subscribe() -> None:
+    # Subscriptions are cleared when a file is loaded
+    bpy.msgbus.clear_by_owner(LocalValue.msgbus_owner)
+    for key in MSGBUS_KEYS:
+        bpy.msgbus.subscribe_rna(
+            key=key, owner=LocalValue.msgbus_owner, args=(), notify=update_state
+        )
 
 
 @persistent
 def load_handler(new_file: str):
-    on_deps(bpy.context.scene)
-    on_draw_hook(None, bpy.context)
+    subscribe()
+    update_state()
 
 
 handler_deps_update = bpy.app.handlers.depsgraph_update_post
@@ -126,8 +129,7 @@ def register() -> None:
         handler_deps_update.append(on_deps)
     if load_handler not in handler_loadpost:
         handler_loadpost.append(load_handler)
-    # For detect modifier's active state switching
-    bpy.types.TOPBAR_HT_upper_bar.append(on_draw_hook)
+    subscribe()
 
 
 def unregister() -> None:
@@ -135,4 +137,4 @@ def unregister() -> None:
         handler_deps_update.remove(on_deps)
     if load_handler in handler_loadpost:
         handler_loadpost.remove(load_handler)
-    bpy.types.TOPBAR_HT_upper_bar.remove(on_draw_hook)
+    bpy.msgbus.clear_by_owner(LocalValue.msgbus_owner)
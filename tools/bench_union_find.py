@@ -0,0 +1,42 @@
+"""Benchmark of src/util/union_find.py: islands of a 1000 x 500 grid of faces (500k faces).
+
+python tools/bench_union_find.py
+"""
+
+import importlib.util
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Loaded by the path, as the add-on package can't be imported outside Blender
+_spec = importlib.util.spec_from_file_location(
+    "union_find", Path(__file__).parent.parent / "src" / "util" / "union_find.py"
+)
+union_find = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(union_find)
+
+
+def main() -> None:
+    W, H = 1000, 500
+    ISLAND_WIDTH = 100
+    face = np.arange(W * H).reshape(H, W)
+    # Split the grid into 10 islands by not connecting every ISLAND_WIDTH column
+    right = face[:, :-1][:, (np.arange(1, W) % ISLAND_WIDTH) != 0]
+    pairs0 = np.concatenate((right.ravel(), face[:-1].ravel()))
+    pairs1 = np.concatenate((right.ravel() + 1, face[1:].ravel()))
+    print(f"{W * H} faces, {len(pairs0)} adjacent pairs")
+
+    t = time.perf_counter()
+    groups = union_find.labels_to_groups(union_find.label_components(W * H, pairs0, pairs1))
+    print(f"label_components: {len(groups)} islands, {time.perf_counter() - t:.3f}s")
+
+    t = time.perf_counter()
+    uf = union_find.UnionFind(W * H)
+    for i0, i1 in zip(pairs0.tolist(), pairs1.tolist(), strict=True):
+        uf.connect(i0, i1)
+    print(f"UnionFind: {len(uf.get_groups())} islands, {time.perf_counter() - t:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
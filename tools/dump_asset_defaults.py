@@ -0,0 +1,67 @@
+"""Write src/asset_defaults.py: the parameter values of the asset objects.
+
+Run in Blender with the add-on enabled, after changing the assets:
+    blender -b --factory-startup --python tools/dump_asset_defaults.py
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+import bpy
+
+# Available once bpy is loaded (e.g. when bpy is used as a Python module)
+import addon_utils
+
+ADDON_NAME = "modern_primitive"
+OUTPUT = Path(__file__).parent.parent / "src" / "asset_defaults.py"
+
+
+def _find_addon() -> str:
+    # Installed as an extension (bl_ext.<repo>.modern_primitive) or as a legacy add-on
+    names = [
+        f"bl_ext.{repo.module}.{ADDON_NAME}"
+        for repo in bpy.context.preferences.extensions.repos
+    ]
+    for name in [*names, ADDON_NAME]:
+        if addon_utils.enable(name, default_set=True) is not None:
+            return name
+    sys.exit(f"{ADDON_NAME} is not installed")
+
+
+def main() -> None:
+    addon = _find_addon()
+    constants = importlib.import_module(f"{addon}.src.constants")
+    restore_default = importlib.import_module(f"{addon}.src.restore_default")
+    version = importlib.import_module(f"{addon}.src.version")
+
+    lines = [
+        '"""Parameter values of the asset objects, by type: (asset version, {name: value}).',
+        "Generated by tools/dump_asset_defaults.py, do not edit",
+        '"""',
+        "",
+        "from typing import Any",
+        "",
+        "ASSET_DEFAULTS: dict[str, tuple[int, dict[str, Any]]] = {",
+    ]
+    for typ in constants.Type:
+        values = restore_default.load_default_value(typ)
+        ver = version.get_primitive_version(typ).num
+        lines.append(f"    {typ.name!r}: (")
+        lines.append(f"        {ver},")
+        lines.append("        {")
+        # Sorted, so that the output doesn't change between the runs
+        lines.extend(
+            f"            {prop.name!r}: {val!r},"
+            for prop, val in sorted(values.items(), key=lambda pv: pv[0].name)
+        )
+        lines.append("        },")
+        lines.append("    ),")
+    lines.append("}")
+    # Quoted as ruff format does
+    OUTPUT.write_text("\n".join(lines).replace("'", '"') + "\n")
+    print(f"Written: {OUTPUT}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compare the polygon estimates (src/topology.py) with the evaluated meshes.
+
+Run in Blender with the add-on enabled:
+    blender -b --factory-startup --python tools/validate_estimators.py
+Exits with 1 if any estimate differs from the evaluated mesh.
+"""
+
+import importlib
+import sys
+
+import bpy
+
+# Available once bpy is loaded (e.g. when bpy is used as a Python module)
+import addon_utils
+
+ADDON_NAME = "modern_primitive"
+
+
+def _find_addon() -> str:
+    # Installed as an extension (bl_ext.<repo>.modern_primitive) or as a legacy add-on
+    names = [
+        f"bl_ext.{repo.module}.{ADDON_NAME}"
+        for repo in bpy.context.preferences.extensions.repos
+    ]
+    for name in [*names, ADDON_NAME]:
+        if addon_utils.enable(name, default_set=True) is not None:
+            return name
+    sys.exit(f"{ADDON_NAME} is not installed")
+
+
+def main() -> int:
+    addon = _find_addon()
+    topology = importlib.import_module(f"{addon}.src.topology")
+    n_failed = 0
+    for type_c, mismatches in topology.validate_estimators(bpy.context).items():
+        print(f"{type_c.name}: {len(mismatches)} mismatch(es)")
+        for params, estimated, measured in mismatches:
+            est = [int(v) for v in estimated]
+            meas = [int(v) for v in measured]
+            print(f"    {params}: estimated {est}, measured {meas}")
+        n_failed += len(mismatches)
+    return 1 if n_failed > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())